@@ -0,0 +1,206 @@
+"""
+asyncio versions of GmailClient and TrelloClient.
+
+The Google discovery client and requests are blocking, so these wrappers
+run the blocking calls on worker threads (asyncio.to_thread) and let the
+event loop overlap them. A semaphore bounds how many calls are in flight
+per client. Message fetching is split into batches that run concurrently,
+so one mailbox read also benefits, not only Gmail + Trello side by side.
+
+    gmail, trello = AsyncGmailClient(), AsyncTrelloClient()
+    inbox, board = await fetch_sync_snapshots(gmail, trello)
+"""
+
+import asyncio
+import weakref
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from api.board_snapshot import BoardSnapshot
+from api.gmail_client import INBOX_QUERY, GmailClient
+from api.grouping import group_by_subject, grouping_query, has_subject_words
+from api.inbox_snapshot import InboxSnapshot
+from api.trello_client import TrelloClient
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class _AsyncWrapper:
+    """
+    Runs blocking calls of a sync client on threads, at most max_concurrency at a time.
+    The limit is per event loop, so one client can be used from several asyncio.run() calls.
+    """
+
+    def __init__(self, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """
+        The semaphore of the running loop (an asyncio.Semaphore only works on one loop).
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        async with self._semaphore():
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class AsyncGmailClient(_AsyncWrapper):
+    """
+    Same public reads as GmailClient, as coroutines.
+
+    client: an existing GmailClient, otherwise one is created from client_kwargs
+    max_concurrency: how many Gmail calls (batches / gets) run at the same time
+    """
+
+    def __init__(
+        self,
+        client: GmailClient | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        **client_kwargs,
+    ):
+        super().__init__(max_concurrency)
+        self.client = client or GmailClient(**client_kwargs)
+
+    @property
+    def urgency_classifier(self):
+        return self.client.urgency_classifier
+
+    async def _list_ids(self, query: str, max_results: int | None) -> List[str]:
+        """
+        Message ids of every page (pages depend on each other's tokens, so this part is sequential).
+        """
+        def _all_ids() -> List[str]:
+            return [
+                msg_id
+                for page in self.client._iter_message_id_pages(query, max_results)
+                for msg_id in page
+            ]
+        return await self._run(_all_ids)
+
+    async def _get_emails(self, msg_ids: List[str]) -> List[Dict]:
+        """
+        Fetch and parse emails, one batch per task, all batches concurrently.
+        """
+        size = self.client.batch_size
+        chunks = [msg_ids[start:start + size] for start in range(0, len(msg_ids), size)]
+        pages = await asyncio.gather(*(self._run(self.client._get_emails, chunk) for chunk in chunks))
+        return [email for page in pages for email in page]
+
+    async def get_inbox_emails(
+        self,
+        max_results: int | None = 50,
+        query: str = "",
+        candidate: Callable[[Dict], bool] | None = None,
+    ) -> List[Dict]:
+        """
+        Same as GmailClient.get_inbox_emails (incremental mode included).
+        query / candidate: see GmailClient.iter_inbox_emails
+        """
+        if self.client.inbox_sync is not None:
+            def _read() -> List[Dict]:
+                return list(self.client.iter_inbox_emails(
+                    max_results=max_results, query=query, candidate=candidate
+                ))
+            return await self._run(_read)
+
+        msg_ids = await self._list_ids(f"{INBOX_QUERY} {query}".strip(), max_results)
+        return await self._get_emails(msg_ids)
+
+    async def get_urgent_emails(
+        self,
+        max_results: int | None = 50,
+        subject_prefix: str | None = None,
+        pushdown: bool = True,
+    ) -> List[Dict]:
+        emails = await self.get_inbox_emails(
+            max_results=max_results,
+            query=self.client._urgent_query(subject_prefix, pushdown),
+            candidate=self.client._urgent_candidate(subject_prefix),
+        )
+        return self.client._filter_urgent(emails, subject_prefix)
+
+    async def get_emails_grouped_by_subject(
+        self,
+        max_results: int | None = 50,
+        subject_prefix: str | None = None,
+        pushdown: bool = True,
+        normalize_bodies: bool = False,
+    ) -> Dict[str, List[str]]:
+        emails = await self.get_inbox_emails(
+            max_results=max_results,
+            query=grouping_query(subject_prefix, pushdown),
+            candidate=lambda email: has_subject_words(email["subject"], subject_prefix),
+        )
+        return group_by_subject(emails, subject_prefix, normalize_bodies)
+
+    async def get_inbox_snapshot(self, max_results: int | None = 100) -> InboxSnapshot:
+        emails = await self.get_inbox_emails(max_results=max_results)
+        return InboxSnapshot.from_emails(emails, classifier=self.urgency_classifier)
+
+
+class AsyncTrelloClient(_AsyncWrapper):
+    """
+    Same public reads as TrelloClient, as coroutines.
+
+    client: an existing TrelloClient, otherwise one is created from client_kwargs
+    max_concurrency: how many Trello requests run at the same time
+                     (the client's rate limiter still applies on top)
+    """
+
+    def __init__(
+        self,
+        client: TrelloClient | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        **client_kwargs,
+    ):
+        super().__init__(max_concurrency)
+        self.client = client or TrelloClient(**client_kwargs)
+
+    async def get_board_cards(self) -> list:
+        return await self._run(self.client.get_board_cards)
+
+    async def get_board_lists(self) -> list:
+        return await self._run(self.client.get_board_lists)
+
+    async def build_lists_map(self) -> dict:
+        return await self._run(self.client.build_lists_map)
+
+    async def get_list_name_by_id(self, list_id: str) -> str | None:
+        return await self._run(self.client.get_list_name_by_id, list_id)
+
+    async def get_board_snapshot(self, cards: str = "open") -> BoardSnapshot:
+        return await self._run(self.client.get_board_snapshot, cards)
+
+    async def get_cards(self, card_ids: List[str]) -> List[Dict | None]:
+        """
+        Read many single cards concurrently (None for deleted ones), in input order.
+        """
+        return list(await asyncio.gather(
+            *(self._run(self.client._get_card_if_exists, card_id) for card_id in card_ids)
+        ))
+
+
+async def fetch_sync_snapshots(
+    gmail: AsyncGmailClient,
+    trello: AsyncTrelloClient,
+    max_results: int | None = 100,
+) -> Tuple[InboxSnapshot, BoardSnapshot]:
+    """
+    Read the inbox and the board at the same time.
+    """
+    inbox, board = await asyncio.gather(
+        gmail.get_inbox_snapshot(max_results=max_results),
+        trello.get_board_snapshot(),
+    )
+    return inbox, board
@@ -0,0 +1,95 @@
+"""
+A one-request snapshot of a Trello board, indexed for the sync checks.
+
+The nested board resource returns cards, lists and labels in one response.
+In one pass over the cards we build every index the checks need, so
+"is there a card titled X with label Urgent" is a couple of dict lookups.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+def card_title(card: Dict) -> str:
+    return (card.get("name") or "").strip()
+
+
+def card_label_names(card: Dict) -> List[str]:
+    return [label.get("name") or "" for label in card.get("labels") or []]
+
+
+@dataclass
+class BoardSnapshot:
+    """
+    cards / lists / labels: what the board resource returned
+    cards_by_id: {card_id: card}
+    cards_by_title: {title: [card, ...]} (titles stripped, duplicates kept in board order)
+    cards_by_list_name: {"To Do": [card, ...], ...}
+    cards_by_label: {"Urgent": [card, ...], ...}
+    lists_by_id: {list_id: list}
+    """
+    board: Dict = field(default_factory=dict)
+    cards: List[Dict] = field(default_factory=list)
+    lists: List[Dict] = field(default_factory=list)
+    labels: List[Dict] = field(default_factory=list)
+    cards_by_id: Dict[str, Dict] = field(default_factory=dict)
+    cards_by_title: Dict[str, List[Dict]] = field(default_factory=dict)
+    cards_by_list_name: Dict[str, List[Dict]] = field(default_factory=dict)
+    cards_by_label: Dict[str, List[Dict]] = field(default_factory=dict)
+    lists_by_id: Dict[str, Dict] = field(default_factory=dict)
+
+    @classmethod
+    def from_board(cls, board: Dict) -> "BoardSnapshot":
+        """
+        Build every index from a nested board response in one pass over the cards.
+        """
+        snapshot = cls(
+            board={key: value for key, value in board.items() if key not in ("cards", "lists", "labels")},
+            cards=list(board.get("cards") or []),
+            lists=list(board.get("lists") or []),
+            labels=list(board.get("labels") or []),
+        )
+        snapshot.lists_by_id = {lst["id"]: lst for lst in snapshot.lists if lst.get("id")}
+
+        for card in snapshot.cards:
+            snapshot._index(card)
+        return snapshot
+
+    @classmethod
+    def from_cards(cls, cards: List[Dict], lists: List[Dict], labels: List[Dict] | None = None) -> "BoardSnapshot":
+        """
+        Same snapshot, for when cards and lists were fetched separately.
+        """
+        return cls.from_board({"cards": cards, "lists": lists, "labels": labels or []})
+
+    def _index(self, card: Dict) -> None:
+        if card.get("id"):
+            self.cards_by_id[card["id"]] = card
+
+        title = card_title(card)
+        if title:
+            self.cards_by_title.setdefault(title, []).append(card)
+
+        list_name = self.list_name(card)
+        if list_name is not None:
+            self.cards_by_list_name.setdefault(list_name, []).append(card)
+
+        for label_name in card_label_names(card):
+            self.cards_by_label.setdefault(label_name, []).append(card)
+
+    # ==================================================
+    # Lookups
+    # ==================================================
+
+    def list_name(self, card: Dict) -> str | None:
+        lst = self.lists_by_id.get(card.get("idList"))
+        return lst.get("name") if lst else None
+
+    def cards_titled(self, title: str) -> List[Dict]:
+        return self.cards_by_title.get(title.strip(), [])
+
+    def cards_titled_with_label(self, title: str, label: str) -> List[Dict]:
+        return [card for card in self.cards_titled(title) if label in card_label_names(card)]
+
+    def __len__(self) -> int:
+        return len(self.cards)
@@ -0,0 +1,257 @@
+"""
+Record / replay of HTTP traffic for GmailClient and TrelloClient.
+
+In "record" mode every request still goes to the real API and the response
+is saved into a cassette (a JSON file). In "replay" mode the same requests
+are answered from the cassette, without any network access, so the API
+tests can run offline and without rate limits:
+
+    cassette = Cassette("tests_api/cassettes/trello.json", mode=RECORD)
+    client = TrelloClient(cassette=cassette)
+    ...
+    cassette.save()
+
+Requests are matched by method, URL (without credentials, query sorted),
+If-None-Match and body. Identical requests are answered in the recorded
+order, the last answer repeats once they run out.
+Credentials are never written: key / token query parameters are dropped
+and request headers are not stored.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httplib2
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+# Never stored in a cassette
+SECRET_PARAMS = {"key", "token", "access_token"}
+
+# Hop-by-hop or already applied by the HTTP library (bodies are stored decoded)
+SKIPPED_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie", "connection"}
+
+# The request lines inside a multipart batch body (boundaries and Content-IDs are random)
+_BATCH_REQUEST_LINE = re.compile(r"^(?:GET|POST|PUT|PATCH|DELETE) \S+", re.MULTILINE)
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised in replay mode for a request that was never recorded.
+    """
+
+
+def _clean_url(url: str) -> str:
+    """
+    The URL without credentials, with a sorted query, so it is stable across runs.
+    """
+    split = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(split.query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    return urlunsplit((split.scheme, split.netloc, split.path, urlencode(params), ""))
+
+
+def _clean_request_line(line: str) -> str:
+    method, path = line.split(" ", 1)
+    return f"{method} {_clean_url(path)}"
+
+
+def _body_key(body) -> str:
+    """
+    The part of a request body used for matching, batch bodies are reduced to their request lines.
+    """
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("UTF-8", errors="replace")
+    batch_lines = _BATCH_REQUEST_LINE.findall(body)
+    if batch_lines:
+        return "\n".join(_clean_request_line(line) for line in batch_lines)
+    return body
+
+
+def _text(body) -> str:
+    if isinstance(body, bytes):
+        return body.decode("UTF-8", errors="replace")
+    return body or ""
+
+
+class Cassette:
+    """
+    One file of recorded interactions.
+
+    path: the JSON file
+    mode: RECORD (call the API and save answers) or REPLAY (answer from the file)
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.interactions: List[Dict] = []
+        self._lock = threading.Lock()
+
+        # key -> recorded responses, and how many of them were already replayed
+        self._responses: Dict[Tuple, List[Dict]] = defaultdict(list)
+        self._played: Dict[Tuple, int] = defaultdict(int)
+
+        if mode == REPLAY:
+            self.load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @staticmethod
+    def key(method: str, url: str, body=None, if_none_match: str | None = None) -> Tuple:
+        return method.upper(), _clean_url(url), if_none_match or "", _body_key(body)
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"no cassette at {self.path}, record one first")
+        with open(self.path, "r", encoding="UTF-8") as f:
+            self.interactions = json.load(f)["interactions"]
+        self._responses.clear()
+        self._played.clear()
+        for interaction in self.interactions:
+            request = interaction["request"]
+            key = self.key(request["method"], request["url"], request["body"], request["if_none_match"])
+            self._responses[key].append(interaction["response"])
+
+    def save(self) -> None:
+        """
+        Write the recorded interactions (atomically).
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock, open(tmp_path, "w", encoding="UTF-8") as f:
+            json.dump({"interactions": self.interactions}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        body,
+        if_none_match: str | None,
+        status: int,
+        headers: Dict[str, str],
+        content,
+    ) -> None:
+        response = {
+            "status": status,
+            "headers": {
+                name.lower(): value for name, value in headers.items()
+                if name.lower() not in SKIPPED_RESPONSE_HEADERS
+            },
+            "body": _text(content),
+        }
+        request = {
+            "method": method.upper(),
+            "url": _clean_url(url),
+            "if_none_match": if_none_match or "",
+            "body": _body_key(body),
+        }
+        with self._lock:
+            self.interactions.append({"request": request, "response": response})
+
+    def play(self, method: str, url: str, body=None, if_none_match: str | None = None) -> Dict:
+        """
+        The recorded response for this request: {"status", "headers", "body"}.
+        """
+        key = self.key(method, url, body, if_none_match)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise CassetteMiss(f"{method.upper()} {_clean_url(url)} is not in {self.path}")
+            index = min(self._played[key], len(responses) - 1)
+            self._played[key] += 1
+            return responses[index]
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.recording:
+            self.save()
+
+
+class CassetteHttp:
+    """
+    httplib2.Http look-alike for googleapiclient.
+
+    http: the real (authorized) Http to record from, not needed for replay
+    """
+
+    def __init__(self, cassette: Cassette, http=None):
+        if cassette.recording and http is None:
+            raise ValueError("recording needs a real http object")
+        self.cassette = cassette
+        self.http = http
+        # googleapiclient looks for credentials on the http object
+        self.credentials = getattr(http, "credentials", None)
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        if_none_match = (headers or {}).get("If-None-Match") or (headers or {}).get("if-none-match")
+
+        if not self.cassette.recording:
+            recorded = self.cassette.play(method, uri, body, if_none_match)
+            response = httplib2.Response({**recorded["headers"], "status": str(recorded["status"])})
+            return response, recorded["body"].encode("UTF-8")
+
+        response, content = self.http.request(
+            uri, method=method, body=body, headers=headers,
+            redirections=redirections, connection_type=connection_type,
+        )
+        headers_out = {name: value for name, value in response.items() if name != "status"}
+        self.cassette.record(method, uri, body, if_none_match, response.status, headers_out, content)
+        return response, content
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    requests transport adapter for TrelloClient's session.
+
+    adapter: the real adapter to record from (default: a new HTTPAdapter)
+    """
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter | None = None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        if_none_match = request.headers.get("If-None-Match")
+
+        if not self.cassette.recording:
+            recorded = self.cassette.play(request.method, request.url, request.body, if_none_match)
+            response = requests.Response()
+            response.status_code = recorded["status"]
+            response.headers = CaseInsensitiveDict(recorded["headers"])
+            response._content = recorded["body"].encode("UTF-8")
+            response.encoding = "UTF-8"
+            response.url = request.url
+            response.request = request
+            return response
+
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(
+            request.method, request.url, request.body, if_none_match,
+            response.status_code, dict(response.headers), response.content,
+        )
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
@@ -0,0 +1,200 @@
+"""
+Run the Gmail -> Trello sync checks for many (mailbox, board) pairs.
+
+Every pair is checked in its own worker process, so a fleet of boards takes
+about as long as the slowest pair instead of the sum of all of them.
+Inside a worker the inbox and the board are read at the same time.
+
+Pairs come from SYNC_PAIRS_FILE (JSON), for example:
+
+    [
+        {"name": "team-a", "token_file": "./tokens/team-a.json", "board_id": "2GzdgPlw"},
+        {"name": "team-b", "token_file": "./tokens/team-b.json", "board_id": "Xy12AbCd"}
+    ]
+
+Run from the repository root with:  python -m api.fleet
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+from api.async_clients import AsyncGmailClient, AsyncTrelloClient, fetch_sync_snapshots
+from api.gmail_client import GmailClient
+from api.reconcile import Reconciler
+from api.trello_client import TRELLO_BASE_URL, TrelloClient
+from config import GMAIL_TOKEN_FILE, SYNC_PAIRS_FILE, TRELLO_API_KEY, TRELLO_API_TOKEN, TRELLO_BOARD_ID
+
+# The work is network bound, so by default every pair gets its own worker (up to this many)
+DEFAULT_MAX_WORKERS = 16
+
+
+@dataclass(frozen=True)
+class SyncPair:
+    """
+    One mailbox and the board its tasks are synced to.
+    trello_api_key / trello_api_token: None = the ones from the environment
+    trello_base_url / gmail_api_endpoint: other API roots (e.g. local stand-ins)
+    token_file=None sends Gmail requests without credentials
+    """
+    name: str
+    board_id: str
+    token_file: str | None = GMAIL_TOKEN_FILE
+    trello_api_key: str | None = None
+    trello_api_token: str | None = None
+    trello_base_url: str = TRELLO_BASE_URL
+    gmail_api_endpoint: str | None = None
+
+    def gmail_client(self, **kwargs) -> GmailClient:
+        return GmailClient(token_file=self.token_file, api_endpoint=self.gmail_api_endpoint, **kwargs)
+
+    def trello_client(self, **kwargs) -> TrelloClient:
+        return TrelloClient(
+            board_id=self.board_id,
+            api_key=self.trello_api_key if self.trello_api_key is not None else TRELLO_API_KEY,
+            api_token=self.trello_api_token if self.trello_api_token is not None else TRELLO_API_TOKEN,
+            base_url=self.trello_base_url,
+            **kwargs,
+        )
+
+
+DEFAULT_PAIR = SyncPair(name="default", board_id=TRELLO_BOARD_ID, token_file=GMAIL_TOKEN_FILE)
+
+
+def load_sync_pairs(path: str = SYNC_PAIRS_FILE) -> List[SyncPair]:
+    """
+    Read the pairs from a JSON file, or just the default pair from config.py if there is no file.
+    """
+    if not os.path.exists(path):
+        return [DEFAULT_PAIR]
+    with open(path, "r", encoding="UTF-8") as f:
+        entries = json.load(f)
+
+    pairs = [SyncPair(**entry) for entry in entries]
+    names = [pair.name for pair in pairs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"pair names must be unique: {names}")
+    return pairs
+
+
+# ==================================================
+# Checks for one pair
+# ==================================================
+
+@dataclass
+class PairResult:
+    """
+    The outcome of checking one pair.
+    error: set when the pair could not be checked at all (e.g. bad credentials)
+    """
+    name: str
+    problems: List[str] = field(default_factory=list)
+    emails: int = 0
+    cards: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.problems
+
+
+def check_pair(pair: SyncPair, max_results: int | None = 100) -> PairResult:
+    """
+    Read one inbox and its board (concurrently) and reconcile them.
+    Never raises, errors are reported in the result.
+    Cards without a matching email are not reported, the inbox read stops
+    after max_results emails, so older cards are expected.
+    """
+    start = time.monotonic()
+    result = PairResult(name=pair.name)
+    try:
+        inbox, board = asyncio.run(fetch_sync_snapshots(
+            AsyncGmailClient(pair.gmail_client()),
+            AsyncTrelloClient(pair.trello_client()),
+            max_results=max_results,
+        ))
+        result.emails = len(inbox.emails)
+        result.cards = len(board)
+        result.problems = Reconciler(check_unexpected=False).reconcile(inbox, board).messages()
+    except Exception as error:
+        result.error = f"{type(error).__name__}: {error}"
+    result.seconds = time.monotonic() - start
+    return result
+
+
+# ==================================================
+# The whole fleet
+# ==================================================
+
+@dataclass
+class FleetReport:
+    """
+    results: one PairResult per pair, in the same order as the pairs
+    """
+    results: List[PairResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def failed(self) -> List[PairResult]:
+        return [result for result in self.results if not result.ok]
+
+    def by_name(self) -> Dict[str, PairResult]:
+        return {result.name: result for result in self.results}
+
+    def summary(self) -> str:
+        lines = [f"{len(self.results)} pairs checked in {self.seconds:.1f}s, {len(self.failed)} failed"]
+        for result in self.results:
+            status = "OK" if result.ok else ("ERROR" if result.error else "FAIL")
+            lines.append(
+                f"- [{status}] {result.name}: {result.emails} emails, {result.cards} cards, "
+                f"{len(result.problems)} problems ({result.seconds:.1f}s)"
+            )
+            if result.error:
+                lines.append(f"    {result.error}")
+            lines.extend(f"    {problem}" for problem in result.problems)
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({"seconds": self.seconds, "results": [asdict(result) for result in self.results]}, indent=2)
+
+
+def run_fleet(
+    pairs: List[SyncPair],
+    max_workers: int | None = None,
+    max_results: int | None = 100,
+    processes: bool = True,
+) -> FleetReport:
+    """
+    Check every pair in parallel and collect the results (in pair order).
+    max_workers: default = one worker per pair, at most DEFAULT_MAX_WORKERS
+    processes: False runs the pairs on threads instead (cheaper for a couple of pairs)
+    """
+    start = time.monotonic()
+    if not pairs:
+        return FleetReport()
+
+    workers = min(len(pairs), max_workers or DEFAULT_MAX_WORKERS)
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        results = list(executor.map(check_pair, pairs, [max_results] * len(pairs)))
+
+    return FleetReport(results=results, seconds=time.monotonic() - start)
+
+
+def main() -> int:
+    report = run_fleet(load_sync_pairs())
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,14 +3,122 @@ A simple Gmail API wrapper for reading emails.
 We only Read emails, we don't send or modify anything.
 """
 
-import base64
-from typing import List, Dict
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
+import queue
+import threading
+import time
+from typing import Callable, List, Dict, Iterable, Iterator, TypeVar
 
+import httplib2
+from google.auth.credentials import AnonymousCredentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+
+from api.cassette import Cassette, CassetteHttp
+from api.gmail_service import SCOPES, SharedCredentials, build_gmail_service
+from api.gmail_sync import InboxSync, SyncResult
+from api.grouping import group_by_subject, grouping_query, has_subject_words, subject_search_term
+from api.helpers import has_subject_prefix, is_urgent_body
+from api.message_cache import MessageCache, DEFAULT_MAX_ENTRIES
+from api.mime import DEFAULT_MAX_BODY_BYTES, extract_body_text
+from api.urgency import DEFAULT_CLASSIFIER, UrgencyClassifier
+from api.rate_limit import RetryPolicy, TokenBucket, parse_retry_after, run_in_order
 from config import GMAIL_TOKEN_FILE, GMAIL_CREDENTIALS_FILE
 
-SCOPES = ["https://mail.google.com/"]
+# Gmail accepts up to 100 calls per batch, but recommends staying at 50
+# or below to avoid rate limiting on the batched sub-requests.
+DEFAULT_BATCH_SIZE = 50
+
+T = TypeVar("T")
+
+# Gmail quota units charged per call (per-user limit is 250 units per second).
+# A batch is charged for every request inside it.
+QUOTA_COSTS = {
+    "messages.get": 5,
+    "messages.list": 5,
+    "history.list": 2,
+    "getProfile": 1,
+}
+DEFAULT_QUOTA_UNITS_PER_SECOND = 250
+
+# messages.list returns at most 500 ids per page
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# How many pages are fetched in the background while the caller
+# is still processing the current one
+DEFAULT_PREFETCH_PAGES = 1
+
+# Marks the end of the prefetch queue
+_END_OF_PAGES = object()
+
+INBOX_QUERY = "in:inbox"
+
+# Partial-response field masks: only ask Gmail for what we actually read
+LIST_FIELDS = "messages/id,nextPageToken"
+MESSAGE_FIELDS = "id,labelIds,internalDate,payload(mimeType,headers(name,value),body/data,parts)"
+# Labels can change, so messages read from the cache only fetch these
+LABEL_FIELDS = "id,labelIds"
+
+
+def _prefetch(pages: Iterator[List[Dict]], depth: int) -> Iterator[List[Dict]]:
+    """
+    Consume 'pages' in a background thread and keep up to 'depth' of them ready.
+    A page that is being fetched counts as ready, so the thread never runs
+    more than 'depth' pages ahead of the caller.
+    Errors raised while fetching are re-raised in the caller's thread.
+    Stopping the iteration early also stops the background thread.
+    """
+    ready: queue.Queue = queue.Queue()
+    slots = threading.Semaphore(depth)
+    stop = threading.Event()
+
+    def _wait_for_slot() -> bool:
+        # Short timeouts so the thread notices when the consumer went away
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return not stop.is_set()
+        return False
+
+    def _producer() -> None:
+        try:
+            while _wait_for_slot():
+                page = next(pages, _END_OF_PAGES)
+                ready.put(page)
+                if page is _END_OF_PAGES:
+                    return
+        except Exception as error:
+            ready.put(error)
+
+    thread = threading.Thread(target=_producer, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = ready.get()
+            slots.release()
+            if item is _END_OF_PAGES:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class GmailBatchError(Exception):
+    """
+    Raised when some messages could not be fetched inside a batch request.
+    failed: {msg_id: HttpError} for every message that is still failing.
+    """
+
+    def __init__(self, failed: Dict[str, HttpError]):
+        self.failed = failed
+        super().__init__(
+            f"Failed to fetch {len(failed)} message(s) in batch: {sorted(failed)}"
+        )
+
 
 class GmailClient:
     """
@@ -18,27 +126,366 @@ class GmailClient:
     Uses token.json and credentials.json that were created by main.py.
     """
 
-    def __init__(self, token_file: str = GMAIL_TOKEN_FILE):
+    def __init__(
+        self,
+        token_file: str | None = GMAIL_TOKEN_FILE,
+        batched: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_uri: str | None = None,
+        concurrency: int = 1,
+        quota_units_per_second: float | None = DEFAULT_QUOTA_UNITS_PER_SECOND,
+        retry_policy: RetryPolicy | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        sync_state_file: str | None = None,
+        cache_file: str | None = None,
+        cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_body_bytes: int | None = DEFAULT_MAX_BODY_BYTES,
+        urgency_classifier: UrgencyClassifier = DEFAULT_CLASSIFIER,
+        discovery_file: str | None = None,
+        api_endpoint: str | None = None,
+        service=None,
+        cassette: Cassette | None = None,
+    ):
         """
         initialize the Gmail service object with given token file.
+
+        batched: fetch messages with Gmail batch requests instead of one call per message
+        batch_size: how many message gets are grouped into one batch request
+        batch_uri: override for the batch endpoint (e.g. a local stand-in in tests)
+        concurrency: how many requests (or batches) may be in flight at once
+        quota_units_per_second: client-side Gmail quota budget, None = unlimited
+        retry_policy: backoff for 429 / 5xx answers, also used for batch sub-requests
+        page_size: how many message ids are listed per page (max 500)
+        prefetch_pages: how many pages are fetched ahead in the background (0 = off)
+        sync_state_file: turns on incremental mode - inbox reads only download
+                         what changed since the checkpoint saved in this file
+        cache_file / cache_max_entries: keep parsed messages in a local SQLite cache,
+                         so only message ids that were never seen are downloaded
+        max_body_bytes: decode at most this much of each body (None = everything)
+        urgency_classifier: decides which bodies are urgent (default: the word "urgent")
+        discovery_file: a locally saved Gmail discovery document
+                        (default: the copy bundled with google-api-python-client)
+        api_endpoint: talk to another Gmail API root (e.g. a local stand-in),
+                      batch requests go to {api_endpoint}/batch/gmail/v1
+        service: an already built Gmail service (skips loading token_file)
+        cassette: record every response into this cassette, or answer from it
+                  in replay mode (token_file is not needed then)
+        token_file=None sends requests without credentials (only useful with api_endpoint)
+
+        Nothing is loaded here: credentials and the service are created
+        on first use, and credentials are shared by all clients of a token file.
         """
-        # Load credentials from the token file
-        self.creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        if prefetch_pages < 0:
+            raise ValueError("prefetch_pages can't be negative")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
 
-        #Build the Gmail service object
-        self.service = build("gmail", "v1", credentials=self.creds)
+        if api_endpoint and batch_uri is None:
+            batch_uri = api_endpoint.rstrip("/") + "/batch/gmail/v1"
 
-    def _get_message(self, msg_id: str) -> Dict:
+        self.batched = batched
+        self.batch_size = batch_size
+        self.batch_uri = batch_uri
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.quota = TokenBucket(quota_units_per_second) if quota_units_per_second else None
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.max_body_bytes = max_body_bytes
+        self.urgency_classifier = urgency_classifier
+
+        self.token_file = token_file
+        self.discovery_file = discovery_file
+        self.api_endpoint = api_endpoint
+        self.cassette = cassette
+        self._service = service
+        self._service_lock = threading.Lock()
+
+        self.inbox_sync = InboxSync(self, sync_state_file) if sync_state_file else None
+        self.cache = MessageCache(cache_file, cache_max_entries, max_body_bytes) if cache_file else None
+
+        # Worker threads get their own HTTP connection (httplib2 is not thread-safe)
+        self._local = threading.local()
+        self._owner_thread = threading.get_ident()
+
+    @property
+    def creds(self):
         """
-        internal helper to fetch a full message by its ID
+        The credentials used by this client (shared per token file).
+        """
+        if self._service is not None:
+            # An injected service brings its own credentials
+            return getattr(self._service._http, "credentials", None)
+        if self.token_file is None or (self.cassette is not None and not self.cassette.recording):
+            return AnonymousCredentials()
+        return SharedCredentials.for_token_file(self.token_file).get()
+
+    @property
+    def service(self):
+        """
+        The Gmail service, built on first use from the cached discovery document.
         """
-        message = self.service.users().messages().get(
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+                    http = self._new_http() if self.cassette is not None else None
+                    self._service = build_gmail_service(self.creds, self.discovery_file, client_options, http)
+        return self._service
+
+    # ==================================================
+    # Request execution: quota, retries, per-thread connections
+    # ==================================================
+
+    def _thread_http(self):
+        """
+        The HTTP object to use from the current thread.
+        None means the service's default one, which is fine while we are serial
+        and on the thread that created the client (other threads, e.g. the
+        async wrappers' workers, always get their own connection).
+        """
+        if self.concurrency <= 1 and threading.get_ident() == self._owner_thread:
+            return None
+
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._new_http()
+            self._local.http = http
+        return http
+
+    def _new_http(self):
+        """
+        A new authorized HTTP connection (going through the cassette if there is one).
+        """
+        if self.cassette is None:
+            return AuthorizedHttp(self.creds, http=httplib2.Http())
+        if not self.cassette.recording:
+            return CassetteHttp(self.cassette)
+        return CassetteHttp(self.cassette, AuthorizedHttp(self.creds, http=httplib2.Http()))
+
+    def _charge(self, units: int) -> None:
+        """
+        Wait until the quota budget allows spending 'units'.
+        """
+        if self.quota is not None:
+            self.quota.acquire(units)
+
+    def _back_off(self, error: HttpError, attempt: int) -> None:
+        """
+        Sleep before retry number 'attempt'.
+        On 429 the whole client pauses, not only this request.
+        """
+        delay = self.retry_policy.delay(attempt, parse_retry_after(error.resp.get("retry-after")))
+        if error.resp.status == 429 and self.quota is not None:
+            self.quota.pause(delay)
+        time.sleep(delay)
+
+    def _with_retries(self, send: Callable[[], T], units: int) -> T:
+        """
+        Charge the quota and call send(), retrying on 429 / 5xx.
+        """
+        attempt = 0
+        while True:
+            self._charge(units)
+            try:
+                return send()
+            except HttpError as error:
+                if not self.retry_policy.should_retry(error.resp.status, attempt):
+                    raise
+                attempt += 1
+                self._back_off(error, attempt)
+
+    def _execute(self, request, method: str) -> Dict:
+        """
+        Execute a single API request, e.g. _execute(request, "messages.list").
+        """
+        return self._with_retries(
+            lambda: request.execute(http=self._thread_http()),
+            QUOTA_COSTS[method],
+        )
+
+    def _message_request(self, msg_id: str, labels_only: bool = False):
+        """
+        internal helper that builds (but does not execute) a full message get
+        labels_only: a minimal get of just the id and labels
+        """
+        if labels_only:
+            return self.service.users().messages().get(
+                userId="me",
+                id=msg_id,
+                format="minimal",
+                fields=LABEL_FIELDS
+            )
+        return self.service.users().messages().get(
             userId="me",
             id=msg_id,
-            format="full"
-        ).execute()
+            format="full",
+            fields=MESSAGE_FIELDS
+        )
+
+    def _get_message(self, msg_id: str, labels_only: bool = False) -> Dict:
+        """
+        internal helper to fetch a full message by its ID
+        """
+        message = self._execute(self._message_request(msg_id, labels_only), "messages.get")
         return message
 
+    def _get_message_if_exists(self, msg_id: str, labels_only: bool = False) -> Dict | None:
+        """
+        Same as _get_message, but returns None for deleted messages (404).
+        """
+        try:
+            return self._get_message(msg_id, labels_only)
+        except HttpError as error:
+            if error.resp.status == 404:
+                return None
+            raise
+
+    def _new_batch(self, callback) -> BatchHttpRequest:
+        """
+        internal helper to create an empty batch request
+        """
+        if self.batch_uri:
+            return BatchHttpRequest(callback=callback, batch_uri=self.batch_uri)
+        return self.service.new_batch_http_request(callback=callback)
+
+    def _execute_batch(
+        self,
+        msg_ids: List[str],
+        results: Dict[str, Dict],
+        labels_only: bool = False,
+    ) -> Dict[str, HttpError]:
+        """
+        Send one batch request for the given ids.
+        Successful messages are stored into 'results',
+        failed ones are returned as {msg_id: error}.
+        """
+        errors: Dict[str, HttpError] = {}
+
+        def _on_response(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+            else:
+                results[request_id] = response
+
+        def _send() -> None:
+            errors.clear()
+            batch = self._new_batch(_on_response)
+            for msg_id in msg_ids:
+                batch.add(self._message_request(msg_id, labels_only), request_id=msg_id)
+            batch.execute(http=self._thread_http())
+
+        # Retries here cover the batch request itself failing as a whole
+        self._with_retries(_send, QUOTA_COSTS["messages.get"] * len(msg_ids))
+        return errors
+
+    def _get_messages_batched(self, msg_ids: List[str], labels_only: bool = False) -> Dict[str, Dict]:
+        """
+        Fetch full messages using Gmail batch requests.
+        Only the sub-requests that failed with a retryable status are sent again.
+        Messages that no longer exist (404) are skipped.
+        returns: {msg_id: full_message}
+        """
+        results: Dict[str, Dict] = {}
+        # dict.fromkeys removes duplicates and keeps the order
+        pending = list(dict.fromkeys(msg_ids))
+        attempt = 0
+
+        while pending:
+            retryable: Dict[str, HttpError] = {}
+
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                errors = self._execute_batch(chunk, results, labels_only)
+
+                for msg_id, error in errors.items():
+                    status = error.resp.status
+                    if status == 404:
+                        continue  # deleted between list and get
+                    if not self.retry_policy.is_retryable(status):
+                        raise GmailBatchError({msg_id: error})
+                    retryable[msg_id] = error
+
+            if not retryable:
+                break
+
+            if attempt >= self.retry_policy.max_retries:
+                raise GmailBatchError(retryable)
+            attempt += 1
+
+            # Back off before sending only the failed ones again
+            self._back_off(next(iter(retryable.values())), attempt)
+            pending = list(retryable)
+
+        return results
+
+    def _get_messages(self, msg_ids: List[str], labels_only: bool = False) -> List[Dict]:
+        """
+        Fetch full messages for the given ids, in the same order.
+        Uses batch requests when the client is in batched mode.
+        With concurrency > 1, up to that many gets (or batches) run at once.
+        Messages that no longer exist are left out.
+        labels_only: only fetch {'id', 'labelIds'} of each message
+        """
+        if not self.batched:
+            fetched = run_in_order(
+                lambda msg_id: self._get_message_if_exists(msg_id, labels_only), msg_ids, self.concurrency
+            )
+            return [msg for msg in fetched if msg is not None]
+
+        chunks = [
+            msg_ids[start:start + self.batch_size]
+            for start in range(0, len(msg_ids), self.batch_size)
+        ]
+        by_id: Dict[str, Dict] = {}
+        chunk_results = run_in_order(
+            lambda chunk: self._get_messages_batched(chunk, labels_only), chunks, self.concurrency
+        )
+        for chunk_result in chunk_results:
+            by_id.update(chunk_result)
+
+        return [by_id[msg_id] for msg_id in msg_ids if msg_id in by_id]
+
+    def _parse_email(self, msg: Dict) -> Dict:
+        """
+        Convert a full Gmail message into our simple email dictionary.
+        """
+        return {
+            "id": msg.get("id"),
+            "subject": self._get_subject(msg),
+            "body": self._get_body_text(msg).strip(),
+            "labels": msg.get("labelIds", [])
+        }
+
+    def _get_emails(self, msg_ids: List[str]) -> List[Dict]:
+        """
+        Fetch and parse emails for the given ids, in the same order.
+        With a cache, only the ids that are not cached yet are downloaded in full.
+        Cached ones only fetch their current labels (labels change, subject and body don't).
+        """
+        if self.cache is None:
+            return [self._parse_email(full_msg) for full_msg in self._get_messages(msg_ids)]
+
+        cached = self.cache.get_many(msg_ids)
+        missing = [msg_id for msg_id in msg_ids if msg_id not in cached]
+
+        by_id: Dict[str, Dict] = {}
+        if cached:
+            # Cached messages deleted since then are left out (404)
+            for msg in self._get_messages(list(cached), labels_only=True):
+                by_id[msg["id"]] = {**cached[msg["id"]], "labels": msg.get("labelIds", [])}
+        if missing:
+            fetched = [self._parse_email(full_msg) for full_msg in self._get_messages(missing)]
+            self.cache.put_many(fetched)
+            by_id.update((email["id"], email) for email in fetched)
+
+        return [by_id[msg_id] for msg_id in msg_ids if msg_id in by_id]
+
     def _get_subject(self, msg: Dict) -> str:
         """
         Extract the subject from the email message headers.
@@ -51,91 +498,188 @@ class GmailClient:
     
     def _get_body_text(self, msg: Dict) -> str:
         """
-        Extract plain text body from a Gmail message
-        """
-        payload = msg.get("payload", {})
-        body_data = None
-
-        # For multipat messages, find the text/plain part
-        parts = payload.get("parts", [])
-        if parts:
-            #looking for text/plain part
-            for part in parts:
-                if part.get("mimeType") == "text/plain":
-                    body_data = part.get("body", {}).get("data")
-                    break
-        else:
-            #Single part message
-            body_data = payload.get("body", {}).get("data")
-        if not body_data:
-            return ""
-        
-        # Decode from base64url
-        body_bytes = base64.urlsafe_b64decode(body_data.encode("UTF-8"))
-        body_text = body_bytes.decode("UTF-8", errors="ignore")
-        return body_text
+        Extract plain text body from a Gmail message.
+        Looks through the whole MIME tree, falls back to the HTML part
+        converted to text, and decodes at most max_body_bytes.
+        """
+        return extract_body_text(msg.get("payload", {}), self.max_body_bytes)
     
-    def get_inbox_emails(self, max_results: int = 50) -> List[Dict]:
+    def _iter_message_id_pages(self, query: str, max_results: int | None) -> Iterator[List[str]]:
         """
-        get a list of emails from the inbox
-        each mail has a dictionary with keys: 'subject' and 'body'
+        Follow messages.list pagination lazily and yield one list of ids per page.
+        Stops after max_results ids (None = no limit).
         """
-        result = self.service.users().messages().list(
-            userId="me",
-            q="in:inbox",
-            maxResults=max_results
-        ).execute()
+        page_token = None
+        remaining = max_results
+
+        while remaining is None or remaining > 0:
+            page_size = self.page_size if remaining is None else min(self.page_size, remaining)
+            request = self.service.users().messages().list(
+                userId="me",
+                q=query,
+                maxResults=page_size,
+                pageToken=page_token,
+                fields=LIST_FIELDS
+            )
+            result = self._execute(request, "messages.list")
+
+            msg_ids = [msg_meta.get("id") for msg_meta in result.get("messages", [])]
+            if remaining is not None:
+                msg_ids = msg_ids[:remaining]
+                remaining -= len(msg_ids)
+            if msg_ids:
+                yield msg_ids
+
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return
+
+    def _iter_email_pages(self, query: str, max_results: int | None) -> Iterator[List[Dict]]:
+        """
+        Yield parsed emails one page at a time.
+        """
+        for msg_ids in self._iter_message_id_pages(query, max_results):
+            yield self._get_emails(msg_ids)
+
+    def iter_inbox_emails(
+        self,
+        max_results: int | None = None,
+        prefetch_pages: int | None = None,
+        query: str = "",
+        candidate: Callable[[Dict], bool] | None = None,
+    ) -> Iterator[Dict]:
+        """
+        Lazily yield inbox emails, following pagination page by page.
+        Only a few pages are held in memory at a time, so this works
+        for very large inboxes.
+
+        While the caller handles the current page, the next 'prefetch_pages'
+        pages are fetched in a background thread (default: client setting).
+        Don't use the same client for other calls inside the loop while
+        prefetching, the underlying HTTP connection is not thread-safe.
+
+        query: extra Gmail search terms, combined with 'in:inbox'.
+        They narrow down what is downloaded, callers still confirm matches locally.
+
+        In incremental mode the inbox is synced first and then read from the local store.
+        There is no Gmail search there, so 'candidate' (the same filter as 'query',
+        checked on a parsed email) is applied before max_results. That way
+        max_results counts the same emails in both modes.
+        """
+        if self.inbox_sync is not None:
+            # Incremental mode: update the local store, then read from it
+            self.inbox_sync.sync()
+            emails = self.inbox_sync.emails()
+            if query and candidate is not None:
+                emails = [email for email in emails if candidate(email)]
+            yield from emails[:max_results]
+            return
 
-        messages = result.get("messages", [])
-        emails: List[Dict] = []
+        if prefetch_pages is None:
+            prefetch_pages = self.prefetch_pages
 
-        for msg_meta in messages:
-            msg_id = msg_meta.get("id")
-            full_msg = self._get_message(msg_id)
-            subject = self._get_subject(full_msg)
-            body = self._get_body_text(full_msg).strip()
+        pages = self._iter_email_pages(f"{INBOX_QUERY} {query}".strip(), max_results)
+        if prefetch_pages > 0:
+            pages = _prefetch(pages, prefetch_pages)
 
-            emails.append({
-                "subject": subject,
-                "body": body
-            })
+        for page in pages:
+            yield from page
 
-        return emails
+    def sync_inbox(self) -> SyncResult:
+        """
+        Incremental mode only: apply the changes since the last checkpoint.
+        Falls back to a full resync when the checkpoint has expired.
+        """
+        if self.inbox_sync is None:
+            raise RuntimeError("sync_inbox() needs a client created with sync_state_file")
+        return self.inbox_sync.sync()
+
+    def get_inbox_emails(self, max_results: int | None = 50) -> List[Dict]:
+        """
+        get a list of emails from the inbox
+        each mail has a dictionary with keys: 'id', 'subject', 'body' and 'labels'
+        max_results=None reads the whole inbox
+        """
+        return list(self.iter_inbox_emails(max_results=max_results))
         
-    def get_urgent_emails(self, max_results: int = 50) -> List[Dict]:
+    def get_urgent_emails(
+        self,
+        max_results: int | None = 50,
+        subject_prefix: str | None = None,
+        pushdown: bool = True,
+    ) -> List[Dict]:
         """
         Return emails which body contains the word "urgent"
-        each item has: subject and body
+        (or whatever the client's urgency classifier looks for)
+        each item has: id, subject, body and labels
+
+        subject_prefix: only emails whose subject starts with it (e.g. "Task:")
+        pushdown: let Gmail search do the first filtering, so only candidate
+                  messages are downloaded. The classifier makes the final call.
+        max_results: how many candidate emails are read from the inbox
+                     (emails matching the pushed-down search, in both live and incremental mode)
         """
+        emails = self.iter_inbox_emails(
+            max_results=max_results,
+            query=self._urgent_query(subject_prefix, pushdown),
+            candidate=self._urgent_candidate(subject_prefix),
+        )
+        return self._filter_urgent(emails, subject_prefix)
 
-        all_emails = self.get_inbox_emails(max_results=max_results)
+    def _urgent_query(self, subject_prefix: str | None, pushdown: bool) -> str:
+        """
+        The Gmail search terms get_urgent_emails() pushes down ('' without pushdown).
+        """
+        if not pushdown:
+            return ""
+        terms = [self.urgency_classifier.search_query()]
+        if subject_prefix:
+            terms.append(subject_search_term(subject_prefix))
+        return " ".join(terms)
+
+    def _urgent_candidate(self, subject_prefix: str | None) -> Callable[[Dict], bool]:
+        """
+        Local version of _urgent_query(), for incremental mode.
+        """
+        def _candidate(email: Dict) -> bool:
+            if subject_prefix and not has_subject_words(email["subject"], subject_prefix):
+                return False
+            # Gmail search looks at the subject too
+            return self.urgency_classifier.mentions(f"{email['subject']} {email['body']}")
+        return _candidate
+
+    def _filter_urgent(self, emails: Iterable[Dict], subject_prefix: str | None) -> List[Dict]:
         urgent_emails: List[Dict] = []
 
-        for email in all_emails:
-            body_lower = email["body"].lower()
-            if "urgent" in body_lower:
+        for email in emails:
+            # Confirm locally, the search is only a pre-filter
+            if subject_prefix and not has_subject_prefix(email["subject"], subject_prefix):
+                continue
+            if is_urgent_body(email["body"], self.urgency_classifier):
                 urgent_emails.append(email)
 
         return urgent_emails
         
-    def get_emails_grouped_by_subject(self, max_results: int = 50) -> Dict[str, List[str]]:
+    def get_emails_grouped_by_subject(
+        self,
+        max_results: int | None = 50,
+        subject_prefix: str | None = None,
+        pushdown: bool = True,
+        normalize_bodies: bool = False,
+    ) -> Dict[str, List[str]]:
         """
         Groupin emails by subject
         will retrun: {subject: [body1, body2, ...],...}
         Will be used to merge messages 
+
+        subject_prefix: only group emails whose subject starts with it (e.g. "Task:"),
+                        with pushdown the prefix is also sent to Gmail search
+        normalize_bodies: bodies that only differ in whitespace or quoted
+                          reply lines count as the same body
         """
-        all_emails = self.get_inbox_emails(max_results=max_results)
-        grouped: Dict[str, List[str]] = {}
-        for email in all_emails:
-            subject = email["subject"].strip()
-            body = email["body"].strip()
-
-            if subject not in grouped:
-                grouped[subject] = []
-                
-            # Avoiding duplicates of the exact same body text
-            if body and body not in grouped[subject]:
-                grouped[subject].append(body)
-        return grouped
-
-        
\ No newline at end of file
+        emails = self.iter_inbox_emails(
+            max_results=max_results,
+            query=grouping_query(subject_prefix, pushdown),
+            candidate=lambda email: has_subject_words(email["subject"], subject_prefix),
+        )
+        return group_by_subject(emails, subject_prefix, normalize_bodies)
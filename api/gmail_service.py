@@ -0,0 +1,137 @@
+"""
+Fast startup helpers for GmailClient.
+
+- The Gmail discovery document is read from disk and parsed only once per
+  process, then every client builds its service from the parsed copy.
+- Credentials are loaded once per token file and shared by all clients and
+  threads. A background timer refreshes them shortly before they expire,
+  so requests don't have to wait for a refresh.
+"""
+
+import functools
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+SCOPES = ["https://mail.google.com/"]
+
+# Refresh this long before the access token expires
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+@functools.lru_cache(maxsize=None)
+def load_discovery_document(path: str | None = None) -> dict:
+    """
+    The parsed Gmail v1 discovery document, cached for the whole process.
+    path: a locally saved discovery document, by default the copy that
+          ships with google-api-python-client is used (no network call).
+    """
+    if path:
+        with open(path, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    return json.loads(discovery_cache.get_static_doc("gmail", "v1"))
+
+
+def build_gmail_service(credentials, discovery_file: str | None = None, client_options=None, http=None):
+    """
+    Build a Gmail service from the cached discovery document.
+    http: a ready (already authorized) http object, used instead of credentials
+    """
+    return build_from_document(
+        load_discovery_document(discovery_file),
+        credentials=None if http is not None else credentials,
+        client_options=client_options,
+        http=http,
+    )
+
+
+class SharedCredentials:
+    """
+    One Credentials object per token file, shared by every GmailClient.
+    Use SharedCredentials.for_token_file(path) instead of creating it directly.
+    """
+
+    _instances: dict[str, "SharedCredentials"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, token_file: str, background_refresh: bool = True):
+        self.token_file = token_file
+        self.background_refresh = background_refresh
+        self.credentials = Credentials.from_authorized_user_file(token_file, SCOPES)
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._schedule_refresh()
+
+    @classmethod
+    def for_token_file(cls, token_file: str) -> "SharedCredentials":
+        """
+        Return the shared instance for this token file, loading it on first use.
+        """
+        with cls._instances_lock:
+            shared = cls._instances.get(token_file)
+            if shared is None:
+                shared = cls(token_file)
+                cls._instances[token_file] = shared
+            return shared
+
+    def get(self) -> Credentials:
+        """
+        The shared credentials, refreshed first if they are (about to be) expired.
+        """
+        if self._needs_refresh():
+            self.refresh()
+        return self.credentials
+
+    def _needs_refresh(self) -> bool:
+        creds = self.credentials
+        if not creds.refresh_token:
+            return False
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now < REFRESH_MARGIN
+
+    def refresh(self) -> None:
+        """
+        Refresh the access token (only one thread at a time does it).
+        """
+        with self._lock:
+            if self._needs_refresh():
+                self.credentials.refresh(Request())
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        """
+        Start a daemon timer that refreshes shortly before expiry.
+        """
+        creds = self.credentials
+        if not self.background_refresh or not creds.refresh_token or creds.expiry is None:
+            return
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        delay = max(0.0, (creds.expiry - REFRESH_MARGIN - now).total_seconds())
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            # The next request will try again in the foreground
+            pass
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
@@ -0,0 +1,246 @@
+"""
+Incremental Gmail inbox sync based on Gmail's historyId.
+
+The first run downloads the whole inbox and saves a checkpoint:
+the mailbox historyId plus every parsed message.
+Later runs only ask Gmail for the history since that checkpoint
+(messages added, deleted, moved in/out of the inbox, relabeled) and apply it.
+If Gmail doesn't have that history anymore, we fall back to a full resync.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from googleapiclient.errors import HttpError
+
+from config import GMAIL_SYNC_STATE_FILE
+
+INBOX_LABEL = "INBOX"
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+# Partial-response field mask for history.list, we only need ids and labels
+HISTORY_FIELDS = (
+    "history(messagesAdded/message(id,labelIds),messagesDeleted/message/id,"
+    "labelsAdded(message/id,labelIds),labelsRemoved(message/id,labelIds)),"
+    "nextPageToken,historyId"
+)
+
+
+@dataclass
+class SyncResult:
+    """
+    What a single sync run did.
+    """
+    full_resync: bool
+    added: int = 0
+    removed: int = 0
+    relabeled: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.full_resync or bool(self.added or self.removed or self.relabeled)
+
+
+@dataclass
+class InboxCheckpoint:
+    """
+    Persisted sync state.
+    messages: {msg_id: {"email": {...}, "internal_date": int}}
+    """
+    history_id: str | None = None
+    messages: Dict[str, Dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "InboxCheckpoint":
+        """
+        Load a checkpoint file, or return an empty checkpoint if it doesn't exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="UTF-8") as f:
+            data = json.load(f)
+        return cls(history_id=data.get("history_id"), messages=data.get("messages", {}))
+
+    def save(self, path: str) -> None:
+        """
+        Write the checkpoint atomically (temp file + rename),
+        so a crash never leaves a half written file behind.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as f:
+            json.dump({"history_id": self.history_id, "messages": self.messages}, f)
+        os.replace(tmp_path, path)
+
+
+class InboxSync:
+    """
+    Keeps a local copy of the inbox up to date using Gmail history deltas.
+    'client' is a GmailClient, used for its service and message fetching.
+    """
+
+    def __init__(self, client, checkpoint_file: str = GMAIL_SYNC_STATE_FILE):
+        self.client = client
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint = InboxCheckpoint.load(checkpoint_file)
+
+    def sync(self) -> SyncResult:
+        """
+        Bring the local store up to date and save the checkpoint
+        (the file is only rewritten when something changed).
+        """
+        previous_history_id = self.checkpoint.history_id
+        if self.checkpoint.history_id is None:
+            result = self._full_resync()
+        else:
+            try:
+                result = self._apply_history()
+            except HttpError as error:
+                # 404 = startHistoryId is too old, Gmail only keeps about a week
+                if error.resp.status != 404:
+                    raise
+                result = self._full_resync()
+
+        if result.changed or self.checkpoint.history_id != previous_history_id:
+            self.checkpoint.save(self.checkpoint_file)
+        return result
+
+    def emails(self) -> List[Dict]:
+        """
+        All stored inbox emails, newest first (same order as messages.list).
+        """
+        entries = sorted(
+            self.checkpoint.messages.values(),
+            key=lambda entry: entry["internal_date"],
+            reverse=True,
+        )
+        return [entry["email"] for entry in entries]
+
+    # ==================================================
+    # Internal helpers
+    # ==================================================
+
+    def _current_history_id(self) -> str:
+        request = self.client.service.users().getProfile(userId="me", fields="historyId")
+        profile = self.client._execute(request, "getProfile")
+        return str(profile["historyId"])
+
+    def _store(self, full_msg: Dict) -> None:
+        self.checkpoint.messages[full_msg["id"]] = {
+            "email": self.client._parse_email(full_msg),
+            "internal_date": int(full_msg.get("internalDate", 0)),
+        }
+
+    def _full_resync(self) -> SyncResult:
+        """
+        Download the whole inbox again.
+        The historyId is read before listing, so nothing that changes
+        while we download is missed on the next run.
+        """
+        history_id = self._current_history_id()
+        self.checkpoint = InboxCheckpoint(history_id=history_id)
+
+        for msg_ids in self.client._iter_message_id_pages("in:inbox", None):
+            for full_msg in self.client._get_messages(msg_ids):
+                self._store(full_msg)
+
+        return SyncResult(full_resync=True, added=len(self.checkpoint.messages))
+
+    def _apply_history(self) -> SyncResult:
+        """
+        Read history since the checkpoint and apply it to the local store.
+        Raises HttpError(404) when the checkpoint has expired.
+        """
+        to_fetch: Dict[str, None] = {}  # ordered set
+        to_remove: set[str] = set()
+        label_changes: List[tuple[str, str, List[str]]] = []
+        page_token = None
+        latest_history_id = self.checkpoint.history_id
+
+        while True:
+            request = self.client.service.users().history().list(
+                userId="me",
+                startHistoryId=self.checkpoint.history_id,
+                historyTypes=HISTORY_TYPES,
+                pageToken=page_token,
+                fields=HISTORY_FIELDS
+            )
+            response = self.client._execute(request, "history.list")
+
+            for record in response.get("history", []):
+                self._collect_changes(record, to_fetch, to_remove, label_changes)
+
+            latest_history_id = str(response.get("historyId", latest_history_id))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        removed = 0
+        for msg_id in to_remove:
+            if self.checkpoint.messages.pop(msg_id, None) is not None:
+                removed += 1
+
+        added = 0
+        new_ids = [msg_id for msg_id in to_fetch if msg_id not in self.checkpoint.messages]
+        for full_msg in self.client._get_messages(new_ids):
+            # Only keep it if it's still in the inbox by now
+            if INBOX_LABEL in full_msg.get("labelIds", [INBOX_LABEL]):
+                self._store(full_msg)
+                added += 1
+
+        # Messages downloaded above already have their current labels,
+        # stored ones (even when added to the inbox again) get the changes applied
+        downloaded = set(new_ids)
+        relabeled: set[str] = set()
+        for msg_id, change, label_ids in label_changes:
+            entry = self.checkpoint.messages.get(msg_id)
+            if entry is None or msg_id in downloaded:
+                continue
+            labels = entry["email"]["labels"]
+            if change == "labelsAdded":
+                labels.extend(label for label in label_ids if label not in labels)
+            else:
+                labels[:] = [label for label in labels if label not in label_ids]
+            relabeled.add(msg_id)
+
+        self.checkpoint.history_id = latest_history_id
+        return SyncResult(full_resync=False, added=added, removed=removed, relabeled=len(relabeled))
+
+    @staticmethod
+    def _collect_changes(
+        record: Dict,
+        to_fetch: Dict[str, None],
+        to_remove: set[str],
+        label_changes: List[tuple[str, str, List[str]]],
+    ) -> None:
+        """
+        Translate one history record into 'fetch' / 'remove' operations.
+        Later records win over earlier ones for the same message.
+        Every label change is also kept (in order) for the stored labels.
+        """
+        def _add(msg_id: str) -> None:
+            to_remove.discard(msg_id)
+            to_fetch[msg_id] = None
+
+        def _remove(msg_id: str) -> None:
+            to_fetch.pop(msg_id, None)
+            to_remove.add(msg_id)
+
+        for item in record.get("messagesAdded", []):
+            message = item.get("message", {})
+            if INBOX_LABEL in message.get("labelIds", []):
+                _add(message["id"])
+
+        for item in record.get("messagesDeleted", []):
+            _remove(item["message"]["id"])
+
+        for change in ("labelsAdded", "labelsRemoved"):
+            for item in record.get(change, []):
+                label_ids = item.get("labelIds", [])
+                label_changes.append((item["message"]["id"], change, label_ids))
+                if INBOX_LABEL in label_ids:
+                    if change == "labelsAdded":
+                        _add(item["message"]["id"])
+                    else:
+                        _remove(item["message"]["id"])
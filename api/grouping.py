@@ -0,0 +1,126 @@
+"""
+Grouping of email bodies by subject, for the merge checks.
+
+Each subject keeps its bodies in first-seen order, and a digest index per
+subject makes the "did we already see this body?" check O(1), so grouping
+stays linear even when one subject has thousands of replies.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List
+
+from api.helpers import has_subject_prefix
+
+_QUOTED_LINE = re.compile(r"^[ \t]*>.*$", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_body(body: str) -> str:
+    """
+    Loose form of a body used for comparing: quoted reply lines ('> ...')
+    are dropped and all whitespace runs become a single space.
+    """
+    without_quotes = _QUOTED_LINE.sub("", body)
+    return _WHITESPACE.sub(" ", without_quotes).strip()
+
+
+def body_digest(text: str) -> bytes:
+    """
+    Short fixed-size key of a body, for set / dict lookups.
+    """
+    return hashlib.blake2b(text.encode("UTF-8"), digest_size=16).digest()
+
+
+class SubjectGroups:
+    """
+    Insertion-ordered {subject: [body1, body2, ...]} with O(1) de-duplication.
+
+    normalize_bodies: treat bodies as equal when they only differ in
+                      whitespace or quoted reply lines (the first one is kept)
+    """
+
+    def __init__(self, normalize_bodies: bool = False):
+        self.normalize_bodies = normalize_bodies
+        self._groups: Dict[str, List[str]] = {}
+        self._seen: Dict[str, set[bytes]] = {}
+
+    def add(self, subject: str, body: str) -> bool:
+        """
+        Add one email. Empty bodies and duplicate bodies are skipped,
+        but the subject is still registered.
+        Returns True if the body was new for this subject.
+        """
+        subject = subject.strip()
+        body = body.strip()
+
+        bodies = self._groups.setdefault(subject, [])
+        seen = self._seen.setdefault(subject, set())
+        if not body:
+            return False
+
+        key = body_digest(normalize_body(body) if self.normalize_bodies else body)
+        if key in seen:
+            return False
+
+        seen.add(key)
+        bodies.append(body)
+        return True
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        """
+        The grouping as a plain dict (not a copy).
+        """
+        return self._groups
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, subject: str) -> bool:
+        return subject in self._groups
+
+    def __getitem__(self, subject: str) -> List[str]:
+        return self._groups[subject]
+
+
+def subject_search_term(prefix: str) -> str:
+    """
+    Turn a subject prefix like 'Task:' into a Gmail search term.
+    Gmail search ignores punctuation, so 'Task:' becomes subject:Task.
+    """
+    words = prefix.strip().rstrip(":").strip()
+    if " " in words:
+        return f'subject:"{words}"'
+    return f"subject:{words}"
+
+
+def has_subject_words(subject: str, prefix: str) -> bool:
+    """
+    Local version of subject_search_term(): the prefix words occur in the subject.
+    """
+    return set(re.findall(r"\w+", prefix.lower())) <= set(re.findall(r"\w+", subject.lower()))
+
+
+def grouping_query(subject_prefix: str | None, pushdown: bool) -> str:
+    """
+    The Gmail search terms the subject grouping pushes down ('' without pushdown).
+    """
+    if subject_prefix and pushdown:
+        return subject_search_term(subject_prefix)
+    return ""
+
+
+def group_by_subject(
+    emails: Iterable[Dict],
+    subject_prefix: str | None,
+    normalize_bodies: bool,
+) -> Dict[str, List[str]]:
+    """
+    {subject: [body1, body2, ...]} of the emails whose subject starts with subject_prefix.
+    """
+    grouped = SubjectGroups(normalize_bodies=normalize_bodies)
+    for email in emails:
+        if subject_prefix and not has_subject_prefix(email["subject"], subject_prefix):
+            continue
+        grouped.add(email["subject"], email["body"])
+    return grouped.as_dict()
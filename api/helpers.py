@@ -2,6 +2,27 @@
 Shared helper functions for API sync tests.
 """
 
+from api.urgency import DEFAULT_CLASSIFIER, UrgencyClassifier
+
+# Only emails with this subject prefix take part in the Trello sync
+TASK_PREFIX = "Task:"
+
+
+def has_subject_prefix(subject: str, prefix: str = TASK_PREFIX) -> bool:
+    """
+    Case-insensitive check for a subject prefix such as 'Task:'.
+    """
+    return (subject or "").strip().lower().startswith(prefix.strip().lower())
+
+
+def is_urgent_body(body: str, classifier: UrgencyClassifier = DEFAULT_CLASSIFIER) -> bool:
+    """
+    According to spec: an email is urgent if its body contains the word 'Urgent'.
+    The default classifier checks whole words and skips negations ("non-urgent").
+    """
+    return classifier.is_urgent(body)
+
+
 def normalize_subject_for_trello(subject: str) -> str:
     """
     Convert an email subject to the expected Trello card title.
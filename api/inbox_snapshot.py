@@ -0,0 +1,72 @@
+"""
+A one-time snapshot of the inbox, shared by all the sync checks.
+
+The inbox is downloaded once, and in the same single pass over the emails
+we build every view the tests need: urgent emails, subject groups and the
+Task-only versions of both.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+from api.grouping import SubjectGroups
+from api.helpers import TASK_PREFIX, has_subject_prefix, is_urgent_body
+from api.urgency import DEFAULT_CLASSIFIER, UrgencyClassifier
+
+
+@dataclass
+class InboxSnapshot:
+    """
+    emails: every email that was read, in inbox order
+    urgent: emails whose body is urgent according to the classifier
+    groups: {subject: [body1, body2, ...]} (same as get_emails_grouped_by_subject)
+    task_urgent / task_groups: the same views, only for 'Task:' subjects
+    """
+    emails: List[Dict] = field(default_factory=list)
+    urgent: List[Dict] = field(default_factory=list)
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    task_urgent: List[Dict] = field(default_factory=list)
+    task_groups: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_emails(
+        cls,
+        emails: Iterable[Dict],
+        task_prefix: str = TASK_PREFIX,
+        normalize_bodies: bool = False,
+        classifier: UrgencyClassifier = DEFAULT_CLASSIFIER,
+    ) -> "InboxSnapshot":
+        """
+        Build every view in one pass over the emails.
+        """
+        snapshot = cls()
+        groups = SubjectGroups(normalize_bodies=normalize_bodies)
+        task_groups = SubjectGroups(normalize_bodies=normalize_bodies)
+
+        for email in emails:
+            snapshot.emails.append(email)
+            is_task = has_subject_prefix(email["subject"], task_prefix)
+            urgent = is_urgent_body(email["body"], classifier)
+
+            groups.add(email["subject"], email["body"])
+            if urgent:
+                snapshot.urgent.append(email)
+
+            if is_task:
+                task_groups.add(email["subject"], email["body"])
+                if urgent:
+                    snapshot.task_urgent.append(email)
+
+        snapshot.groups = groups.as_dict()
+        snapshot.task_groups = task_groups.as_dict()
+        return snapshot
+
+    @classmethod
+    def fetch(cls, gmail_client, max_results: int | None = 100) -> "InboxSnapshot":
+        """
+        Read the inbox once (streaming) and build the snapshot.
+        """
+        return cls.from_emails(
+            gmail_client.iter_inbox_emails(max_results=max_results),
+            classifier=gmail_client.urgency_classifier,
+        )
@@ -0,0 +1,216 @@
+"""
+A small on-disk cache for parsed Gmail messages (single SQLite file).
+
+The subject and body of a Gmail message never change once it exists,
+so after a message was fetched and parsed once, we keep them locally
+and skip downloading the full message next time.
+Labels do change (read, archived, starred, ...), so they are not stored:
+the client fetches the current labels of cached messages with a minimal get.
+Bodies are stored per body size cap, so a client with a larger cap
+never gets a body that another client truncated.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+from config import GMAIL_CACHE_FILE
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Stored as body_limit for bodies that were not truncated (NULLs don't work in a primary key)
+NO_BODY_LIMIT = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT NOT NULL,
+    body_limit INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (id, body_limit)
+)
+"""
+
+# SQLite limits the number of bound parameters, so big id lists go in chunks
+_CHUNK = 500
+
+
+class MessageCache:
+    """
+    Parsed message cache keyed by Gmail message id and body size cap, with LRU eviction.
+
+    path: SQLite file (":memory:" for a throw-away cache)
+    max_entries: when the cache grows above this, the least recently used
+                 messages are evicted
+    body_limit: the max_body_bytes the bodies were decoded with (None = untruncated),
+                only entries stored with the same cap are returned
+    """
+
+    def __init__(
+        self,
+        path: str = GMAIL_CACHE_FILE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        body_limit: int | None = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.body_limit = body_limit
+        self._limit_key = NO_BODY_LIMIT if body_limit is None else body_limit
+
+        # Hit / miss / eviction counters since this object was created
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # The inbox prefetch thread also reads from the cache
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(messages)")]
+        if columns and ("body_limit" not in columns or "labels" in columns):
+            # Cache file from before bodies were keyed by their cap / labels were dropped,
+            # it's only a cache
+            self._conn.execute("DROP TABLE messages")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON messages (last_used)")
+        self._conn.commit()
+
+        # Logical clock for LRU ordering, continues from the stored values
+        row = self._conn.execute("SELECT MAX(last_used) FROM messages").fetchone()
+        self._clock = row[0] or 0
+
+        # Row count kept up to date by put / evict / invalidate, so puts don't count the table
+        self._count = self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def __len__(self) -> int:
+        """
+        Number of stored entries (for all body caps).
+        """
+        with self._lock:
+            return self._count
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, msg_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Return {msg_id: {'id', 'subject', 'body'}} for the ids that are cached (no labels).
+        Every found id counts as a hit, every missing id as a miss.
+        """
+        if not msg_ids:
+            return {}
+
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            for start in range(0, len(msg_ids), _CHUNK):
+                chunk = msg_ids[start:start + _CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT id, subject, body FROM messages "
+                    f"WHERE body_limit = ? AND id IN ({placeholders})",
+                    [self._limit_key, *chunk],
+                ).fetchall()
+                for msg_id, subject, body in rows:
+                    found[msg_id] = {"id": msg_id, "subject": subject, "body": body}
+
+            if found:
+                now = self._tick()
+                self._conn.executemany(
+                    "UPDATE messages SET last_used = ? WHERE id = ? AND body_limit = ?",
+                    [(now, msg_id, self._limit_key) for msg_id in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(set(msg_ids)) - len(found)
+
+        return found
+
+    def put_many(self, emails: Iterable[Dict]) -> None:
+        """
+        Store parsed emails (dicts with id, subject and body, other keys are ignored)
+        and evict the least recently used ones if the cache is too big.
+        """
+        by_id = {email["id"]: email for email in emails}
+        if not by_id:
+            return
+
+        with self._lock:
+            new_rows = len(by_id) - self._count_stored(list(by_id))
+            now = self._tick()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (id, body_limit, subject, body, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (email["id"], self._limit_key, email["subject"], email["body"], now)
+                    for email in by_id.values()
+                ],
+            )
+            self._count += new_rows
+            self._evict()
+            self._conn.commit()
+
+    def _count_stored(self, msg_ids: List[str]) -> int:
+        """
+        How many of the ids are stored for this body cap (primary key lookups, lock must be held).
+        """
+        stored = 0
+        for start in range(0, len(msg_ids), _CHUNK):
+            chunk = msg_ids[start:start + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            stored += self._conn.execute(
+                f"SELECT COUNT(*) FROM messages WHERE body_limit = ? AND id IN ({placeholders})",
+                [self._limit_key, *chunk],
+            ).fetchone()[0]
+        return stored
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used rows above max_entries (lock must be held).
+        """
+        extra = self._count - self.max_entries
+        if extra <= 0:
+            return
+
+        deleted = self._conn.execute(
+            "DELETE FROM messages WHERE rowid IN "
+            "(SELECT rowid FROM messages ORDER BY last_used ASC LIMIT ?)",
+            (extra,),
+        ).rowcount
+        self._count -= deleted
+        self.evictions += deleted
+
+    def invalidate(self, msg_ids: Iterable[str] | None = None) -> None:
+        """
+        Remove the given ids from the cache, or everything when msg_ids is None.
+        """
+        with self._lock:
+            if msg_ids is None:
+                self._conn.execute("DELETE FROM messages")
+                self._count = 0
+            else:
+                deleted = self._conn.executemany(
+                    "DELETE FROM messages WHERE id = ?",
+                    [(msg_id,) for msg_id in msg_ids],
+                ).rowcount
+                self._count -= deleted
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for reporting, e.g. {'hits': 40, 'misses': 10, 'evictions': 0, 'size': 50}
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
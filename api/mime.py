@@ -0,0 +1,159 @@
+"""
+Body extraction from Gmail message payloads.
+
+Gmail returns the MIME tree of a message as nested 'parts'. Real mails
+nest the text under multipart/alternative inside multipart/mixed and so on,
+so we walk the whole tree, pick the best text part (text/plain, or
+text/html converted to text as a fallback) and decode only that one.
+Decoding can be capped, so huge newsletters don't cost a full decode.
+"""
+
+import base64
+import binascii
+from html.parser import HTMLParser
+from typing import Dict, Tuple
+
+# Decode at most this many bytes of a body by default
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+
+# Tags whose text is never shown to the reader
+_SKIPPED_TAGS = {"script", "style", "head", "title"}
+
+# Tags that start a new line in the rendered text
+_BLOCK_TAGS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "table", "ul", "ol"}
+
+
+class _HtmlTextExtractor(HTMLParser):
+    """
+    Collects the visible text of an HTML document.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.chunks.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Very small HTML -> plain text conversion (visible text, one line per block).
+    """
+    parser = _HtmlTextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    lines = (" ".join(line.split()) for line in "".join(parser.chunks).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _is_attachment(part: Dict) -> bool:
+    if part.get("filename"):
+        return True
+    for header in part.get("headers", []):
+        if header.get("name", "").lower() == "content-disposition":
+            return header.get("value", "").lower().startswith("attachment")
+    return False
+
+
+def find_text_part(payload: Dict) -> Tuple[Dict | None, str | None]:
+    """
+    Walk the MIME tree (depth first, in document order) and return
+    (part, mime_type) for the first inline text/plain part, or the first
+    text/html part if there is no plain text. (None, None) if neither exists.
+    Parts without inline data (e.g. attachments only referenced by id) are skipped.
+    """
+    html_part = None
+    stack = [payload]
+
+    while stack:
+        part = stack.pop()
+        children = part.get("parts")
+        if children:
+            # reversed, so the first child is visited first
+            stack.extend(reversed(children))
+            continue
+
+        mime_type = (part.get("mimeType") or "").lower()
+        if not part.get("body", {}).get("data") or _is_attachment(part):
+            continue
+        if mime_type == "text/plain":
+            return part, mime_type
+        if mime_type == "text/html" and html_part is None:
+            html_part = part
+
+    if html_part is not None:
+        return html_part, "text/html"
+    return None, None
+
+
+def _charset(part: Dict) -> str:
+    for header in part.get("headers", []):
+        if header.get("name", "").lower() == "content-type":
+            for param in header.get("value", "").split(";")[1:]:
+                key, _, value = param.strip().partition("=")
+                if key.lower() == "charset" and value:
+                    return value.strip('"')
+    return "UTF-8"
+
+
+def decode_body_data(data: str, max_bytes: int | None = DEFAULT_MAX_BODY_BYTES) -> bytes:
+    """
+    Decode base64url body data, but only as much as needed for max_bytes.
+    Every 4 base64 characters hold 3 bytes, so we slice the encoded string
+    first instead of decoding everything and cutting afterwards.
+    """
+    if max_bytes is not None:
+        needed_chars = -(-max_bytes // 3) * 4  # ceil(max_bytes / 3) * 4
+        if len(data) > needed_chars:
+            data = data[:needed_chars]
+
+    # Gmail sometimes leaves out the padding
+    missing_padding = -len(data) % 4
+    if missing_padding:
+        data += "=" * missing_padding
+
+    try:
+        raw = base64.urlsafe_b64decode(data)
+    except (binascii.Error, ValueError):
+        return b""
+
+    if max_bytes is not None and len(raw) > max_bytes:
+        raw = raw[:max_bytes]
+    return raw
+
+
+def extract_body_text(payload: Dict, max_bytes: int | None = DEFAULT_MAX_BODY_BYTES) -> str:
+    """
+    The readable body of a message payload: the best text part, decoded
+    (at most max_bytes of it) and converted from HTML if needed.
+    """
+    part, mime_type = find_text_part(payload)
+    if part is None:
+        return ""
+
+    raw = decode_body_data(part["body"]["data"], max_bytes)
+    try:
+        text = raw.decode(_charset(part), errors="ignore")
+    except LookupError:
+        # Unknown charset name in the header
+        text = raw.decode("UTF-8", errors="ignore")
+
+    if mime_type == "text/html":
+        return html_to_text(text)
+    return text
@@ -0,0 +1,141 @@
+"""
+Rate limiting and retry helpers shared by the API clients.
+
+- TokenBucket: client-side quota budget (e.g. Gmail quota units per second)
+- RetryPolicy: exponential backoff with jitter for 429 / 5xx responses
+- run_in_order: run calls on a bounded thread pool, results in input order
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    rate: tokens added per second
+    capacity: the most tokens that can be saved up (burst size)
+
+    A call that costs more than the capacity is still allowed once the
+    bucket is full, it just leaves the bucket in debt for a while.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, cost: float = 1) -> float:
+        """
+        Block until 'cost' tokens can be spent, then spend them.
+        Returns how many seconds we waited.
+        """
+        needed = min(cost, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= needed:
+                    self._tokens -= cost
+                    return waited
+                else:
+                    wait = (needed - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while, e.g. after the server answered 429.
+        Every thread that shares this bucket backs off together.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How failed requests are retried.
+
+    max_retries: how many times a request is sent again (0 = never)
+    base_delay / max_delay: exponential backoff bounds in seconds
+    jitter: randomize the delay ("full jitter"), so workers don't retry in lockstep
+    """
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    jitter: bool = True
+
+    @staticmethod
+    def is_retryable(status: int) -> bool:
+        return status in RETRYABLE_STATUSES
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        """
+        attempt: how many retries were already made for this request
+        """
+        return self.is_retryable(status) and attempt < self.max_retries
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Seconds to wait before retry number 'attempt' (1-based).
+        A server provided Retry-After is used as the minimum.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        return backoff
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header given in seconds. HTTP dates are ignored.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def run_in_order(func: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """
+    Call func(item) for every item with at most 'max_workers' calls in flight.
+    Results come back in the same order as the items.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,240 @@
+"""
+Gmail -> Trello reconciliation.
+
+Takes an InboxSnapshot and a BoardSnapshot and reports every way the board
+differs from what the inbox says it should look like:
+
+- missing_card: a Task email has no card with the expected title
+- duplicate_card: several cards have the same title (emails should be merged into one)
+- missing_label: an urgent email's card has no 'Urgent' label
+- missing_body: a merged email body is not in the card description
+- unexpected_card: a card that no email in the snapshot explains
+
+Everything is built from dict indexes in one pass over the emails and one
+over the cards, so it stays linear for inboxes and boards in the 100k range.
+Body checks first look a body up in a digest index of the description's
+lines and paragraphs (O(1)); only bodies that are not found there are
+searched in the description, all at once with one Aho-Corasick scan.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from api.board_snapshot import BoardSnapshot, card_label_names
+from api.grouping import body_digest, normalize_body
+from api.helpers import TASK_PREFIX, has_subject_prefix, normalize_subject_for_trello
+from api.inbox_snapshot import InboxSnapshot
+from api.text_search import PhraseAutomaton
+
+MISSING_CARD = "missing_card"
+DUPLICATE_CARD = "duplicate_card"
+MISSING_LABEL = "missing_label"
+MISSING_BODY = "missing_body"
+UNEXPECTED_CARD = "unexpected_card"
+
+DISCREPANCY_KINDS = (MISSING_CARD, DUPLICATE_CARD, MISSING_LABEL, MISSING_BODY, UNEXPECTED_CARD)
+
+URGENT_LABEL = "Urgent"
+
+
+@dataclass
+class Discrepancy:
+    """
+    One difference between the inbox and the board.
+    title: the card title it is about
+    urgent / merged: the expected card is for an urgent email / for several bodies
+    """
+    kind: str
+    title: str
+    message: str
+    subjects: List[str] = field(default_factory=list)
+    email_ids: List[str] = field(default_factory=list)
+    card_ids: List[str] = field(default_factory=list)
+    body: str | None = None
+    urgent: bool = False
+    merged: bool = False
+
+    def __str__(self) -> str:
+        return self.message
+
+
+@dataclass
+class ExpectedCard:
+    """
+    What the inbox says one card should look like.
+    subjects: the email subjects that map to this title, first-seen order
+    bodies: {digest of normalized body: body}, first-seen order
+    """
+    title: str
+    subjects: Dict[str, None] = field(default_factory=dict)
+    email_ids: List[str] = field(default_factory=list)
+    bodies: Dict[bytes, str] = field(default_factory=dict)
+    urgent: bool = False
+
+    @property
+    def merged(self) -> bool:
+        return len(self.bodies) > 1
+
+
+@dataclass
+class ReconciliationReport:
+    """
+    expected: {card title: ExpectedCard} for every Task title in the inbox
+    """
+    discrepancies: List[Discrepancy] = field(default_factory=list)
+    expected: Dict[str, ExpectedCard] = field(default_factory=dict)
+    board_cards: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.discrepancies
+
+    def of_kind(self, *kinds: str) -> List[Discrepancy]:
+        return [item for item in self.discrepancies if item.kind in kinds]
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(DISCREPANCY_KINDS, 0)
+        for item in self.discrepancies:
+            counts[item.kind] += 1
+        return counts
+
+    def messages(self, *kinds: str) -> List[str]:
+        """
+        Messages of the given kinds (all kinds if none given).
+        """
+        return [item.message for item in self.discrepancies if not kinds or item.kind in kinds]
+
+
+class Reconciler:
+    """
+    task_prefix: only emails with this subject prefix are synced to Trello
+    urgent_label: the label urgent emails' cards must have
+    normalize_bodies: compare bodies ignoring whitespace and quoted reply lines
+                      (default: exact text, like a plain 'body in description' check)
+    check_all_bodies: also check single-email cards (default: only merged cards)
+    check_unexpected: report cards that no email explains (turn off when the
+                      snapshot only covers the latest part of the inbox)
+    """
+
+    def __init__(
+        self,
+        task_prefix: str = TASK_PREFIX,
+        urgent_label: str = URGENT_LABEL,
+        normalize_bodies: bool = False,
+        check_all_bodies: bool = False,
+        check_unexpected: bool = True,
+    ):
+        self.task_prefix = task_prefix
+        self.urgent_label = urgent_label
+        self.normalize_bodies = normalize_bodies
+        self.check_all_bodies = check_all_bodies
+        self.check_unexpected = check_unexpected
+
+    def _normalize(self, text: str) -> str:
+        if not self.normalize_bodies:
+            return text.strip()
+        # A body that is nothing but quoted lines would become "" and match anything
+        return normalize_body(text) or text.strip()
+
+    def _expected_cards(self, inbox: InboxSnapshot) -> Dict[str, ExpectedCard]:
+        """
+        One pass over the emails: {card title: what that card should look like}.
+        """
+        urgent_ids = {email["id"] for email in inbox.task_urgent}
+        expected: Dict[str, ExpectedCard] = {}
+
+        for email in inbox.emails:
+            subject = email.get("subject") or ""
+            if not has_subject_prefix(subject, self.task_prefix):
+                continue
+            title = normalize_subject_for_trello(subject)
+            card = expected.get(title)
+            if card is None:
+                card = expected[title] = ExpectedCard(title=title)
+
+            card.subjects[subject] = None
+            card.email_ids.append(email["id"])
+            card.urgent = card.urgent or email["id"] in urgent_ids
+
+            body = (email.get("body") or "").strip()
+            if body:
+                card.bodies.setdefault(body_digest(self._normalize(body)), body)
+        return expected
+
+    def _missing_bodies(self, bodies: Dict[bytes, str], description: str) -> List[str]:
+        """
+        The bodies that can't be found in the description, in body order.
+        """
+        normalized_desc = self._normalize(description)
+        # Bodies usually sit in the description as whole lines or paragraphs
+        segments = {body_digest(normalized_desc)}
+        for paragraph in description.split("\n\n"):
+            segments.add(body_digest(self._normalize(paragraph)))
+        for line in description.splitlines():
+            segments.add(body_digest(self._normalize(line)))
+
+        remaining = {key: body for key, body in bodies.items() if key not in segments}
+        if not remaining:
+            return []
+
+        # Anything else: one scan of the description for all remaining bodies
+        phrases = {self._normalize(body): key for key, body in remaining.items()}
+        found = {phrases[phrase] for phrase in PhraseAutomaton(phrases).find_distinct(normalized_desc)}
+        return [body for key, body in remaining.items() if key not in found]
+
+    def reconcile(self, inbox: InboxSnapshot, board: BoardSnapshot) -> ReconciliationReport:
+        expected = self._expected_cards(inbox)
+        report = ReconciliationReport(expected=expected, board_cards=len(board))
+        add = report.discrepancies.append
+
+        for title, card in expected.items():
+            subjects = list(card.subjects)
+            common = dict(subjects=subjects, email_ids=card.email_ids, urgent=card.urgent, merged=card.merged)
+            shown = f"'{title}'" + (f" (subject '{subjects[0]}')" if subjects[0] != title else "")
+
+            cards = board.cards_titled(title)
+            if not cards:
+                add(Discrepancy(MISSING_CARD, title, f"No Trello card for email {shown}.", **common))
+                continue
+
+            card_ids = [c.get("id") for c in cards]
+            if len(cards) > 1:
+                add(Discrepancy(
+                    DUPLICATE_CARD, title,
+                    f"{len(cards)} Trello cards are titled {shown}, expected one.",
+                    card_ids=card_ids, **common,
+                ))
+
+            if card.urgent and not any(self.urgent_label in card_label_names(c) for c in cards):
+                add(Discrepancy(
+                    MISSING_LABEL, title,
+                    f"Trello card for urgent email {shown} does not have '{self.urgent_label}' label.",
+                    card_ids=card_ids, **common,
+                ))
+
+            if card.merged or self.check_all_bodies:
+                # Compare with the first card, like someone opening the board would
+                for body in self._missing_bodies(card.bodies, cards[0].get("desc") or ""):
+                    add(Discrepancy(
+                        MISSING_BODY, title,
+                        f"Body '{body}' of email {shown} was not found in the Trello card description.",
+                        card_ids=card_ids[:1], body=body, **common,
+                    ))
+
+        if self.check_unexpected:
+            for title, cards in board.cards_by_title.items():
+                if title not in expected:
+                    add(Discrepancy(
+                        UNEXPECTED_CARD, title,
+                        f"Trello card '{title}' has no matching email.",
+                        card_ids=[c.get("id") for c in cards],
+                    ))
+
+        return report
+
+
+def reconcile(inbox: InboxSnapshot, board: BoardSnapshot, **options) -> ReconciliationReport:
+    """
+    Shortcut for Reconciler(**options).reconcile(inbox, board).
+    """
+    return Reconciler(**options).reconcile(inbox, board)
@@ -0,0 +1,71 @@
+"""
+Multi-phrase search in one pass over a text (Aho-Corasick).
+
+Used where many phrases are looked up in the same text: urgency keywords
+in an email body, or every merged email body in a card description.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over a set of phrases (matching is exact,
+    callers lowercase / normalize both sides as they need).
+    find_all() reports (start, phrase) for every occurrence in one pass.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for phrase in phrases:
+            self._add(phrase)
+        self._build_fail_links()
+
+    def _add(self, phrase: str) -> None:
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(phrase)
+
+    def _build_fail_links(self) -> None:
+        # Breadth first, so a state's fail link is always ready before its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        found: List[Tuple[int, str]] = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for phrase in self._out[state]:
+                found.append((index - len(phrase) + 1, phrase))
+        return found
+
+    def find_distinct(self, text: str) -> set[str]:
+        """
+        The phrases that occur at least once in text.
+        """
+        return {phrase for _, phrase in self.find_all(text)}
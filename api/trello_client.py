@@ -3,77 +3,308 @@ Simple wrapper around Trello REST API
 Only includes methods needed for this project
 """
 
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 
+from api.board_snapshot import BoardSnapshot
+from api.cassette import Cassette, CassetteAdapter
+from api.rate_limit import RetryPolicy, TokenBucket, parse_retry_after
+from api.trello_metadata import DEFAULT_METADATA_TTL, BoardMetadataCache
+from api.trello_sync import BoardSync, BoardSyncResult
 from config import TRELLO_API_KEY, TRELLO_API_TOKEN, TRELLO_BOARD_ID
 
+TRELLO_BASE_URL = "https://api.trello.com/1"
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_POOL_SIZE = 10
+
+# Trello allows 100 requests per 10 seconds per token,
+# we stay a bit below that on the client side
+DEFAULT_REQUESTS_PER_SECOND = 9
+DEFAULT_BURST = 20
+
+# Card fields the sync checks use
+CARD_FIELDS = "name,desc,idList,labels"
+
+# Nested board resource: cards, lists and labels in one response
+BOARD_SNAPSHOT_PARAMS = {
+    "fields": "name",
+    "cards": "open",
+    "card_fields": CARD_FIELDS,
+    "lists": "open",
+    "list_fields": "name,closed,pos",
+    "labels": "all",
+    "label_fields": "name,color",
+}
+
+# Trello reports its rate limit state in these response headers
+RATE_LIMIT_HEADERS = ("x-rate-limit-api-token", "x-rate-limit-api-key")
+
+# Methods that can be sent twice without a second effect. Others (POST) are only
+# retried on 429, Trello rejects those before doing anything.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _int_header(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
 class TrelloClient:
     """
     A very small client class to communicate with Trello API.
+    All calls go through one pooled keep-alive session, with timeouts,
+    retries on 429 / 5xx and a client-side rate limiter.
     """
 
-    def __init__(self):
-        self.base_url = "https://api.trello.com/1"
+    def __init__(
+        self,
+        board_id: str = TRELLO_BOARD_ID,
+        api_key: str = TRELLO_API_KEY,
+        api_token: str = TRELLO_API_TOKEN,
+        base_url: str = TRELLO_BASE_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        retry_policy: RetryPolicy | None = None,
+        requests_per_second: float | None = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        session: requests.Session | None = None,
+        metadata_ttl: float = DEFAULT_METADATA_TTL,
+        sync_state_file: str | None = None,
+        cassette: Cassette | None = None,
+    ):
+        """
+        board_id: the board this client reads (default: TRELLO_BOARD_ID from config)
+        api_key / api_token: Trello credentials (default: from the environment)
+        base_url: Trello API root (can point to a local stand-in in tests)
+        pool_size: how many keep-alive connections are kept open
+        timeout: seconds, or a (connect, read) tuple
+        retry_policy: backoff for 429 / 5xx answers
+        requests_per_second / burst: client-side limiter, None = unlimited
+        session: an existing requests.Session to use instead of a new one
+                 (used as it is, its adapters are not replaced)
+        metadata_ttl: seconds before cached lists / labels / members are revalidated
+        sync_state_file: turns on incremental mode - get_board_cards() only downloads
+                         the board actions since the last call (checkpoint kept in this file)
+        cassette: record every response into this cassette, or answer from it in replay mode
+        """
+        self.board_id = board_id
+        self.api_key = api_key
+        self.api_token = api_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = TokenBucket(requests_per_second, burst) if requests_per_second else None
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        if cassette is not None:
+            for prefix in ("https://", "http://"):
+                session.mount(prefix, CassetteAdapter(cassette, session.get_adapter(prefix)))
+        self.session = session
+        self.cassette = cassette
+
+        self.metadata = BoardMetadataCache(self, board_id, ttl=metadata_ttl)
+        self.board_sync = BoardSync(self, board_id, sync_state_file) if sync_state_file else None
 
     def _auth_params(self):
         return {
-            "key": TRELLO_API_KEY,
-            "token": TRELLO_API_TOKEN
+            "key": self.api_key,
+            "token": self.api_token
         }
-    
+
+    def _respect_rate_limit_headers(self, response: requests.Response) -> None:
+        """
+        If Trello says a rate limit window is used up, wait until it resets
+        before sending anything else.
+        """
+        if self.limiter is None:
+            return
+
+        for prefix in RATE_LIMIT_HEADERS:
+            # A malformed header is ignored rather than failing the request
+            remaining = _int_header(response.headers.get(f"{prefix}-remaining"))
+            interval_ms = _int_header(response.headers.get(f"{prefix}-interval-ms"))
+            if remaining is not None and interval_ms is not None and remaining <= 0:
+                self.limiter.pause(interval_ms / 1000)
+
+    def _send(
+        self,
+        path: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        method: str = "GET",
+        retry: bool | None = None,
+    ) -> requests.Response:
+        """
+        Call a Trello API path (e.g. '/boards/{id}/cards') and return the response.
+        Retries 429 / 5xx and connection errors according to the retry policy.
+        retry: also retry 5xx and connection errors (default: only for idempotent methods,
+               a POST that timed out may have been applied already)
+        """
+        url = f"{self.base_url}{path}"
+        params = {**self._auth_params(), **(params or {})}
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire(1)
+
+            try:
+                response = self.session.request(
+                    method, url, params=params, headers=headers, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if not retry or attempt >= self.retry_policy.max_retries:
+                    raise
+                attempt += 1
+                time.sleep(self.retry_policy.delay(attempt))
+                continue
+
+            self._respect_rate_limit_headers(response)
+
+            retryable = retry or response.status_code == 429
+            if retryable and self.retry_policy.should_retry(response.status_code, attempt):
+                attempt += 1
+                delay = self.retry_policy.delay(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))
+                )
+                if response.status_code == 429 and self.limiter is not None:
+                    self.limiter.pause(delay)
+                time.sleep(delay)
+                continue
+
+            # Raise an error for bad responses
+            response.raise_for_status()
+            return response
+
+    def _get(self, path: str, params: dict | None = None):
+        """
+        GET a Trello API path and return the JSON (Python dict/list).
+        """
+        return self._send(path, params).json()
+
+    def _get_if_changed(self, path: str, params: dict | None = None, etag: str | None = None):
+        """
+        Conditional GET. Returns (json, etag), or (None, etag) if the server
+        answered 304 Not Modified for the given etag.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        response = self._send(path, params, headers)
+        if response.status_code == 304:
+            return None, etag
+        return response.json(), response.headers.get("ETag")
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ==================================================
+    # Webhooks
+    # ==================================================
+
+    def create_webhook(self, callback_url: str, id_model: str | None = None, description: str = "") -> dict:
+        """
+        Register a webhook (on this client's board unless id_model is given).
+        Trello sends a HEAD request to callback_url first and only creates
+        the webhook if it answers 200.
+        """
+        response = self._send(
+            "/webhooks",
+            {"callbackURL": callback_url, "idModel": id_model or self.board_id, "description": description},
+            method="POST",
+        )
+        return response.json()
+
+    def delete_webhook(self, webhook_id: str) -> None:
+        self._send(f"/webhooks/{webhook_id}", method="DELETE")
+
     def get_board_cards(self) -> list:
         """
         Return all cards on the board with specified fields.
+        In incremental mode the board is synced first and then read from the local store.
         """
-        url = f"{self.base_url}/boards/{TRELLO_BOARD_ID}/cards"
+        if self.board_sync is not None:
+            self.board_sync.sync()
+            return self.board_sync.cards()
+        return self._get_all_board_cards()
 
-        params = {
-            **self._auth_params(),
-            "fields": "name,desc,idList,labels"
-        }
+    def sync_board(self) -> BoardSyncResult:
+        """
+        Apply the board actions since the last sync to the local card store.
+        Falls back to a full refresh when the actions can't be replayed.
+        """
+        if self.board_sync is None:
+            raise RuntimeError("sync_board() needs a client created with sync_state_file")
+        return self.board_sync.sync()
 
-        response = requests.get(url, params=params)
+    def _get_all_board_cards(self) -> list:
+        return self._get(
+            f"/boards/{self.board_id}/cards",
+            {"fields": CARD_FIELDS}
+        )
 
-        # Raise an error for bad responses
-        response.raise_for_status()
+    def _get_card_if_exists(self, card_id: str) -> dict | None:
+        """
+        A single card, or None if it was deleted in the meantime.
+        """
+        try:
+            return self._get(f"/cards/{card_id}", {"fields": CARD_FIELDS + ",closed"})
+        except requests.HTTPError as error:
+            if error.response is not None and error.response.status_code == 404:
+                return None
+            raise
 
-        # Trello returns JSON -> Python dict/list conversion automatically
-        return response.json()
+    def _get_cards(self, card_ids: list) -> list:
+        return [self._get_card_if_exists(card_id) for card_id in card_ids]
 
     def get_board_lists(self) -> list:
         """
         return all lists (columns) on the board.
         Using this to map list_id -> list name (To Do / In Progress / Completed)
         """
-        url = f"{self.base_url}/boards/{TRELLO_BOARD_ID}/lists"
-        params = self._auth_params()
+        return self._get(f"/boards/{self.board_id}/lists")
+
+    def get_board_snapshot(self, cards: str = "open") -> BoardSnapshot:
+        """
+        Cards, lists and labels of the board in a single request, indexed by
+        id / title / list name / label.
+        cards: which cards to include ('open', 'closed', 'all', ...)
+        The lists and labels also refresh the metadata cache.
+        """
+        board = self._get(f"/boards/{self.board_id}", {**BOARD_SNAPSHOT_PARAMS, "cards": cards})
+        snapshot = BoardSnapshot.from_board(board)
+        self.metadata.prime("lists", snapshot.lists)
+        self.metadata.prime("labels", snapshot.labels)
+        return snapshot
 
-        response = requests.get(url, params=params)
-        response.raise_for_status()
 
-        return response.json()
-    
-    
     def build_lists_map(self) -> dict:
         """
         Building a simple dictionary: list_id -> list_name
         for example: "5f6d7e8c9b0a1b2c3d4e5f6g": "To Do"
+        Served from the board metadata cache.
         """
-        lists = self.get_board_lists()
-        lists_map = {}
-        for lst in lists:
-            list_id = lst.get("id")
-            list_name = lst.get("name")
-            if list_id:
-                lists_map[list_id] = list_name
-        return lists_map
-    
-    
-    
-    
+        return self.metadata.lists_map()
+
     def get_list_name_by_id(self, list_id: str) -> str | None:
         """
         Helper method to get list name by its ID.
+        A dictionary lookup in the metadata cache, an unknown id revalidates once.
+        """
+        return self.metadata.list_name(list_id)
+
+    def invalidate_metadata(self, kind: str | None = None) -> None:
+        """
+        Call after changing the board (e.g. renaming a column) so the next lookup revalidates.
         """
-        lists_map = self.build_lists_map()
-        return lists_map.get(list_id)
\ No newline at end of file
+        self.metadata.invalidate(kind)
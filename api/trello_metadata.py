@@ -0,0 +1,192 @@
+"""
+In-memory cache of board metadata (lists, labels, members) for TrelloClient.
+
+Lookups like "what is the name of list X" are dictionary hits. Entries live
+for 'ttl' seconds, after that they are revalidated with a conditional request
+(If-None-Match), so an unchanged board costs a tiny 304 instead of a full
+download. A lookup of an id we don't know (e.g. a column was just added)
+revalidates once before giving up, so renames and new columns are picked up.
+The miss itself is then remembered for 'ttl' seconds, so cards of archived or
+foreign lists don't cost a request per lookup.
+
+Requests are sent without holding the cache lock: readers of fresh entries
+never wait for a revalidation, and concurrent refreshes of the same kind are
+collapsed into one request.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# Seconds before cached metadata is revalidated
+DEFAULT_METADATA_TTL = 300.0
+
+# What we fetch for each kind of metadata: (resource, fields)
+METADATA_RESOURCES = {
+    "lists": ("lists", "name,closed,pos"),
+    "labels": ("labels", "name,color"),
+    "members": ("members", "fullName,username"),
+}
+
+
+@dataclass
+class _Entry:
+    items: List[Dict] = field(default_factory=list)
+    by_id: Dict[str, Dict] = field(default_factory=dict)
+    etag: str | None = None
+    fetched_at: float = 0.0
+    # Ids that were not found even after a revalidation -> when that happened
+    misses: Dict[str, float] = field(default_factory=dict)
+
+
+class BoardMetadataCache:
+    """
+    Cached lists / labels / members of one board.
+
+    client: the TrelloClient used for the requests
+    ttl: seconds before an entry is revalidated (0 = revalidate every time)
+    """
+
+    def __init__(self, client, board_id: str, ttl: float = DEFAULT_METADATA_TTL):
+        self.client = client
+        self.board_id = board_id
+        self.ttl = ttl
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        # One request per kind at a time, held while the request is in flight
+        self._fetch_locks = {kind: threading.Lock() for kind in METADATA_RESOURCES}
+
+        # Counters, useful in tests and when tuning the ttl
+        self.fetches = 0
+        self.revalidations = 0
+
+    def _load(self, kind: str, force: bool = False) -> _Entry:
+        """
+        The entry for this kind, fetched or revalidated when needed.
+        """
+        requested_at = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(kind)
+            if entry is not None and not force and requested_at - entry.fetched_at < self.ttl:
+                return entry
+
+        with self._fetch_locks[kind]:
+            with self._lock:
+                entry = self._entries.get(kind)
+                # Another thread refreshed it while we were waiting
+                if entry is not None and entry.fetched_at >= requested_at:
+                    return entry
+
+            resource, fields = METADATA_RESOURCES[kind]
+            items, etag = self.client._get_if_changed(
+                f"/boards/{self.board_id}/{resource}",
+                {"fields": fields},
+                etag=entry.etag if entry is not None else None,
+            )
+            now = time.monotonic()
+
+            with self._lock:
+                if items is None and entry is not None:
+                    # 304 Not Modified, what we have is still current
+                    self.revalidations += 1
+                    entry.fetched_at = now
+                    return entry
+
+                self.fetches += 1
+                entry = _Entry(
+                    items=items or [],
+                    by_id={item["id"]: item for item in items or [] if item.get("id")},
+                    etag=etag,
+                    fetched_at=now,
+                )
+                self._entries[kind] = entry
+                return entry
+
+    def _lookup(self, kind: str, item_id: str) -> Dict | None:
+        entry = self._load(kind)
+        item = entry.by_id.get(item_id)
+        if item is not None:
+            return item
+
+        with self._lock:
+            missed_at = entry.misses.get(item_id)
+        if missed_at is not None and time.monotonic() - missed_at < self.ttl:
+            return None
+
+        # Unknown id, maybe it was added after we cached the board
+        entry = self._load(kind, force=True)
+        item = entry.by_id.get(item_id)
+        if item is None:
+            with self._lock:
+                entry.misses[item_id] = time.monotonic()
+        return item
+
+    # ==================================================
+    # Lists
+    # ==================================================
+
+    def lists(self) -> List[Dict]:
+        return self._load("lists").items
+
+    def lists_map(self) -> Dict[str, str]:
+        """
+        list_id -> list_name
+        """
+        return {list_id: lst.get("name") for list_id, lst in self._load("lists").by_id.items()}
+
+    def list_name(self, list_id: str) -> str | None:
+        lst = self._lookup("lists", list_id)
+        return lst.get("name") if lst else None
+
+    # ==================================================
+    # Labels and members
+    # ==================================================
+
+    def labels(self) -> List[Dict]:
+        return self._load("labels").items
+
+    def label_name(self, label_id: str) -> str | None:
+        label = self._lookup("labels", label_id)
+        return label.get("name") if label else None
+
+    def members(self) -> List[Dict]:
+        return self._load("members").items
+
+    def member_name(self, member_id: str) -> str | None:
+        member = self._lookup("members", member_id)
+        return member.get("fullName") if member else None
+
+    def prime(self, kind: str, items: List[Dict]) -> None:
+        """
+        Store metadata that arrived with another response (e.g. a board snapshot).
+        """
+        with self._lock:
+            self._entries[kind] = _Entry(
+                items=list(items),
+                by_id={item["id"]: item for item in items if item.get("id")},
+                fetched_at=time.monotonic(),
+            )
+
+    # ==================================================
+    # Invalidation
+    # ==================================================
+
+    def invalidate(self, kind: str | None = None) -> None:
+        """
+        Make the next lookup revalidate. kind: 'lists', 'labels', 'members' or None for all.
+        The ETag is kept, so revalidation is still a cheap conditional request.
+        """
+        with self._lock:
+            kinds = [kind] if kind else list(self._entries)
+            for name in kinds:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    entry.fetched_at = float("-inf")
+
+    def clear(self) -> None:
+        """
+        Forget everything (including ETags), the next lookup downloads again.
+        """
+        with self._lock:
+            self._entries.clear()
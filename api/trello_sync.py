@@ -0,0 +1,300 @@
+"""
+Incremental Trello board sync based on board actions.
+
+The first run downloads every open card and saves a checkpoint: the id of
+the newest board action plus the cards. Later runs only ask Trello for the
+actions since that id (cards created, updated, moved, archived, labels
+added / removed) and apply them to the stored cards.
+If we can't trust the actions (too many of them, a type we can't apply,
+or Trello rejects the cursor) we fall back to a full refresh.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import requests
+
+from config import TRELLO_SYNC_STATE_FILE
+
+# Card changes we know how to apply to the local store
+CARD_CREATED_ACTIONS = {
+    "createCard", "copyCard", "moveCardToBoard", "convertToCardFromCheckItem", "emailCard",
+}
+CARD_REMOVED_ACTIONS = {"deleteCard", "moveCardFromBoard"}
+CARD_LABEL_ACTIONS = {"addLabelToCard", "removeLabelFromCard"}
+CARD_UPDATE_ACTIONS = {"updateCard"}
+
+# Board changes that can hide or show many cards at once -> full refresh
+GAP_ACTIONS = {"updateList", "moveListFromBoard", "moveListToBoard", "updateLabel", "deleteLabel"}
+
+ACTION_FILTER = ",".join(sorted(
+    CARD_CREATED_ACTIONS | CARD_REMOVED_ACTIONS | CARD_LABEL_ACTIONS | CARD_UPDATE_ACTIONS | GAP_ACTIONS
+))
+
+# Trello returns at most 1000 actions per request
+ACTIONS_PAGE_SIZE = 1000
+
+# More changes than this and a full refresh is cheaper than replaying them
+DEFAULT_MAX_ACTIONS = 5000
+
+# Card fields we keep, same as TrelloClient.get_board_cards
+CARD_KEYS = ("name", "desc", "idList", "labels")
+
+
+@dataclass
+class BoardSyncResult:
+    """
+    What a single sync run did.
+    """
+    full_refresh: bool
+    actions: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.full_refresh or bool(self.added or self.updated or self.removed)
+
+
+@dataclass
+class BoardCheckpoint:
+    """
+    Persisted sync state.
+    since: id of the newest processed action (or an ISO date when the board had no actions)
+    cards: {card_id: card}
+    """
+    since: str | None = None
+    cards: Dict[str, Dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "BoardCheckpoint":
+        """
+        Load a checkpoint file, or return an empty checkpoint if it doesn't exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="UTF-8") as f:
+            data = json.load(f)
+        return cls(since=data.get("since"), cards=data.get("cards", {}))
+
+    def save(self, path: str) -> None:
+        """
+        Write the checkpoint atomically (temp file + rename).
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="UTF-8") as f:
+            json.dump({"since": self.since, "cards": self.cards}, f)
+        os.replace(tmp_path, path)
+
+
+class _SyncGap(Exception):
+    """
+    The actions since the checkpoint can't be replayed safely.
+    """
+
+
+class BoardSync:
+    """
+    Keeps a local copy of the board's open cards up to date using board actions.
+    'client' is a TrelloClient.
+    """
+
+    def __init__(
+        self,
+        client,
+        board_id: str,
+        checkpoint_file: str = TRELLO_SYNC_STATE_FILE,
+        max_actions: int = DEFAULT_MAX_ACTIONS,
+        page_size: int = ACTIONS_PAGE_SIZE,
+    ):
+        self.client = client
+        self.board_id = board_id
+        self.checkpoint_file = checkpoint_file
+        self.max_actions = max_actions
+        self.page_size = page_size
+        self.checkpoint = BoardCheckpoint.load(checkpoint_file)
+
+    def sync(self) -> BoardSyncResult:
+        """
+        Bring the local store up to date and save the checkpoint
+        (the file is only rewritten when something changed).
+        """
+        previous_since = self.checkpoint.since
+        if self.checkpoint.since is None:
+            result = self._full_refresh()
+        else:
+            try:
+                result = self._apply_actions()
+            except _SyncGap:
+                result = self._full_refresh()
+            except requests.HTTPError as error:
+                # The cursor action was deleted or is otherwise rejected
+                if error.response is None or error.response.status_code not in (400, 404):
+                    raise
+                result = self._full_refresh()
+
+        if result.changed or self.checkpoint.since != previous_since:
+            self.checkpoint.save(self.checkpoint_file)
+        return result
+
+    def cards(self) -> List[Dict]:
+        """
+        All stored open cards, in the order they were first seen.
+        """
+        return [{"id": card_id, **card} for card_id, card in self.checkpoint.cards.items()]
+
+    # ==================================================
+    # Internal helpers
+    # ==================================================
+
+    def _actions_path(self) -> str:
+        return f"/boards/{self.board_id}/actions"
+
+    def _latest_cursor(self) -> str:
+        """
+        Id of the newest board action, or 'now' if the board has none.
+        """
+        actions = self.client._get(self._actions_path(), {"limit": 1, "fields": "id"})
+        if actions:
+            return actions[0]["id"]
+        return datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def _card_entry(card: Dict) -> Dict:
+        return {key: card.get(key) for key in CARD_KEYS}
+
+    def _full_refresh(self) -> BoardSyncResult:
+        """
+        Download every open card again.
+        The cursor is read before the cards, so nothing that changes
+        while we download is missed on the next run.
+        """
+        since = self._latest_cursor()
+        cards = self.client._get_all_board_cards()
+        self.checkpoint = BoardCheckpoint(
+            since=since,
+            cards={card["id"]: self._card_entry(card) for card in cards},
+        )
+        return BoardSyncResult(full_refresh=True, added=len(cards))
+
+    def _fetch_actions(self) -> List[Dict]:
+        """
+        Every action since the checkpoint, oldest first.
+        Trello pages newest first, so we walk back with 'before'.
+        """
+        actions: List[Dict] = []
+        before = None
+
+        while True:
+            params = {
+                "since": self.checkpoint.since,
+                "filter": ACTION_FILTER,
+                "limit": self.page_size,
+                "fields": "id,type,date,data",
+            }
+            if before:
+                params["before"] = before
+            page = self.client._get(self._actions_path(), params)
+            actions.extend(page)
+
+            if len(actions) > self.max_actions:
+                raise _SyncGap("too many actions")
+            if len(page) < self.page_size:
+                break
+            before = page[-1]["id"]
+
+        actions.reverse()
+        return actions
+
+    def _apply_actions(self) -> BoardSyncResult:
+        actions = self._fetch_actions()
+        result = BoardSyncResult(full_refresh=False, actions=len(actions))
+        if not actions:
+            return result
+
+        cards = self.checkpoint.cards
+        to_fetch: Dict[str, None] = {}  # ordered set, cards we need to read in full
+
+        for action in actions:
+            kind = action["type"]
+            data = action.get("data", {})
+            card_id = data.get("card", {}).get("id")
+
+            if self._is_gap(action):
+                raise _SyncGap(kind)
+
+            if kind in CARD_CREATED_ACTIONS:
+                # The action doesn't carry the description / labels, read the card later
+                to_fetch[card_id] = None
+            elif kind in CARD_REMOVED_ACTIONS:
+                to_fetch.pop(card_id, None)
+                if cards.pop(card_id, None) is not None:
+                    result.removed += 1
+            elif kind in CARD_LABEL_ACTIONS:
+                if card_id in cards:
+                    self._apply_label(cards[card_id], kind, data.get("label", {}))
+                    result.updated += 1
+            elif kind in CARD_UPDATE_ACTIONS:
+                self._apply_update(card_id, data, to_fetch, result)
+
+        for card in self.client._get_cards(list(to_fetch)):
+            if card is None or card.get("closed"):
+                continue
+            if card["id"] not in cards:
+                result.added += 1
+            cards[card["id"]] = self._card_entry(card)
+
+        self.checkpoint.since = actions[-1]["id"]
+        return result
+
+    @staticmethod
+    def _is_gap(action: Dict) -> bool:
+        """
+        A board change that affects cards without a card action of its own.
+        Renaming a column doesn't touch the cards, archiving one hides them all.
+        """
+        if action["type"] not in GAP_ACTIONS:
+            return False
+        if action["type"] == "updateList":
+            return "closed" in action.get("data", {}).get("old", {})
+        return True
+
+    def _apply_update(self, card_id: str, data: Dict, to_fetch: Dict[str, None], result: BoardSyncResult) -> None:
+        """
+        updateCard carries the changed fields in data.card and their old values in data.old.
+        """
+        cards = self.checkpoint.cards
+        changed = data.get("old", {}).keys()
+        new_values = data.get("card", {})
+
+        if "closed" in changed:
+            if new_values.get("closed"):
+                to_fetch.pop(card_id, None)
+                if cards.pop(card_id, None) is not None:
+                    result.removed += 1
+            else:
+                # Unarchived, we don't have its latest state
+                to_fetch[card_id] = None
+            return
+
+        card = cards.get(card_id)
+        if card is None:
+            if card_id not in to_fetch:
+                to_fetch[card_id] = None
+            return
+
+        for key in changed:
+            if key in CARD_KEYS and key in new_values:
+                card[key] = new_values[key]
+        result.updated += 1
+
+    @staticmethod
+    def _apply_label(card: Dict, kind: str, label: Dict) -> None:
+        labels = [existing for existing in card.get("labels") or [] if existing.get("id") != label.get("id")]
+        if kind == "addLabelToCard":
+            labels.append({key: label.get(key) for key in ("id", "name", "color")})
+        card["labels"] = labels
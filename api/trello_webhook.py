@@ -0,0 +1,308 @@
+"""
+Event-driven change detection with Trello webhooks.
+
+TrelloWebhookReceiver runs a tiny HTTP server in a background thread,
+registers a board webhook that points at it, checks the signature of every
+callback and turns card actions into CardEvent objects.
+Instead of polling the board, a check can simply wait for the event:
+
+    with TrelloWebhookReceiver(client, callback_url="https://my-tunnel/hook") as receiver:
+        receiver.register()
+        event = receiver.wait_for(card_moved_to("Completed"), timeout=30)
+
+Trello must be able to reach callback_url, for local runs that usually
+means a tunnel that forwards to the receiver's port.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+from config import TRELLO_API_SECRET
+
+SIGNATURE_HEADER = "X-Trello-Webhook"
+
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+
+def sign_payload(body: bytes, callback_url: str, secret: str) -> str:
+    """
+    Trello's callback signature: base64(HMAC-SHA1(secret, body + callbackURL)).
+    """
+    digest = hmac.new(secret.encode(), body + callback_url.encode(), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_signature(body: bytes, callback_url: str, secret: str, signature: str | None) -> bool:
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, callback_url, secret), signature)
+
+
+@dataclass
+class CardEvent:
+    """
+    One card related board action, as delivered by a webhook.
+    list_name: the list the card is in after the action (if the action says)
+    label_name: for addLabelToCard / removeLabelFromCard
+    """
+    type: str
+    card_id: str | None = None
+    card_name: str | None = None
+    list_name: str | None = None
+    label_name: str | None = None
+    action: Dict = field(default_factory=dict)
+
+    @classmethod
+    def from_action(cls, action: Dict) -> "CardEvent":
+        data = action.get("data", {})
+        card = data.get("card", {})
+        lst = data.get("listAfter") or data.get("list") or {}
+        return cls(
+            type=action.get("type", ""),
+            card_id=card.get("id"),
+            card_name=card.get("name"),
+            list_name=lst.get("name"),
+            label_name=(data.get("label") or {}).get("name"),
+            action=action,
+        )
+
+
+# ==================================================
+# Predicates for wait_for()
+# ==================================================
+
+def card_created(title: str | None = None) -> Callable[[CardEvent], bool]:
+    return lambda event: event.type == "createCard" and (title is None or event.card_name == title)
+
+
+def card_moved_to(list_name: str, title: str | None = None) -> Callable[[CardEvent], bool]:
+    return lambda event: (
+        event.type in ("createCard", "updateCard")
+        and event.list_name == list_name
+        and (title is None or event.card_name == title)
+    )
+
+
+def label_added(label_name: str, title: str | None = None) -> Callable[[CardEvent], bool]:
+    return lambda event: (
+        event.type == "addLabelToCard"
+        and event.label_name == label_name
+        and (title is None or event.card_name == title)
+    )
+
+
+class TrelloWebhookReceiver:
+    """
+    Receives Trello webhook callbacks on a local port.
+
+    client: TrelloClient, used to register / delete the webhook
+    callback_url: the public URL Trello posts to (defaults to the local address)
+    secret: verifies callback signatures, empty = don't verify
+    """
+
+    def __init__(
+        self,
+        client,
+        callback_url: str | None = None,
+        secret: str = TRELLO_API_SECRET,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.client = client
+        self.secret = secret
+        self.webhook_id: str | None = None
+
+        # Counters for callbacks that were not accepted
+        self.rejected = 0
+
+        # Events nobody has taken yet. Every waiter scans it again on each wakeup,
+        # so an event a waiter doesn't want stays there for the others.
+        self._pending: List[CardEvent] = []
+        self._arrived = threading.Condition()
+        # (loop, asyncio.Event) of the async waiters, set when an event arrives
+        self._async_wakeups: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self.callback_url = callback_url or self.local_url
+
+    @property
+    def local_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "TrelloWebhookReceiver":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.webhook_id is not None:
+            self.unregister()
+        if self._thread.is_alive():
+            self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "TrelloWebhookReceiver":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # ==================================================
+    # Webhook registration
+    # ==================================================
+
+    def register(self, id_model: str | None = None, description: str = "sync checks") -> str:
+        """
+        Create the webhook, on the client's board unless id_model is given
+        (the receiver must already be started, Trello checks the callback URL first).
+        """
+        webhook = self.client.create_webhook(self.callback_url, id_model, description)
+        self.webhook_id = webhook["id"]
+        return self.webhook_id
+
+    def unregister(self) -> None:
+        if self.webhook_id is not None:
+            self.client.delete_webhook(self.webhook_id)
+            self.webhook_id = None
+
+    # ==================================================
+    # Waiting for events
+    # ==================================================
+
+    def _take(self, predicate: Callable[[CardEvent], bool]) -> CardEvent | None:
+        """
+        Remove and return the oldest pending event matching 'predicate' (condition must be held).
+        """
+        for index, event in enumerate(self._pending):
+            if predicate(event):
+                return self._pending.pop(index)
+        return None
+
+    def _publish(self, event: CardEvent) -> None:
+        with self._arrived:
+            self._pending.append(event)
+            self._arrived.notify_all()
+            wakeups = list(self._async_wakeups)
+        for loop, arrived in wakeups:
+            try:
+                loop.call_soon_threadsafe(arrived.set)
+            except RuntimeError:
+                pass  # that event loop is already closed
+
+    def wait_for(
+        self,
+        predicate: Callable[[CardEvent], bool] = lambda event: True,
+        timeout: float = DEFAULT_WAIT_TIMEOUT,
+    ) -> CardEvent:
+        """
+        Block until an event matching 'predicate' arrives (or already arrived
+        and wasn't consumed yet). Raises TimeoutError after 'timeout' seconds.
+        Several threads can wait at the same time, each gets its own events.
+        """
+        deadline = time.monotonic() + timeout
+        with self._arrived:
+            while True:
+                event = self._take(predicate)
+                if event is not None:
+                    return event
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"no matching Trello event within {timeout} seconds")
+                self._arrived.wait(remaining)
+
+    async def wait_for_async(
+        self,
+        predicate: Callable[[CardEvent], bool] = lambda event: True,
+        timeout: float = DEFAULT_WAIT_TIMEOUT,
+    ) -> CardEvent:
+        """
+        Same as wait_for(), without blocking the event loop.
+        A cancelled wait takes nothing, its event stays there for other waiters.
+        """
+        loop = asyncio.get_running_loop()
+        arrived = asyncio.Event()
+        wakeup = (loop, arrived)
+        deadline = loop.time() + timeout
+
+        with self._arrived:
+            self._async_wakeups.append(wakeup)
+        try:
+            while True:
+                # Cleared before looking, so an event published in between still wakes us up
+                arrived.clear()
+                with self._arrived:
+                    event = self._take(predicate)
+                if event is not None:
+                    return event
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"no matching Trello event within {timeout} seconds")
+                try:
+                    await asyncio.wait_for(arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            with self._arrived:
+                self._async_wakeups.remove(wakeup)
+
+    # ==================================================
+    # Callback handling
+    # ==================================================
+
+    def _reject(self) -> bool:
+        # Handlers run on several threads (ThreadingHTTPServer)
+        with self._arrived:
+            self.rejected += 1
+        return False
+
+    def _accept(self, body: bytes, signature: str | None) -> bool:
+        if self.secret and not verify_signature(body, self.callback_url, self.secret, signature):
+            return self._reject()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._reject()
+        if not isinstance(payload, dict):
+            # Valid JSON, but not a webhook callback ('[]', '"text"', ...)
+            return self._reject()
+
+        action = payload.get("action") or {}
+        # Only card actions are interesting for the sync checks
+        if (action.get("data") or {}).get("card"):
+            self._publish(CardEvent.from_action(action))
+        return True
+
+    def _make_handler(self):
+        receiver = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass  # keep pytest output clean
+
+            def _reply(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_HEAD(self):
+                # Trello checks the callback URL with a HEAD before creating the webhook
+                self._reply(200)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                accepted = receiver._accept(body, self.headers.get(SIGNATURE_HEADER))
+                self._reply(200 if accepted else 401)
+
+        return _Handler
@@ -1,34 +1,49 @@
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import Browser, sync_playwright
+
+from ui.common.context_pool import save_storage_state
 
 # We use the same board url as in TrelloClient
 TRELLO_BOARD_URL = "https://trello.com/b/2GzdgPlw/droxi"
+TRELLO_AUTH_STATE_FILE = "trello_auth_state.json"
+BOARD_HEADER_SELECTOR = '[data-testid="board-name-display"]'
+
+# You have 3 minutes to log in and land on the board.
+LOGIN_TIMEOUT_MS = 3 * 60 * 1000
 
-def main():
-    with sync_playwright() as p:
-        #headless= False = visible browser for manual login
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
 
-        page.goto(TRELLO_BOARD_URL)
+def save_trello_auth_state(browser: Browser, path: str = TRELLO_AUTH_STATE_FILE) -> None:
+    """
+    Manual login in a visible browser, the session is saved as soon as the board shows up.
+    Also used by the UI tests when the saved state has expired (--trello-reauth).
+    """
+    context = browser.new_context()
+    page = context.new_page()
 
-        print(
-            "\n=== Trello auth setup ===\n"
-            "1. In the opened browser, click 'Log in' / 'Log in with Google'.\n"
-            "2. Log in with the provided Droxi Google account.\n"
-            "3. Complete any 2FA / SMS steps.\n"
-            "4. Make sure you see the 'droxi' board.\n"
-            "5. Then come back here; after the timeout the session will be saved.\n"
-        )
+    page.goto(TRELLO_BOARD_URL)
 
-        # You have 3 minutes to log in and land on the board.
-        page.wait_for_timeout(3 * 60 * 1000)
+    print(
+        "\n=== Trello auth setup ===\n"
+        "1. In the opened browser, click 'Log in' / 'Log in with Google'.\n"
+        "2. Log in with the provided Droxi Google account.\n"
+        "3. Complete any 2FA / SMS steps.\n"
+        "4. Make sure you see the 'droxi' board.\n"
+        "5. The session is saved once the board is open.\n"
+    )
 
-        # Save the authenticated state to a file
-        context.storage_state(path="trello_auth_state.json")
-        print("Trello authentication state saved to 'trello_auth_state.json'.")
+    page.locator(BOARD_HEADER_SELECTOR).wait_for(state="visible", timeout=LOGIN_TIMEOUT_MS)
 
+    # Save the authenticated state to a file (atomically, UI test workers may be reading it)
+    save_storage_state(context, path)
+    print(f"Trello authentication state saved to '{path}'.")
+    context.close()
+
+
+def main():
+    with sync_playwright() as p:
+        #headless= False = visible browser for manual login
+        browser = p.chromium.launch(headless=False)
+        save_trello_auth_state(browser)
         browser.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
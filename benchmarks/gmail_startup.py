@@ -0,0 +1,92 @@
+"""
+Benchmark: GmailClient startup, old eager path vs. lazy / shared path.
+
+The old path loaded token.json and called googleapiclient's build()
+for every client. The new path shares the credentials per token file and
+builds the service from a discovery document that is parsed once.
+
+Runs offline with a throw-away token file:
+    python benchmarks/gmail_startup.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from api.gmail_client import GmailClient
+from api.gmail_service import SCOPES
+
+CLIENTS = 200
+WORKERS = 8
+
+
+def _write_token_file(directory: str) -> str:
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    path = os.path.join(directory, "token.json")
+    with open(path, "w", encoding="UTF-8") as f:
+        json.dump({
+            "token": "fake-access-token",
+            "refresh_token": "fake-refresh-token",
+            "client_id": "fake-client-id",
+            "client_secret": "fake-client-secret",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }, f)
+    return path
+
+
+def eager_startup(token_file: str):
+    creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+    return build("gmail", "v1", credentials=creds)
+
+
+def lazy_startup(token_file: str):
+    # Creating the client costs nothing, the service is built on first use
+    return GmailClient(token_file=token_file).service
+
+
+def _measure(label: str, func, token_file: str) -> float:
+    start = time.perf_counter()
+    for _ in range(CLIENTS):
+        func(token_file)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(func, [token_file] * CLIENTS))
+    threaded = time.perf_counter() - start
+
+    print(
+        f"{label:<8} {CLIENTS} clients: {serial * 1000:8.1f} ms serial, "
+        f"{threaded * 1000:8.1f} ms on {WORKERS} threads "
+        f"({serial / CLIENTS * 1000:.3f} ms per client)"
+    )
+    return serial
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        token_file = _write_token_file(directory)
+
+        # Cold start: the first client pays for parsing the discovery document once
+        start = time.perf_counter()
+        lazy_startup(token_file)
+        print(f"first lazy client (cold): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        eager = _measure("eager", eager_startup, token_file)
+        lazy = _measure("lazy", lazy_startup, token_file)
+        print(f"speed-up per client: {eager / lazy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,25 @@ load_dotenv()
 #Trello API details
 TRELLO_API_KEY = os.getenv("TRELLO_API_KEY", "")
 TRELLO_API_TOKEN = os.getenv("TRELLO_API_TOKEN", "")
+# Signs webhook callbacks (the "Secret" on the Trello Power-Up admin page)
+TRELLO_API_SECRET = os.getenv("TRELLO_API_SECRET", "")
 
 TRELLO_BOARD_ID = "2GzdgPlw"
 
+# Checkpoint for incremental board sync (TrelloClient(sync_state_file=...))
+TRELLO_SYNC_STATE_FILE = "./trello_sync_state.json"
+
+# (mailbox, board) pairs checked by the fleet runner (python -m api.fleet),
+# without this file only the pair above is checked
+SYNC_PAIRS_FILE = os.getenv("SYNC_PAIRS_FILE", "./sync_pairs.json")
+
 #Gmail API details
 GMAIL_TOKEN_FILE = "./token.json"
 GMAIL_CREDENTIALS_FILE = "./credentials.json"
 
+# Checkpoint for incremental inbox sync (GmailClient(sync_state_file=...))
+GMAIL_SYNC_STATE_FILE = "./gmail_sync_state.json"
+
+# Parsed message cache (GmailClient(cache_file=...))
+GMAIL_CACHE_FILE = "./gmail_cache.sqlite3"
+
@@ -1,22 +1,191 @@
 """
 This is for shared pytest fixtures for the API tests.
 Whatever fixture is defined here will be discovered by Pytest
+
+The sync tests run against one of these backends (--api-backend, or API_BACKEND):
+- live:   the real Gmail and Trello APIs (default)
+- record: the real APIs, every response is also saved into tests_api/cassettes/
+- replay: answered from the saved cassettes, no network
+- fake:   local Gmail / Trello stand-ins seeded with a synthetic inbox and board
+          (--synthetic-emails sets the inbox size)
 """
 
+import asyncio
+import os
+
 import pytest
+from google.auth.credentials import AnonymousCredentials
+
+from api.async_clients import AsyncGmailClient, AsyncTrelloClient, fetch_sync_snapshots
+from api.cassette import RECORD, REPLAY, Cassette
 from api.gmail_client import GmailClient
+from api.gmail_service import build_gmail_service
+from api.reconcile import Reconciler
 from api.trello_client import TrelloClient
+from api.trello_webhook import TrelloWebhookReceiver
+from tests_api.fake_gmail_server import FakeGmailServer
+from tests_api.fake_trello_server import FakeTrelloServer
+from tests_api.synthetic import seed, synthetic_workspace
+
+LIVE = "live"
+FAKE = "fake"
+BACKENDS = (LIVE, RECORD, REPLAY, FAKE)
+
+CASSETTE_DIR = os.path.join(os.path.dirname(__file__), "cassettes")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--api-backend",
+        choices=BACKENDS,
+        default=os.getenv("API_BACKEND", LIVE),
+        help="where the API sync tests get their data from",
+    )
+    parser.addoption(
+        "--synthetic-emails",
+        type=int,
+        default=100,
+        help="inbox size for --api-backend=fake",
+    )
+
+@pytest.fixture(scope="session")
+def api_backend(request):
+    return request.config.getoption("--api-backend")
+
+@pytest.fixture(scope="session")
+def synthetic_servers(request):
+    """
+    Session-wide Gmail and Trello stand-ins holding the same synthetic workspace.
+    Returns (FakeGmailServer, FakeTrelloServer)
+    """
+    gmail_server = FakeGmailServer().start()
+    trello_server = FakeTrelloServer().start()
+    seed(gmail_server, trello_server, synthetic_workspace(request.config.getoption("--synthetic-emails")))
+    yield gmail_server, trello_server
+    gmail_server.stop()
+    trello_server.stop()
+
+def _cassette(api_backend: str, name: str):
+    """
+    The session cassette for one API, saved at the end of a recording session.
+    """
+    path = os.path.join(CASSETTE_DIR, f"{name}.json")
+    if api_backend == REPLAY and not os.path.exists(path):
+        pytest.skip(f"no {name} cassette yet, record one with --api-backend={RECORD}")
+    cassette = Cassette(path, mode=api_backend)
+    yield cassette
+    if cassette.recording:
+        cassette.save()
+
+@pytest.fixture(scope="session")
+def gmail_cassette(api_backend):
+    yield from _cassette(api_backend, "gmail")
+
+@pytest.fixture(scope="session")
+def trello_cassette(api_backend):
+    yield from _cassette(api_backend, "trello")
 
 @pytest.fixture(scope="session")
-def gmail_client():
+def gmail_client(request, api_backend):
     """
     creating a single GmailClient instance for all tests in this session
     """
+    # The client-side quota only protects the real API
+    if api_backend == FAKE:
+        gmail_server, _ = request.getfixturevalue("synthetic_servers")
+        return GmailClient(token_file=None, api_endpoint=gmail_server.url, quota_units_per_second=None)
+    if api_backend == REPLAY:
+        return GmailClient(cassette=request.getfixturevalue("gmail_cassette"), quota_units_per_second=None)
+    if api_backend == RECORD:
+        return GmailClient(cassette=request.getfixturevalue("gmail_cassette"))
     return GmailClient()
 
 @pytest.fixture(scope="session")
-def trello_client():
+def trello_client(request, api_backend):
     """
     creating a single TrelloClient instance for all tests in this session
     """
-    return TrelloClient()
\ No newline at end of file
+    if api_backend == FAKE:
+        _, trello_server = request.getfixturevalue("synthetic_servers")
+        return TrelloClient(base_url=trello_server.url, requests_per_second=None)
+    if api_backend == REPLAY:
+        return TrelloClient(cassette=request.getfixturevalue("trello_cassette"), requests_per_second=None)
+    if api_backend == RECORD:
+        return TrelloClient(cassette=request.getfixturevalue("trello_cassette"))
+    return TrelloClient()
+
+@pytest.fixture(scope="session")
+def sync_snapshots(gmail_client, trello_client):
+    """
+    The inbox and the board are read once per session, at the same time.
+    Returns (InboxSnapshot, BoardSnapshot)
+    """
+    return asyncio.run(fetch_sync_snapshots(
+        AsyncGmailClient(gmail_client),
+        AsyncTrelloClient(trello_client),
+        max_results=100,
+    ))
+
+@pytest.fixture(scope="session")
+def inbox_snapshot(sync_snapshots):
+    """
+    every sync test analyses the same inbox snapshot
+    """
+    return sync_snapshots[0]
+
+@pytest.fixture(scope="session")
+def board_snapshot(sync_snapshots):
+    """
+    cards, lists and labels of the board, read in one request
+    """
+    return sync_snapshots[1]
+
+@pytest.fixture(scope="session")
+def reconciliation(inbox_snapshot, board_snapshot):
+    """
+    every difference between the inbox and the board, found once per session
+    (the inbox snapshot is only the latest emails, so older cards are not reported)
+    """
+    return Reconciler(check_unexpected=False).reconcile(inbox_snapshot, board_snapshot)
+
+@pytest.fixture
+def fake_gmail_server():
+    """
+    A local stand-in for the Gmail API, stopped after each test.
+    """
+    server = FakeGmailServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_gmail_service(fake_gmail_server):
+    """
+    A real googleapiclient Gmail service that talks to the local stand-in.
+    Uses the discovery document that ships with googleapiclient (no network).
+    """
+    return build_gmail_service(
+        AnonymousCredentials(),
+        client_options={"api_endpoint": fake_gmail_server.url},
+    )
+
+
+@pytest.fixture
+def fake_trello_server():
+    """
+    A local stand-in for the Trello API, stopped after each test.
+    """
+    server = FakeTrelloServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def trello_webhook_receiver(fake_trello_server):
+    """
+    A started webhook receiver whose client talks to the local Trello stand-in.
+    """
+    client = TrelloClient(base_url=fake_trello_server.url)
+    receiver = TrelloWebhookReceiver(client, secret=fake_trello_server.webhook_secret).start()
+    yield receiver
+    receiver.stop()
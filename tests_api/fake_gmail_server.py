@@ -0,0 +1,376 @@
+"""
+A tiny local stand-in for the Gmail REST API.
+It is used by offline tests, so they don't need a real mailbox.
+
+Supported endpoints:
+- GET  /gmail/v1/users/me/profile
+- GET  /gmail/v1/users/me/history           (startHistoryId + paging)
+- GET  /gmail/v1/users/me/messages          (list)
+- GET  /gmail/v1/users/me/messages/{id}     (get)
+- POST /batch/gmail/v1                      (multipart/mixed batch of gets)
+
+Like Gmail, every endpoint applies the 'fields' partial-response mask.
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PROFILE_PATH = "/gmail/v1/users/me/profile"
+HISTORY_PATH = "/gmail/v1/users/me/history"
+MESSAGES_PATH = "/gmail/v1/users/me/messages"
+BATCH_PATH = "/batch/gmail/v1"
+
+# Seconds serve_forever() waits between shutdown checks
+SHUTDOWN_POLL_INTERVAL = 0.05
+
+_FIELD_NAME = re.compile(r"[^,/()]+")
+
+
+def make_message(msg_id: str, subject: str, body: str, internal_date: int = 0) -> dict:
+    """
+    Build a Gmail-shaped 'full' message with a single text/plain body.
+    """
+    data = base64.urlsafe_b64encode(body.encode("UTF-8")).decode("ascii")
+    return {
+        "id": msg_id,
+        "threadId": msg_id,
+        "labelIds": ["INBOX"],
+        "internalDate": str(internal_date),
+        "payload": {
+            "mimeType": "text/plain",
+            "headers": [{"name": "Subject", "value": subject}],
+            "body": {"size": len(body), "data": data},
+        },
+    }
+
+
+def _message_ref(msg: dict) -> dict:
+    """
+    The short message form used inside history records.
+    """
+    return {"id": msg["id"], "threadId": msg["threadId"], "labelIds": list(msg["labelIds"])}
+
+
+def _parse_fields(mask: str, pos: int = 0) -> tuple[dict, int]:
+    """
+    Parse a partial-response mask into a tree, {} meaning "the whole value".
+    'a,b/c,d(e,f)' -> {'a': {}, 'b': {'c': {}}, 'd': {'e': {}, 'f': {}}}
+    """
+    tree: dict = {}
+    while pos < len(mask) and mask[pos] != ")":
+        match = _FIELD_NAME.match(mask, pos)
+        node = tree.setdefault(match.group().strip(), {})
+        pos = match.end()
+        # 'a/b' selects b inside a
+        while pos < len(mask) and mask[pos] == "/":
+            match = _FIELD_NAME.match(mask, pos + 1)
+            node = node.setdefault(match.group().strip(), {})
+            pos = match.end()
+        if pos < len(mask) and mask[pos] == "(":
+            subtree, pos = _parse_fields(mask, pos + 1)
+            node.update(subtree)
+            pos += 1  # the closing ')'
+        if pos < len(mask) and mask[pos] == ",":
+            pos += 1
+    return tree, pos
+
+
+def _apply_fields(value, tree: dict):
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_apply_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _apply_fields(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _all_text(part: dict) -> list[str]:
+    """
+    Decoded data of every part in the MIME tree.
+    """
+    texts = []
+    data = part.get("body", {}).get("data")
+    if data:
+        texts.append(base64.urlsafe_b64decode(data).decode("UTF-8", errors="ignore"))
+    for child in part.get("parts", []):
+        texts.extend(_all_text(child))
+    return texts
+
+
+def _matches(msg: dict, query: str) -> bool:
+    """
+    A very small subset of Gmail search: in:inbox, subject:word and plain words.
+    Like Gmail, words match whole words only and case is ignored.
+    """
+    subject = next(
+        (h["value"] for h in msg["payload"]["headers"] if h["name"].lower() == "subject"), ""
+    )
+    body = " ".join(_all_text(msg["payload"]))
+
+    for term in query.split():
+        if term == "in:inbox":
+            if "INBOX" not in msg["labelIds"]:
+                return False
+        elif term.startswith("subject:"):
+            if not _words(term[len("subject:"):]) <= _words(subject):
+                return False
+        elif not _words(term) <= _words(subject) | _words(body):
+            return False
+    return True
+
+
+class FakeGmailServer:
+    """
+    Serves seeded messages over HTTP on a random local port.
+
+    fail_next: {msg_id: [status, ...]} - statuses to return (one per request)
+               for a message before it starts succeeding.
+    """
+
+    def __init__(self, messages: list[dict] | None = None):
+        self.messages: dict[str, dict] = {}
+        self.fail_next: dict[str, list[int]] = {}
+
+        # Mailbox history: every change gets the next history id
+        self.history_id = 1
+        self.history: list[dict] = []
+        self.oldest_history_id = 1
+        self.history_page_size = 100
+
+        # Counters so tests can check how many round-trips were made
+        self.batch_calls = 0
+        self.single_calls = 0
+        self.list_calls = 0
+        self.history_calls = 0
+        self.batch_sizes: list[int] = []
+        self.fields_seen: list[str] = []
+
+        # Slow every response down a bit and track how many run at the same time
+        self.response_delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # (start, end) time.monotonic() of every handled request
+        self.request_times: list[tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+        for msg in messages or []:
+            self.add_message(msg)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        # A short poll interval so stop() returns quickly
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": SHUTDOWN_POLL_INTERVAL}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def batch_uri(self) -> str:
+        return self.url.rstrip("/") + BATCH_PATH
+
+    def _record(self, **change) -> None:
+        self.history_id += 1
+        self.history.append({"id": str(self.history_id), **change})
+
+    def add_message(self, msg: dict) -> None:
+        self.messages[msg["id"]] = msg
+        self._record(messagesAdded=[{"message": _message_ref(msg)}])
+
+    def delete_message(self, msg_id: str) -> None:
+        msg = self.messages.pop(msg_id)
+        self._record(messagesDeleted=[{"message": _message_ref(msg)}])
+
+    def add_label(self, msg_id: str, label: str) -> None:
+        msg = self.messages[msg_id]
+        msg["labelIds"] = [*msg["labelIds"], label]
+        self._record(labelsAdded=[{"message": _message_ref(msg), "labelIds": [label]}])
+
+    def remove_label(self, msg_id: str, label: str) -> None:
+        msg = self.messages[msg_id]
+        msg["labelIds"] = [existing for existing in msg["labelIds"] if existing != label]
+        self._record(labelsRemoved=[{"message": _message_ref(msg), "labelIds": [label]}])
+
+    def archive_message(self, msg_id: str) -> None:
+        self.remove_label(msg_id, "INBOX")
+
+    def expire_history(self) -> None:
+        """
+        Forget all history so far, like Gmail does after about a week.
+        """
+        self.oldest_history_id = self.history_id + 1
+
+    def start(self) -> "FakeGmailServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # ==================================================
+    # Request handling
+    # ==================================================
+
+    def _get(self, path: str) -> tuple[int, dict]:
+        """
+        Handle a single GET and return (status, json_body), masked by 'fields'.
+        """
+        params = parse_qs(urlsplit(path).query)
+        status, body = self._route(path, params)
+        if status == 200 and "fields" in params:
+            self.fields_seen.append(params["fields"][0])
+            body = _apply_fields(body, _parse_fields(params["fields"][0])[0])
+        return status, body
+
+    def _route(self, path: str, params: dict) -> tuple[int, dict]:
+        split = urlsplit(path)
+
+        if split.path == PROFILE_PATH:
+            return 200, {"emailAddress": "me@example.com", "historyId": str(self.history_id)}
+
+        if split.path == HISTORY_PATH:
+            return self._history(params)
+
+        if split.path == MESSAGES_PATH:
+            self.list_calls += 1
+            page_size = int(params.get("maxResults", ["100"])[0])
+            start = int(params.get("pageToken", ["0"])[0])
+
+            # Newest first, like Gmail
+            query = params.get("q", [""])[0]
+            inbox = [msg for msg in self.messages.values() if _matches(msg, query)]
+            inbox.sort(key=lambda msg: int(msg["internalDate"]), reverse=True)
+            ids = [msg["id"] for msg in inbox]
+            page = ids[start:start + page_size]
+            result = {
+                "messages": [{"id": i, "threadId": i} for i in page],
+                "resultSizeEstimate": len(ids),
+            }
+            # Page tokens are just the offset of the next page
+            if start + page_size < len(ids):
+                result["nextPageToken"] = str(start + page_size)
+            return 200, result
+
+        if split.path.startswith(MESSAGES_PATH + "/"):
+            msg_id = split.path[len(MESSAGES_PATH) + 1:]
+            failures = self.fail_next.get(msg_id)
+            if failures:
+                status = failures.pop(0)
+                return status, {"error": {"code": status, "message": "injected failure"}}
+            if msg_id not in self.messages:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            return 200, self.messages[msg_id]
+
+        return 404, {"error": {"code": 404, "message": "Unknown path"}}
+
+    def _history(self, params: dict) -> tuple[int, dict]:
+        """
+        history.list: records after startHistoryId, paged by offset.
+        """
+        self.history_calls += 1
+        start_id = int(params["startHistoryId"][0])
+        if start_id < self.oldest_history_id:
+            return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+
+        records = [record for record in self.history if int(record["id"]) > start_id]
+        offset = int(params.get("pageToken", ["0"])[0])
+        page = records[offset:offset + self.history_page_size]
+
+        result = {"history": page, "historyId": str(self.history_id)}
+        if offset + self.history_page_size < len(records):
+            result["nextPageToken"] = str(offset + self.history_page_size)
+        return 200, result
+
+    def _batch(self, content_type: str, raw_body: bytes) -> tuple[str, bytes]:
+        """
+        Parse a multipart/mixed batch request and build the multipart response.
+        """
+        envelope = f"Content-Type: {content_type}\r\n\r\n".encode() + raw_body
+        multipart = BytesParser().parsebytes(envelope)
+
+        boundary = "fake_batch_boundary"
+        chunks: list[str] = []
+        parts = multipart.get_payload()
+        self.batch_sizes.append(len(parts))
+
+        for part in parts:
+            content_id = part["Content-ID"]
+            request_line = part.get_payload().lstrip().splitlines()[0]
+            _, path, _ = request_line.split(" ", 2)
+            status, body = self._get(path)
+
+            chunks.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(body)}\r\n"
+            )
+
+        chunks.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(chunks).encode()
+
+    @contextmanager
+    def _track_request(self):
+        start = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.response_delay:
+                time.sleep(self.response_delay)
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.request_times.append((start, time.monotonic()))
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass  # keep pytest output clean
+
+            def _send(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with server._track_request():
+                    server.single_calls += 1
+                    status, body = server._get(self.path)
+                    self._send(status, "application/json", json.dumps(body).encode())
+
+            def do_POST(self):
+                if urlsplit(self.path).path != BATCH_PATH:
+                    self._send(404, "application/json", b"{}")
+                    return
+                with server._track_request():
+                    server.batch_calls += 1
+                    length = int(self.headers.get("Content-Length", 0))
+                    content_type, body = server._batch(
+                        self.headers["Content-Type"], self.rfile.read(length)
+                    )
+                    self._send(200, content_type, body)
+
+        return _Handler
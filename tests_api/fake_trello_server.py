@@ -0,0 +1,433 @@
+"""
+A tiny local stand-in for the Trello REST API.
+It is used by offline tests, so they don't need a real board.
+
+Supported endpoints (any board id):
+- GET /1/boards/{id}                (nested cards / lists / labels)
+- GET /1/boards/{id}/cards
+- GET /1/boards/{id}/lists
+- GET /1/boards/{id}/labels
+- GET /1/boards/{id}/members
+- GET /1/boards/{id}/actions        (since / before / limit / filter, newest first)
+- GET /1/cards/{id}
+- POST /1/webhooks                  (checks the callback URL with a HEAD first)
+- DELETE /1/webhooks/{id}
+
+Responses carry an ETag and If-None-Match is answered with 304.
+Every recorded board action is posted to the registered webhooks,
+signed like Trello does (X-Trello-Webhook header).
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import queue
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BOARD_RESOURCE_PATH = re.compile(r"^/1/boards/(?P<board>[^/]+)$")
+BOARD_PATH = re.compile(r"^/1/boards/(?P<board>[^/]+)/(?P<resource>cards|lists|labels|members)$")
+ACTIONS_PATH = re.compile(r"^/1/boards/(?P<board>[^/]+)/actions$")
+CARD_PATH = re.compile(r"^/1/cards/(?P<card>[^/]+)$")
+WEBHOOKS_PATH = re.compile(r"^/1/webhooks(/(?P<webhook>[^/]+))?$")
+
+# Seconds serve_forever() waits between shutdown checks
+SHUTDOWN_POLL_INTERVAL = 0.05
+
+
+def make_card(card_id: str, name: str, id_list: str, desc: str = "", labels: list[str] | None = None) -> dict:
+    """
+    Build a Trello-shaped card, labels are given by name.
+    """
+    return {
+        "id": card_id,
+        "name": name,
+        "desc": desc,
+        "idList": id_list,
+        "labels": [{"id": f"label-{label}", "name": label, "color": "red"} for label in labels or []],
+    }
+
+
+def make_list(list_id: str, name: str) -> dict:
+    return {"id": list_id, "name": name, "closed": False}
+
+
+def make_label(label_id: str, name: str, color: str = "red") -> dict:
+    return {"id": label_id, "name": name, "color": color}
+
+
+def make_member(member_id: str, full_name: str) -> dict:
+    return {"id": member_id, "fullName": full_name, "username": full_name.lower().replace(" ", "")}
+
+
+def _select_fields(item: dict, params: dict, name: str = "fields") -> dict:
+    fields = params.get(name, [""])[0]
+    if not fields or fields == "all":
+        return dict(item)
+    wanted = set(fields.split(",")) | {"id"}
+    return {key: value for key, value in item.items() if key in wanted}
+
+
+class FakeTrelloServer:
+    """
+    Serves seeded cards and lists over HTTP/1.1 (keep-alive) on a random local port.
+
+    fail_next: statuses to return (one per request) before requests start succeeding
+    retry_after: value of the Retry-After header sent with injected 429s
+    rate_limit_remaining: if set, sent as x-rate-limit-api-token-remaining
+    """
+
+    def __init__(self, cards: list[dict] | None = None, lists: list[dict] | None = None):
+        self.cards: dict[str, dict] = {card["id"]: card for card in cards or []}
+        self.lists: dict[str, dict] = {lst["id"]: lst for lst in lists or []}
+        self.labels: dict[str, dict] = {}
+        self.members: dict[str, dict] = {}
+
+        # Board actions, oldest first. Ids grow like Trello's (time ordered)
+        self.actions: list[dict] = []
+        self.action_page_limit = 1000
+
+        # Registered webhooks and the secret their callbacks are signed with
+        self.webhooks: dict[str, dict] = {}
+        self.webhook_secret = "fake-secret"
+        self.delivered = 0
+        self._deliveries: "queue.Queue[tuple[dict, dict]]" = queue.Queue()
+        self._delivery_thread = threading.Thread(target=self._deliver_forever, daemon=True)
+
+        self.fail_next: list[int] = []
+        self.retry_after: str | None = None
+        self.rate_limit_remaining: int | None = None
+        self.rate_limit_interval_ms = 10_000
+
+        # Counters so tests can check round-trips and connection reuse
+        self.calls = 0
+        self.post_calls = 0
+        self.calls_by_resource: dict[str, int] = {}
+        self.not_modified = 0
+        self.connections: set[tuple] = set()
+        self.last_params: dict = {}
+        self.response_delay = 0.0
+        # (start, end) time.monotonic() of every handled GET
+        self.request_times: list[tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        # A short poll interval so stop() returns quickly
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": SHUTDOWN_POLL_INTERVAL}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/1"
+
+    # ==================================================
+    # Board changes (recorded as actions)
+    # ==================================================
+
+    def _record(self, action_type: str, **data) -> None:
+        action_id = f"{len(self.actions) + 1:024x}"
+        date = datetime.now(timezone.utc).isoformat()
+        action = {"id": action_id, "type": action_type, "date": date, "data": data}
+        self.actions.append(action)
+        for webhook in list(self.webhooks.values()):
+            self._deliveries.put((webhook, action))
+
+    @staticmethod
+    def _card_ref(card: dict) -> dict:
+        return {"id": card["id"], "name": card["name"]}
+
+    def _list_ref(self, list_id: str) -> dict:
+        return {"id": list_id, "name": self.lists.get(list_id, {}).get("name")}
+
+    def add_card(self, card: dict) -> None:
+        self.cards[card["id"]] = card
+        self._record("createCard", card=self._card_ref(card), list=self._list_ref(card["idList"]))
+
+    def update_card(self, card_id: str, **changes) -> None:
+        card = self.cards[card_id]
+        old = {key: card.get(key) for key in changes}
+        card.update(changes)
+        data = {"card": {**self._card_ref(card), **changes}, "old": old}
+        if "idList" in changes:
+            # a move, Trello adds both lists
+            data["listBefore"] = self._list_ref(old["idList"])
+            data["listAfter"] = self._list_ref(changes["idList"])
+        self._record("updateCard", **data)
+
+    def archive_card(self, card_id: str) -> None:
+        self.update_card(card_id, closed=True)
+
+    def delete_card(self, card_id: str) -> None:
+        card = self.cards.pop(card_id)
+        self._record("deleteCard", card={"id": card["id"]})
+
+    def add_label_to_card(self, card_id: str, label: dict) -> None:
+        card = self.cards[card_id]
+        card["labels"] = card["labels"] + [label]
+        self._record("addLabelToCard", card=self._card_ref(card), label=label)
+
+    def remove_label_from_card(self, card_id: str, label_id: str) -> None:
+        card = self.cards[card_id]
+        label = next(label for label in card["labels"] if label["id"] == label_id)
+        card["labels"] = [existing for existing in card["labels"] if existing["id"] != label_id]
+        self._record("removeLabelFromCard", card=self._card_ref(card), label=label)
+
+    def close_list(self, list_id: str) -> None:
+        """
+        Archive a column, this hides all its cards without a card action.
+        """
+        self.lists[list_id]["closed"] = True
+        for card_id in [cid for cid, card in self.cards.items() if card["idList"] == list_id]:
+            del self.cards[card_id]
+        self._record("updateList", list={"id": list_id, "closed": True}, old={"closed": False})
+
+    # ==================================================
+    # Webhooks
+    # ==================================================
+
+    def _create_webhook(self, params: dict) -> tuple[int, dict]:
+        callback_url = params.get("callbackURL", [""])[0]
+        try:
+            head = urllib.request.Request(callback_url, method="HEAD")
+            with urllib.request.urlopen(head, timeout=5) as response:
+                ok = response.status == 200
+        except (OSError, ValueError):
+            ok = False
+        if not ok:
+            return 400, {"message": f"URL ({callback_url}) did not return 200 status code"}
+
+        webhook_id = f"webhook-{len(self.webhooks) + 1}"
+        self.webhooks[webhook_id] = {
+            "id": webhook_id,
+            "callbackURL": callback_url,
+            "idModel": params.get("idModel", [""])[0],
+            "description": params.get("description", [""])[0],
+            "active": True,
+        }
+        return 200, self.webhooks[webhook_id]
+
+    def _deliver_forever(self) -> None:
+        """
+        Post actions to webhooks one at a time, in the order they happened.
+        """
+        while True:
+            webhook, action = self._deliveries.get()
+            body = json.dumps({"action": action, "model": {"id": webhook["idModel"]}}).encode()
+            digest = hmac.new(
+                self.webhook_secret.encode(), body + webhook["callbackURL"].encode(), hashlib.sha1
+            ).digest()
+            request = urllib.request.Request(
+                webhook["callbackURL"],
+                data=body,
+                method="POST",
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Trello-Webhook": base64.b64encode(digest).decode(),
+                },
+            )
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+                self.delivered += 1
+            except (urllib.error.URLError, OSError):
+                pass
+
+    def send_raw_callback(self, callback_url: str, body: bytes, signature: str) -> int:
+        """
+        Post an arbitrary (e.g. forged) callback, returns the HTTP status.
+        """
+        request = urllib.request.Request(
+            callback_url, data=body, method="POST", headers={"X-Trello-Webhook": signature}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def start(self) -> "FakeTrelloServer":
+        self._thread.start()
+        self._delivery_thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # ==================================================
+    # Request handling
+    # ==================================================
+
+    def _get(self, path: str, if_none_match: str | None = None) -> tuple[int, dict, object]:
+        """
+        Handle a single GET and return (status, extra_headers, json_body).
+        json_body is None for 304 Not Modified.
+        """
+        split = urlsplit(path)
+        params = parse_qs(split.query, keep_blank_values=True)
+        headers: dict[str, str] = {}
+
+        with self._lock:
+            self.calls += 1
+            self.last_params = params
+            if self.rate_limit_remaining is not None:
+                headers["x-rate-limit-api-token-remaining"] = str(self.rate_limit_remaining)
+                headers["x-rate-limit-api-token-interval-ms"] = str(self.rate_limit_interval_ms)
+
+            failure = self._take_failure(headers)
+            if failure is not None:
+                return failure, headers, {"message": "injected failure"}
+
+        if "key" not in params or "token" not in params:
+            return 401, headers, {"message": "unauthorized"}
+
+        board_match = BOARD_RESOURCE_PATH.match(split.path)
+        match = BOARD_PATH.match(split.path)
+        actions_match = ACTIONS_PATH.match(split.path)
+        card_match = CARD_PATH.match(split.path)
+        if card_match is not None:
+            resource = "card"
+            card = self.cards.get(card_match["card"])
+            if card is None:
+                return 404, headers, {"message": "The requested resource was not found."}
+            body = _select_fields(card, params)
+        elif actions_match is not None:
+            resource = "actions"
+            body = self._actions(params)
+        elif board_match is not None:
+            resource = "board"
+            body = self._board(board_match["board"], params)
+        elif match is not None:
+            resource = match["resource"]
+            items = getattr(self, resource)
+            body = [_select_fields(item, params) for item in items.values()]
+        else:
+            return 404, headers, {"message": "Unknown path"}
+
+        self.calls_by_resource[resource] = self.calls_by_resource.get(resource, 0) + 1
+
+        raw = json.dumps(body, sort_keys=True).encode()
+        headers["ETag"] = '"' + hashlib.sha1(raw).hexdigest() + '"'
+        if if_none_match == headers["ETag"]:
+            self.not_modified += 1
+            return 304, headers, None
+        return 200, headers, body
+
+    def _take_failure(self, headers: dict) -> int | None:
+        """
+        The next injected failure status, if any (lock must be held).
+        """
+        if not self.fail_next:
+            return None
+        status = self.fail_next.pop(0)
+        if status == 429 and self.retry_after is not None:
+            headers["Retry-After"] = self.retry_after
+        return status
+
+    def _actions(self, params: dict) -> list[dict]:
+        """
+        Newest first, filtered by type, after 'since' and before 'before'.
+        'since' is an action id or an ISO date, 'before' an action id.
+        """
+        since = params.get("since", [""])[0]
+        since_key = "date" if "T" in since else "id"
+        before = params.get("before", [""])[0]
+        types = set(params.get("filter", ["all"])[0].split(","))
+        limit = min(int(params.get("limit", ["50"])[0]), self.action_page_limit)
+
+        actions = [
+            action for action in reversed(self.actions)
+            if ("all" in types or action["type"] in types)
+            and (not since or action[since_key] > since)
+            and (not before or action["id"] < before)
+        ]
+        return actions[:limit]
+
+    def _board(self, board_id: str, params: dict) -> dict:
+        """
+        The nested board resource: ?cards=open&card_fields=...&lists=open&labels=all
+        """
+        board = {"id": board_id, "name": "Fake board"}
+        filters = {
+            "cards": (self.cards, "card_fields"),
+            "lists": (self.lists, "list_fields"),
+            "labels": (self.labels, "label_fields"),
+        }
+        for resource, (items, fields_param) in filters.items():
+            which = params.get(resource, ["none"])[0]
+            if which == "none":
+                continue
+            board[resource] = [
+                _select_fields(item, params, fields_param)
+                for item in items.values()
+                if which == "all" or (which == "open") != bool(item.get("closed"))
+            ]
+        return board
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients can keep the connection open
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass  # keep pytest output clean
+
+            def do_GET(self):
+                start = time.monotonic()
+                server.connections.add(self.client_address)
+                if server.response_delay:
+                    time.sleep(server.response_delay)
+                status, headers, body = server._get(self.path, self.headers.get("If-None-Match"))
+                with server._lock:
+                    server.request_times.append((start, time.monotonic()))
+                self._respond(status, headers, body)
+
+            def do_POST(self):
+                split = urlsplit(self.path)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if WEBHOOKS_PATH.match(split.path) is None:
+                    self._respond(404, {}, {"message": "Unknown path"})
+                    return
+                headers: dict[str, str] = {}
+                with server._lock:
+                    server.post_calls += 1
+                    failure = server._take_failure(headers)
+                if failure is not None:
+                    self._respond(failure, headers, {"message": "injected failure"})
+                    return
+                status, body = server._create_webhook(parse_qs(split.query))
+                self._respond(status, {}, body)
+
+            def do_DELETE(self):
+                match = WEBHOOKS_PATH.match(urlsplit(self.path).path)
+                webhook_id = match["webhook"] if match else None
+                if webhook_id not in server.webhooks:
+                    self._respond(404, {}, {"message": "Unknown webhook"})
+                    return
+                del server.webhooks[webhook_id]
+                self._respond(200, {}, {"_value": None})
+
+            def _respond(self, status: int, headers: dict, body) -> None:
+                raw = b"" if body is None else json.dumps(body).encode()
+
+                self.send_response(status)
+                if body is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return _Handler
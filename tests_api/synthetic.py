@@ -0,0 +1,88 @@
+"""
+Synthetic inboxes and boards of any size for the local stand-ins.
+
+synthetic_workspace() builds an inbox and the board a correct Gmail -> Trello
+sync would have produced from it: one card per Task subject, all bodies of
+a subject merged into its description, and the 'Urgent' label on cards of
+urgent emails. Everything is derived from the email index, so the same
+size always gives the same data.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from api.helpers import normalize_subject_for_trello
+from tests_api.fake_gmail_server import make_message
+from tests_api.fake_trello_server import make_card, make_label, make_list
+
+URGENT_LABEL = "Urgent"
+
+
+@dataclass
+class SyntheticWorkspace:
+    messages: List[Dict] = field(default_factory=list)
+    cards: List[Dict] = field(default_factory=list)
+    lists: List[Dict] = field(default_factory=list)
+    labels: List[Dict] = field(default_factory=list)
+
+
+def synthetic_workspace(
+    email_count: int = 100,
+    replies_per_subject: int = 3,
+    urgent_every: int = 7,
+    other_every: int = 10,
+) -> SyntheticWorkspace:
+    """
+    email_count: how many emails the inbox has (newest first = index order)
+    replies_per_subject: Task emails per subject, each with its own body (>1 = merge cases)
+    urgent_every: every n-th email says "urgent"
+    other_every: every n-th email is not a Task email (it must not get a card)
+    """
+    workspace = SyntheticWorkspace(
+        lists=[make_list("list-todo", "To Do"), make_list("list-done", "Completed")],
+        labels=[make_label("label-urgent", URGENT_LABEL)],
+    )
+
+    # title -> (bodies, urgent), in first-seen order
+    expected: Dict[str, tuple[List[str], bool]] = {}
+
+    for i in range(email_count):
+        urgent = i % urgent_every == 0
+        body = f"this is urgent, item {i}" if urgent else f"please handle item {i}"
+        if i % other_every == other_every - 1:
+            subject = f"Newsletter {i}"
+        else:
+            subject = f"Task: subject {i // replies_per_subject}"
+
+        # internalDate goes down with the index, so email 0 is the newest
+        workspace.messages.append(make_message(f"msg-{i}", subject, body, internal_date=email_count - i))
+
+        if subject.startswith("Task:"):
+            title = normalize_subject_for_trello(subject)
+            bodies, was_urgent = expected.get(title, ([], False))
+            bodies.append(body)
+            expected[title] = (bodies, was_urgent or urgent)
+
+    for index, (title, (bodies, urgent)) in enumerate(expected.items()):
+        list_id = "list-done" if index % 2 else "list-todo"
+        labels = [URGENT_LABEL] if urgent else []
+        workspace.cards.append(make_card(f"card-{index}", title, list_id, "\n\n".join(bodies), labels))
+
+    return workspace
+
+
+def seed(gmail_server, trello_server, workspace: SyntheticWorkspace) -> None:
+    """
+    Load a workspace into a FakeGmailServer and a FakeTrelloServer (either can be None).
+    """
+    if gmail_server is not None:
+        for message in workspace.messages:
+            gmail_server.add_message(message)
+    if trello_server is None:
+        return
+    for lst in workspace.lists:
+        trello_server.lists[lst["id"]] = lst
+    for label in workspace.labels:
+        trello_server.labels[label["id"]] = label
+    for card in workspace.cards:
+        trello_server.cards[card["id"]] = card
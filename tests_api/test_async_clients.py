@@ -0,0 +1,126 @@
+"""
+AsyncGmailClient / AsyncTrelloClient against the local stand-ins.
+"""
+
+import asyncio
+
+from api.async_clients import AsyncGmailClient, AsyncTrelloClient, fetch_sync_snapshots
+from api.gmail_client import GmailClient
+from api.trello_client import TrelloClient
+from tests_api.fake_gmail_server import make_message
+from tests_api.fake_trello_server import make_card, make_list
+
+
+def _seed_inbox(server, count: int) -> None:
+    for i in range(count):
+        body = "this is urgent" if i % 3 == 0 else f"body {i}"
+        server.add_message(make_message(f"m{i}", f"Task: {i % 4}", body, internal_date=-i))
+
+
+def _gmail(server, service, **kwargs) -> GmailClient:
+    return GmailClient(service=service, batch_uri=server.batch_uri, batch_size=5, **kwargs)
+
+
+def test_same_results_as_the_sync_client(fake_gmail_server, fake_gmail_service):
+    _seed_inbox(fake_gmail_server, 23)
+    client = _gmail(fake_gmail_server, fake_gmail_service)
+    async_client = AsyncGmailClient(client)
+
+    async def _read():
+        return await asyncio.gather(
+            async_client.get_inbox_emails(max_results=None),
+            async_client.get_urgent_emails(subject_prefix="Task:"),
+            async_client.get_emails_grouped_by_subject(subject_prefix="Task:"),
+        )
+
+    inbox, urgent, grouped = asyncio.run(_read())
+
+    assert inbox == client.get_inbox_emails(max_results=None)
+    assert urgent == client.get_urgent_emails(subject_prefix="Task:")
+    assert grouped == client.get_emails_grouped_by_subject(subject_prefix="Task:")
+
+
+def test_batches_run_concurrently_under_the_semaphore(fake_gmail_server, fake_gmail_service):
+    _seed_inbox(fake_gmail_server, 40)
+    fake_gmail_server.response_delay = 0.1
+    async_client = AsyncGmailClient(_gmail(fake_gmail_server, fake_gmail_service), max_concurrency=3)
+
+    emails = asyncio.run(async_client.get_inbox_emails(max_results=None))
+
+    assert [email["id"] for email in emails] == [f"m{i}" for i in range(40)]
+    assert fake_gmail_server.batch_sizes == [5] * 8
+    assert 1 < fake_gmail_server.max_in_flight <= 3
+
+
+def test_trello_reads(fake_trello_server):
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    for i in range(6):
+        fake_trello_server.cards[f"c{i}"] = make_card(f"c{i}", f"Task: {i}", "l1")
+    async_client = AsyncTrelloClient(TrelloClient(base_url=fake_trello_server.url))
+
+    async def _read():
+        return await asyncio.gather(
+            async_client.get_board_cards(),
+            async_client.get_list_name_by_id("l1"),
+            async_client.get_cards(["c1", "gone", "c5"]),
+        )
+
+    cards, list_name, singles = asyncio.run(_read())
+
+    assert len(cards) == 6
+    assert list_name == "To Do"
+    assert [card and card["id"] for card in singles] == ["c1", None, "c5"]
+
+
+def test_inbox_and_board_are_read_at_the_same_time(fake_gmail_server, fake_gmail_service, fake_trello_server):
+    _seed_inbox(fake_gmail_server, 5)
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    fake_trello_server.cards["c0"] = make_card("c0", "Task: 0", "l1")
+    fake_gmail_server.response_delay = 0.3
+    fake_trello_server.response_delay = 0.6
+
+    gmail = AsyncGmailClient(_gmail(fake_gmail_server, fake_gmail_service))
+    trello = AsyncTrelloClient(TrelloClient(base_url=fake_trello_server.url))
+
+    inbox, board = asyncio.run(fetch_sync_snapshots(gmail, trello))
+
+    assert len(inbox.emails) == 5 and len(board) == 1
+    # The board request ran while a Gmail request was in flight
+    (board_start, board_end), = fake_trello_server.request_times
+    assert any(start < board_end and board_start < end for start, end in fake_gmail_server.request_times)
+
+
+def test_client_can_be_used_from_several_event_loops(fake_trello_server):
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    fake_trello_server.response_delay = 0.05
+    async_client = AsyncTrelloClient(TrelloClient(base_url=fake_trello_server.url), max_concurrency=1)
+
+    async def _read():
+        # Two calls with room for one, the second waits on the semaphore
+        return await asyncio.gather(async_client.get_board_lists(), async_client.get_board_lists())
+
+    for _ in range(2):
+        assert asyncio.run(_read()) == [[make_list("l1", "To Do")]] * 2
+
+
+def test_incremental_mode_filters_candidates_before_max_results(
+    fake_gmail_server, fake_gmail_service, tmp_path
+):
+    _seed_inbox(fake_gmail_server, 23)
+    live = _gmail(fake_gmail_server, fake_gmail_service)
+    async_client = AsyncGmailClient(
+        _gmail(fake_gmail_server, fake_gmail_service, sync_state_file=str(tmp_path / "sync_state.json"))
+    )
+
+    async def _read():
+        return (
+            await async_client.get_urgent_emails(max_results=3, subject_prefix="Task:"),
+            await async_client.get_emails_grouped_by_subject(max_results=3, subject_prefix="Task: 1"),
+        )
+
+    urgent, grouped = asyncio.run(_read())
+
+    # Three urgent candidates, not the urgent ones among the first three emails
+    assert [email["id"] for email in urgent] == ["m0", "m3", "m6"]
+    assert urgent == live.get_urgent_emails(max_results=3, subject_prefix="Task:")
+    assert grouped == live.get_emails_grouped_by_subject(max_results=3, subject_prefix="Task: 1")
@@ -0,0 +1,60 @@
+"""
+One-request board snapshot and its indexes.
+"""
+
+from api.trello_client import TrelloClient
+from tests_api.fake_trello_server import make_card, make_label, make_list
+
+
+def _seed(server) -> None:
+    server.lists["l1"] = make_list("l1", "To Do")
+    server.lists["l2"] = make_list("l2", "Completed")
+    server.labels["u"] = make_label("u", "Urgent")
+    server.cards["c1"] = make_card("c1", "Task: one", "l1", desc="first", labels=["Urgent"])
+    server.cards["c2"] = make_card("c2", "Task: two ", "l2", desc="second")
+    server.cards["c3"] = make_card("c3", "Task: two", "l1", desc="dup")
+    server.cards["c4"] = {**make_card("c4", "Task: archived", "l1"), "closed": True}
+
+
+def test_snapshot_is_a_single_request(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+
+    snapshot = client.get_board_snapshot()
+
+    assert fake_trello_server.calls == 1
+    assert [card["id"] for card in snapshot.cards] == ["c1", "c2", "c3"]
+    assert set(snapshot.cards[0]) == {"id", "name", "desc", "idList", "labels"}
+    assert [lst["name"] for lst in snapshot.lists] == ["To Do", "Completed"]
+    assert [label["name"] for label in snapshot.labels] == ["Urgent"]
+
+
+def test_snapshot_indexes(fake_trello_server):
+    _seed(fake_trello_server)
+    snapshot = TrelloClient(base_url=fake_trello_server.url).get_board_snapshot()
+
+    assert snapshot.cards_by_id["c2"]["desc"] == "second"
+    assert [card["id"] for card in snapshot.cards_titled("Task: two")] == ["c2", "c3"]
+    assert [card["id"] for card in snapshot.cards_by_list_name["To Do"]] == ["c1", "c3"]
+    assert [card["id"] for card in snapshot.cards_by_label["Urgent"]] == ["c1"]
+    assert [card["id"] for card in snapshot.cards_titled_with_label("Task: one", "Urgent")] == ["c1"]
+    assert snapshot.cards_titled_with_label("Task: two", "Urgent") == []
+    assert snapshot.list_name(snapshot.cards_by_id["c2"]) == "Completed"
+
+
+def test_archived_cards_on_request(fake_trello_server):
+    _seed(fake_trello_server)
+    snapshot = TrelloClient(base_url=fake_trello_server.url).get_board_snapshot(cards="all")
+
+    assert "c4" in snapshot.cards_by_id
+
+
+def test_snapshot_fills_the_metadata_cache(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+
+    client.get_board_snapshot()
+
+    assert client.get_list_name_by_id("l2") == "Completed"
+    assert client.metadata.label_name("u") == "Urgent"
+    assert fake_trello_server.calls == 1
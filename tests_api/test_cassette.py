@@ -0,0 +1,84 @@
+"""
+Record / replay cassettes and the synthetic workspace.
+"""
+
+import json
+
+import pytest
+
+from api.cassette import RECORD, REPLAY, Cassette, CassetteMiss
+from api.gmail_client import GmailClient
+from api.inbox_snapshot import InboxSnapshot
+from api.reconcile import Reconciler
+from api.trello_client import TrelloClient
+from tests_api.synthetic import seed, synthetic_workspace
+
+
+def _gmail(server, cassette) -> GmailClient:
+    return GmailClient(
+        token_file=None, api_endpoint=server.url, cassette=cassette,
+        batch_size=10, quota_units_per_second=None,
+    )
+
+
+def _trello(server, cassette) -> TrelloClient:
+    return TrelloClient(base_url=server.url, api_key="secret-key", api_token="secret-token", cassette=cassette)
+
+
+def test_trello_replay_needs_no_server(tmp_path, fake_trello_server):
+    seed(None, fake_trello_server, synthetic_workspace(30))
+    path = str(tmp_path / "trello.json")
+
+    with Cassette(path, mode=RECORD) as cassette:
+        client = _trello(fake_trello_server, cassette)
+        recorded = client.get_board_snapshot()
+        recorded_lists = client.get_board_lists()
+    url = fake_trello_server.url
+    fake_trello_server.stop()
+
+    replayed_client = TrelloClient(base_url=url, cassette=Cassette(path, mode=REPLAY))
+    assert replayed_client.get_board_snapshot().cards == recorded.cards
+    assert replayed_client.get_board_lists() == recorded_lists
+
+    with open(path, encoding="UTF-8") as f:
+        text = f.read()
+    assert "secret-key" not in text and "secret-token" not in text
+
+
+def test_gmail_replay_covers_batches(tmp_path, fake_gmail_server):
+    for message in synthetic_workspace(35).messages:
+        fake_gmail_server.add_message(message)
+    path = str(tmp_path / "gmail.json")
+
+    with Cassette(path, mode=RECORD) as cassette:
+        recorded = _gmail(fake_gmail_server, cassette).get_inbox_emails(max_results=None)
+    calls = fake_gmail_server.batch_calls
+
+    replayed = _gmail(fake_gmail_server, Cassette(path, mode=REPLAY)).get_inbox_emails(max_results=None)
+
+    assert len(recorded) == 35
+    assert replayed == recorded
+    assert fake_gmail_server.batch_calls == calls == 4
+
+
+def test_unrecorded_request_is_a_miss(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(json.dumps({"interactions": []}))
+    client = TrelloClient(base_url="http://127.0.0.1:9/1", cassette=Cassette(str(path), mode=REPLAY))
+
+    with pytest.raises(CassetteMiss):
+        client.get_board_lists()
+
+
+def test_synthetic_workspace_is_in_sync(fake_gmail_server, fake_trello_server):
+    workspace = synthetic_workspace(500)
+    seed(fake_gmail_server, fake_trello_server, workspace)
+
+    inbox = InboxSnapshot.fetch(_gmail(fake_gmail_server, None), max_results=None)
+    board = _trello(fake_trello_server, None).get_board_snapshot()
+    report = Reconciler().reconcile(inbox, board)
+
+    assert len(inbox.emails) == 500
+    assert report.ok, report.messages()[:5]
+    assert any(card.merged for card in report.expected.values())
+    assert any(card.urgent for card in report.expected.values())
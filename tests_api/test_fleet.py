@@ -0,0 +1,124 @@
+"""
+Checking many (mailbox, board) pairs in parallel.
+"""
+
+import json
+
+import pytest
+
+from api.fleet import DEFAULT_PAIR, SyncPair, check_pair, load_sync_pairs, run_fleet
+from tests_api.fake_gmail_server import FakeGmailServer, make_message
+from tests_api.fake_trello_server import FakeTrelloServer, make_card, make_label, make_list
+
+
+@pytest.fixture
+def fleet_servers():
+    """
+    Three teams, each with its own local mailbox and board: {team name: (gmail, trello)}.
+    team-b's urgent card is missing its label.
+    """
+    servers = {}
+    for team in ("a", "b", "c"):
+        gmail = FakeGmailServer().start()
+        trello = FakeTrelloServer().start()
+        servers[f"team-{team}"] = (gmail, trello)
+
+        gmail.add_message(make_message(f"{team}1", f"Task: {team} report", "this is urgent"))
+        gmail.add_message(make_message(f"{team}2", f"Task: {team} notes", "first"))
+        gmail.add_message(make_message(f"{team}3", f"Task: {team} notes", "second"))
+
+        trello.lists["l1"] = make_list("l1", "To Do")
+        labels = [] if team == "b" else ["Urgent"]
+        trello.cards["c1"] = make_card("c1", f"{team} report", "l1", "this is urgent", labels)
+        trello.cards["c2"] = make_card("c2", f"{team} notes", "l1", "first\nsecond")
+        trello.labels["u"] = make_label("u", "Urgent")
+
+        gmail.response_delay = 0.3
+        trello.response_delay = 0.3
+
+    yield servers
+    for gmail, trello in servers.values():
+        gmail.stop()
+        trello.stop()
+
+
+@pytest.fixture
+def fleet(fleet_servers) -> list[SyncPair]:
+    return [
+        SyncPair(
+            name=name,
+            board_id=f"board-{name[-1]}",
+            token_file=None,
+            trello_base_url=trello.url,
+            gmail_api_endpoint=gmail.url,
+        )
+        for name, (gmail, trello) in fleet_servers.items()
+    ]
+
+
+def _busy_span(gmail, trello) -> tuple[float, float]:
+    """
+    From the first request a pair's check sent to the last one it finished.
+    """
+    times = gmail.request_times + trello.request_times
+    return min(start for start, _ in times), max(end for _, end in times)
+
+
+def test_single_pair(fleet):
+    result = check_pair(fleet[0])
+
+    assert result.ok
+    assert (result.emails, result.cards) == (3, 2)
+
+
+def test_pairs_run_in_parallel_processes(fleet, fleet_servers):
+    report = run_fleet(fleet)
+
+    assert [result.name for result in report.results] == ["team-a", "team-b", "team-c"]
+    assert [result.name for result in report.failed] == ["team-b"]
+    assert report.by_name()["team-b"].problems == [
+        "Trello card for urgent email 'b report' (subject 'Task: b report') does not have 'Urgent' label."
+    ]
+    # Run one after another, the pairs' requests would never overlap
+    spans = {name: _busy_span(*servers) for name, servers in fleet_servers.items()}
+    for name, (start, end) in spans.items():
+        assert any(
+            other_start < end and start < other_end
+            for other, (other_start, other_end) in spans.items() if other != name
+        ), f"{name} did not overlap any other pair"
+    assert "team-b" in report.summary()
+
+
+def test_unreachable_pair_is_reported_not_raised(fleet):
+    broken = SyncPair(name="broken", board_id="x", token_file=None,
+                      trello_base_url="http://127.0.0.1:9/1", gmail_api_endpoint="http://127.0.0.1:9/")
+
+    report = run_fleet([fleet[0], broken], processes=False)
+
+    assert report.results[0].ok
+    assert report.results[1].error is not None
+    assert not report.ok
+
+
+def test_load_sync_pairs(tmp_path):
+    path = tmp_path / "pairs.json"
+    path.write_text(json.dumps([
+        {"name": "a", "board_id": "b1", "token_file": "./a.json"},
+        {"name": "b", "board_id": "b2", "token_file": "./b.json"},
+    ]))
+
+    pairs = load_sync_pairs(str(path))
+
+    assert [(pair.name, pair.board_id, pair.token_file) for pair in pairs] == [
+        ("a", "b1", "./a.json"), ("b", "b2", "./b.json"),
+    ]
+    assert pairs[1].trello_client().board_id == "b2"
+    assert load_sync_pairs(str(tmp_path / "missing.json")) == [DEFAULT_PAIR]
+
+
+def test_duplicate_pair_names_are_rejected(tmp_path):
+    path = tmp_path / "pairs.json"
+    path.write_text(json.dumps([{"name": "a", "board_id": "b1"}, {"name": "a", "board_id": "b2"}]))
+
+    with pytest.raises(ValueError):
+        load_sync_pairs(str(path))
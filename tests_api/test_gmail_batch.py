@@ -0,0 +1,79 @@
+"""
+Batched message fetching in GmailClient, checked against a local stand-in
+for the Gmail batch endpoint (no real mailbox needed).
+"""
+
+import pytest
+from api.gmail_client import GmailClient, GmailBatchError
+from api.rate_limit import RetryPolicy
+from tests_api.fake_gmail_server import make_message
+
+
+def _seed(server, count: int) -> None:
+    for i in range(count):
+        server.add_message(make_message(f"m{i}", f"Task: subject {i}", f"body {i}"))
+
+
+def _client(server, service, max_retries: int = 3, **kwargs) -> GmailClient:
+    return GmailClient(
+        service=service,
+        batch_uri=server.batch_uri,
+        retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0),
+        **kwargs,
+    )
+
+
+def test_inbox_is_fetched_in_batches(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 12)
+    client = _client(fake_gmail_server, fake_gmail_service, batch_size=5)
+
+    emails = client.get_inbox_emails(max_results=50)
+
+    assert [e["subject"] for e in emails] == [f"Task: subject {i}" for i in range(12)]
+    assert emails[3]["body"] == "body 3"
+    # 1 list call, then 3 batches of 5 + 5 + 2 instead of 12 single gets
+    assert fake_gmail_server.single_calls == 1
+    assert fake_gmail_server.batch_sizes == [5, 5, 2]
+
+
+def test_only_failed_sub_requests_are_retried(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 4)
+    fake_gmail_server.fail_next = {"m1": [429], "m3": [503, 500]}
+    client = _client(fake_gmail_server, fake_gmail_service, batch_size=10)
+
+    emails = client.get_inbox_emails()
+
+    assert [e["id"] for e in emails] == ["m0", "m1", "m2", "m3"]
+    assert fake_gmail_server.batch_sizes == [4, 2, 1]
+
+
+def test_deleted_message_is_skipped(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 3)
+    fake_gmail_server.fail_next = {"m1": [404]}
+    client = _client(fake_gmail_server, fake_gmail_service)
+
+    emails = client.get_inbox_emails()
+
+    assert [e["id"] for e in emails] == ["m0", "m2"]
+
+
+def test_batch_error_after_retries_are_exhausted(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 2)
+    fake_gmail_server.fail_next = {"m0": [500, 500, 500]}
+    client = _client(fake_gmail_server, fake_gmail_service, max_retries=2)
+
+    with pytest.raises(GmailBatchError) as exc_info:
+        client.get_inbox_emails()
+
+    assert list(exc_info.value.failed) == ["m0"]
+
+
+def test_non_batched_mode_uses_single_gets(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 3)
+    client = _client(fake_gmail_server, fake_gmail_service, batched=False)
+
+    emails = client.get_inbox_emails()
+
+    assert len(emails) == 3
+    assert fake_gmail_server.batch_calls == 0
+    assert fake_gmail_server.single_calls == 4
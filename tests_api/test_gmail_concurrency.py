@@ -0,0 +1,84 @@
+"""
+Concurrent, quota-aware fetching in GmailClient and the rate limit helpers.
+"""
+
+import time
+
+from api.gmail_client import GmailClient
+from api.rate_limit import RetryPolicy, TokenBucket, run_in_order
+from tests_api.fake_gmail_server import make_message
+
+
+def _seed(server, count: int) -> None:
+    for i in range(count):
+        server.add_message(make_message(f"m{i}", f"Task: {i}", f"body {i}", internal_date=-i))
+
+
+def test_batches_run_concurrently_and_keep_order(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 20)
+    fake_gmail_server.response_delay = 0.2
+    client = GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        batch_size=5,
+        concurrency=4,
+    )
+
+    emails = client.get_inbox_emails()
+
+    assert [email["id"] for email in emails] == [f"m{i}" for i in range(20)]
+    assert fake_gmail_server.batch_sizes == [5, 5, 5, 5]
+    assert 1 < fake_gmail_server.max_in_flight <= 4
+
+
+def test_single_gets_retry_throttled_requests(fake_gmail_server, fake_gmail_service):
+    _seed(fake_gmail_server, 6)
+    fake_gmail_server.fail_next = {"m2": [429], "m4": [503, 503]}
+    client = GmailClient(
+        service=fake_gmail_service,
+        batched=False,
+        concurrency=3,
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.01),
+    )
+
+    emails = client.get_inbox_emails()
+
+    assert [email["id"] for email in emails] == [f"m{i}" for i in range(6)]
+    assert fake_gmail_server.max_in_flight <= 3
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=100, capacity=10)
+
+    start = time.monotonic()
+    for _ in range(30):
+        bucket.acquire(1)
+    elapsed = time.monotonic() - start
+
+    # 10 tokens from the burst, the other 20 at 100 per second
+    assert elapsed >= 0.15
+
+
+def test_token_bucket_pause_blocks_everyone():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.1)
+
+    assert bucket.acquire(1) >= 0.05
+
+
+def test_retry_delay_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+
+    assert 0 <= policy.delay(1) <= 0.1
+    assert policy.delay(5) <= 1.0
+    assert policy.delay(1, retry_after=3) == 3
+    assert not policy.should_retry(404, 0)
+    assert not policy.should_retry(503, 3)
+
+
+def test_run_in_order_keeps_input_order():
+    def slow_square(n: int) -> int:
+        time.sleep(0.01 * (5 - n))
+        return n * n
+
+    assert run_in_order(slow_square, range(5), max_workers=5) == [0, 1, 4, 9, 16]
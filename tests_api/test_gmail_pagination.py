@@ -0,0 +1,67 @@
+"""
+Streaming, paginated inbox reads (iter_inbox_emails), checked against
+the local Gmail stand-in.
+"""
+
+import pytest
+from api.gmail_client import GmailClient
+from tests_api.fake_gmail_server import make_message
+
+
+@pytest.fixture
+def paged_client(fake_gmail_server, fake_gmail_service) -> GmailClient:
+    for i in range(25):
+        body = "Urgent: please check" if i % 10 == 0 else f"body {i}"
+        fake_gmail_server.add_message(make_message(f"m{i}", f"Task: subject {i % 5}", body))
+
+    return GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        page_size=10,
+        prefetch_pages=2,
+    )
+
+
+def test_iter_follows_all_pages(paged_client, fake_gmail_server):
+    ids = [email["id"] for email in paged_client.iter_inbox_emails()]
+
+    assert ids == [f"m{i}" for i in range(25)]
+    assert fake_gmail_server.list_calls == 3
+
+
+def test_max_results_caps_across_pages(paged_client, fake_gmail_server):
+    emails = paged_client.get_inbox_emails(max_results=15)
+
+    assert [email["id"] for email in emails] == [f"m{i}" for i in range(15)]
+    # second page is only asked for the 5 ids that are still missing
+    assert fake_gmail_server.list_calls == 2
+
+
+@pytest.mark.parametrize("prefetch_pages", [0, 1, 3])
+def test_prefetch_keeps_order(paged_client, prefetch_pages):
+    ids = [e["id"] for e in paged_client.iter_inbox_emails(prefetch_pages=prefetch_pages)]
+
+    assert ids == [f"m{i}" for i in range(25)]
+
+
+def test_stopping_early_does_not_read_whole_inbox(paged_client, fake_gmail_server):
+    # 100 messages = 10 pages, only the first ones may be listed
+    for i in range(25, 100):
+        fake_gmail_server.add_message(make_message(f"m{i}", f"Task: subject {i % 5}", f"body {i}"))
+
+    emails = paged_client.iter_inbox_emails(prefetch_pages=1)
+    first = next(emails)
+    emails.close()
+
+    assert first["id"] == "m0"
+    # current page + at most one page fetched ahead, out of 10
+    assert fake_gmail_server.list_calls <= 2
+
+
+def test_urgent_and_grouping_run_on_all_pages(paged_client):
+    urgent = paged_client.get_urgent_emails(max_results=None)
+    grouped = paged_client.get_emails_grouped_by_subject(max_results=None)
+
+    assert [email["id"] for email in urgent] == ["m0", "m10", "m20"]
+    assert len(grouped) == 5
+    assert grouped["Task: subject 0"] == ["Urgent: please check", "body 5", "body 15"]
@@ -0,0 +1,90 @@
+"""
+Query pushdown: urgent / subject filters are sent to Gmail search first,
+then confirmed locally. Checked against the local Gmail stand-in.
+"""
+
+import pytest
+from api.gmail_client import LIST_FIELDS, MESSAGE_FIELDS, GmailClient
+from tests_api.fake_gmail_server import make_message
+
+INBOX = [
+    ("m0", "Task: Pay rent", "Urgent, pay today"),
+    ("m1", "Task: Pay rent", "Paid already"),
+    ("m2", "Newsletter", "urgent deals inside"),
+    ("m3", "Task: Read book", "no hurry"),
+    ("m4", "Task: Call mom", "URGENT please"),
+    ("m5", "Hello", "just saying hi"),
+]
+
+
+@pytest.fixture
+def query_client(fake_gmail_server, fake_gmail_service) -> GmailClient:
+    for i, (msg_id, subject, body) in enumerate(INBOX):
+        fake_gmail_server.add_message(make_message(msg_id, subject, body, internal_date=-i))
+
+    return GmailClient(service=fake_gmail_service, batch_uri=fake_gmail_server.batch_uri)
+
+
+def _downloaded(server) -> int:
+    return sum(server.batch_sizes)
+
+
+def test_urgent_scan_only_downloads_candidates(query_client, fake_gmail_server):
+    urgent = query_client.get_urgent_emails()
+
+    assert [email["id"] for email in urgent] == ["m0", "m2", "m4"]
+    assert _downloaded(fake_gmail_server) == 3
+
+
+def test_urgent_with_subject_prefix(query_client, fake_gmail_server):
+    urgent = query_client.get_urgent_emails(subject_prefix="Task:")
+
+    assert [email["id"] for email in urgent] == ["m0", "m4"]
+    assert _downloaded(fake_gmail_server) == 2
+
+
+def test_same_result_without_pushdown(query_client, fake_gmail_server):
+    urgent = query_client.get_urgent_emails(subject_prefix="Task:", pushdown=False)
+
+    assert [email["id"] for email in urgent] == ["m0", "m4"]
+    assert _downloaded(fake_gmail_server) == len(INBOX)
+
+
+def test_grouping_with_subject_prefix(query_client, fake_gmail_server):
+    grouped = query_client.get_emails_grouped_by_subject(subject_prefix="Task:")
+
+    assert grouped == {
+        "Task: Pay rent": ["Urgent, pay today", "Paid already"],
+        "Task: Read book": ["no hurry"],
+        "Task: Call mom": ["URGENT please"],
+    }
+    assert _downloaded(fake_gmail_server) == 4
+
+
+def test_field_masks_are_sent_and_applied(query_client, fake_gmail_server):
+    emails = query_client.get_inbox_emails()
+    raw = query_client._get_messages(["m0"])[0]
+
+    assert {LIST_FIELDS, MESSAGE_FIELDS} <= set(fake_gmail_server.fields_seen)
+    # threadId and the body size are outside the mask, the parsed email doesn't miss them
+    assert "threadId" not in raw
+    assert raw["payload"]["body"] == {"data": raw["payload"]["body"]["data"]}
+    assert emails[0]["body"] == "Urgent, pay today"
+
+
+def test_max_results_counts_the_same_candidates_in_incremental_mode(
+    query_client, fake_gmail_server, fake_gmail_service, tmp_path
+):
+    incremental = GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        sync_state_file=str(tmp_path / "sync_state.json"),
+    )
+
+    for max_results in (1, 2, None):
+        live = query_client.get_urgent_emails(max_results=max_results, subject_prefix="Task:")
+        local = incremental.get_urgent_emails(max_results=max_results, subject_prefix="Task:")
+        assert [email["id"] for email in local] == [email["id"] for email in live]
+
+    grouped = incremental.get_emails_grouped_by_subject(max_results=2, subject_prefix="Task:")
+    assert grouped == query_client.get_emails_grouped_by_subject(max_results=2, subject_prefix="Task:")
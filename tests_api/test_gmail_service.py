@@ -0,0 +1,48 @@
+"""
+Lazy GmailClient startup, shared credentials and the cached discovery document.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from api.gmail_client import GmailClient
+from api.gmail_service import SharedCredentials, load_discovery_document
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    path = tmp_path / "token.json"
+    path.write_text(json.dumps({
+        "token": "fake-access-token",
+        "refresh_token": "fake-refresh-token",
+        "client_id": "fake-client-id",
+        "client_secret": "fake-client-secret",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }))
+    yield str(path)
+    SharedCredentials.for_token_file(str(path)).stop()
+
+
+def test_nothing_is_loaded_on_construction(tmp_path):
+    # A missing token file only fails when the service is actually needed
+    client = GmailClient(token_file=str(tmp_path / "missing.json"))
+
+    with pytest.raises(FileNotFoundError):
+        client.service
+
+
+def test_clients_share_credentials(token_file):
+    first = GmailClient(token_file=token_file)
+    second = GmailClient(token_file=token_file)
+
+    assert first.creds is second.creds
+    assert first.service is not second.service
+    assert first.service._http.credentials is first.creds
+
+
+def test_discovery_document_is_parsed_once():
+    assert load_discovery_document() is load_discovery_document()
+    assert load_discovery_document()["name"] == "gmail"
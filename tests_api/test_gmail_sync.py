@@ -0,0 +1,120 @@
+"""
+Incremental inbox sync (historyId checkpoint), checked against
+the local Gmail stand-in.
+"""
+
+import pytest
+from api.gmail_client import GmailClient
+from tests_api.fake_gmail_server import make_message
+
+
+@pytest.fixture
+def sync_client(fake_gmail_server, fake_gmail_service, tmp_path) -> GmailClient:
+    for i in range(5):
+        fake_gmail_server.add_message(make_message(f"m{i}", f"Task: {i}", f"body {i}", internal_date=i))
+
+    return GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        sync_state_file=str(tmp_path / "sync_state.json"),
+    )
+
+
+def _ids(client: GmailClient) -> list[str]:
+    return [email["id"] for email in client.get_inbox_emails(max_results=None)]
+
+
+def test_first_sync_is_full(sync_client):
+    result = sync_client.sync_inbox()
+
+    assert result.full_resync
+    assert result.added == 5
+    assert _ids(sync_client) == ["m4", "m3", "m2", "m1", "m0"]
+
+
+def test_later_syncs_only_fetch_changes(sync_client, fake_gmail_server):
+    sync_client.sync_inbox()
+    fake_gmail_server.add_message(make_message("m5", "Task: 5", "body 5", internal_date=5))
+    fake_gmail_server.delete_message("m0")
+    fake_gmail_server.archive_message("m2")
+    fake_gmail_server.batch_sizes.clear()
+    list_calls = fake_gmail_server.list_calls
+
+    result = sync_client.sync_inbox()
+
+    assert not result.full_resync
+    assert (result.added, result.removed) == (1, 2)
+    # Only the new message was downloaded, and the inbox was not listed again
+    assert fake_gmail_server.batch_sizes == [1]
+    assert fake_gmail_server.list_calls == list_calls
+    assert _ids(sync_client) == ["m5", "m4", "m3", "m1"]
+
+
+def test_checkpoint_is_reused_by_a_new_client(sync_client, fake_gmail_server, fake_gmail_service):
+    sync_client.sync_inbox()
+    fake_gmail_server.add_message(make_message("m5", "Task: 5", "body 5", internal_date=5))
+
+    new_client = GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        sync_state_file=sync_client.inbox_sync.checkpoint_file,
+    )
+    result = new_client.sync_inbox()
+
+    assert not result.full_resync
+    assert result.added == 1
+    assert len(new_client.inbox_sync.emails()) == 6
+
+
+def test_expired_checkpoint_falls_back_to_full_resync(sync_client, fake_gmail_server):
+    sync_client.sync_inbox()
+    fake_gmail_server.delete_message("m1")
+    fake_gmail_server.expire_history()
+
+    result = sync_client.sync_inbox()
+
+    assert result.full_resync
+    assert _ids(sync_client) == ["m4", "m3", "m2", "m0"]
+
+
+def test_label_changes_update_stored_labels(sync_client, fake_gmail_server):
+    sync_client.sync_inbox()
+    fake_gmail_server.add_label("m1", "IMPORTANT")
+    fake_gmail_server.add_label("m3", "STARRED")
+    fake_gmail_server.add_label("m3", "UNREAD")
+    fake_gmail_server.remove_label("m3", "STARRED")
+
+    result = sync_client.sync_inbox()
+
+    assert (result.added, result.removed, result.relabeled) == (0, 0, 2)
+    labels = {email["id"]: email["labels"] for email in sync_client.inbox_sync.emails()}
+    assert labels["m1"] == ["INBOX", "IMPORTANT"]
+    assert labels["m3"] == ["INBOX", "UNREAD"]
+    assert labels["m0"] == ["INBOX"]
+
+
+def test_sync_without_changes_does_not_rewrite_checkpoint(sync_client, monkeypatch):
+    sync_client.sync_inbox()
+    saves = []
+    monkeypatch.setattr(sync_client.inbox_sync.checkpoint, "save", saves.append)
+
+    result = sync_client.sync_inbox()
+
+    assert not result.changed
+    assert saves == []
+
+
+def test_label_changes_apply_to_a_stored_message_added_again(sync_client, fake_gmail_server):
+    fake_gmail_server.add_label("m1", "IMPORTANT")
+    sync_client.sync_inbox()
+    # Re-added (e.g. delivered again) and relabelled while already stored
+    fake_gmail_server.add_message(fake_gmail_server.messages["m1"])
+    fake_gmail_server.remove_label("m1", "IMPORTANT")
+    fake_gmail_server.batch_sizes.clear()
+
+    result = sync_client.sync_inbox()
+
+    assert (result.added, result.relabeled) == (0, 1)
+    assert fake_gmail_server.batch_sizes == []
+    labels = {email["id"]: email["labels"] for email in sync_client.inbox_sync.emails()}
+    assert labels["m1"] == ["INBOX"]
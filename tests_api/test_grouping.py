@@ -0,0 +1,48 @@
+"""
+SubjectGroups: ordered, hash-indexed body de-duplication per subject.
+"""
+
+import time
+
+from api.grouping import SubjectGroups, normalize_body
+
+
+def test_first_seen_order_and_exact_duplicates():
+    groups = SubjectGroups()
+    for subject, body in [
+        ("Task: A", "one"),
+        ("Task: B", "x"),
+        ("Task: A", "two"),
+        ("Task: A", " one "),
+        ("Task: A", ""),
+        ("Task: C", ""),
+    ]:
+        groups.add(subject, body)
+
+    assert groups.as_dict() == {"Task: A": ["one", "two"], "Task: B": ["x"], "Task: C": []}
+    assert list(groups.as_dict()) == ["Task: A", "Task: B", "Task: C"]
+
+
+def test_normalized_bodies_are_equal():
+    exact = SubjectGroups()
+    loose = SubjectGroups(normalize_bodies=True)
+    bodies = ["Please  check\nthe report", "Please check the report\n> old quoted text"]
+
+    for body in bodies:
+        exact.add("Task: Report", body)
+        loose.add("Task: Report", body)
+
+    assert len(exact["Task: Report"]) == 2
+    assert loose["Task: Report"] == ["Please  check\nthe report"]
+    assert normalize_body(" a \n> quoted\n\tb ") == "a b"
+
+
+def test_grouping_is_linear():
+    # 20k distinct bodies under one subject would take seconds with a list scan
+    groups = SubjectGroups()
+    start = time.monotonic()
+    for i in range(20_000):
+        groups.add("Task: Busy thread", f"reply number {i}")
+
+    assert len(groups["Task: Busy thread"]) == 20_000
+    assert time.monotonic() - start < 2
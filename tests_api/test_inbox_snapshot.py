@@ -0,0 +1,42 @@
+"""
+InboxSnapshot: one inbox read, every view built in a single pass.
+"""
+
+from api.gmail_client import GmailClient
+from api.inbox_snapshot import InboxSnapshot
+from tests_api.fake_gmail_server import make_message
+
+EMAILS = [
+    {"id": "1", "subject": "Task: Pay rent", "body": "Urgent, pay today"},
+    {"id": "2", "subject": "Task: Pay rent", "body": "Paid already"},
+    {"id": "3", "subject": "Task: Pay rent", "body": "Paid already"},
+    {"id": "4", "subject": "Newsletter", "body": "urgent deals inside"},
+    {"id": "5", "subject": "task: Call mom", "body": ""},
+]
+
+
+def test_views_are_built_in_one_pass():
+    snapshot = InboxSnapshot.from_emails(iter(EMAILS))
+
+    assert [email["id"] for email in snapshot.urgent] == ["1", "4"]
+    assert [email["id"] for email in snapshot.task_urgent] == ["1"]
+    assert snapshot.groups["Newsletter"] == ["urgent deals inside"]
+    assert snapshot.task_groups == {
+        "Task: Pay rent": ["Urgent, pay today", "Paid already"],
+        "task: Call mom": [],
+    }
+
+
+def test_views_match_the_client_methods(fake_gmail_server, fake_gmail_service):
+    for i, email in enumerate(EMAILS):
+        fake_gmail_server.add_message(
+            make_message(email["id"], email["subject"], email["body"], internal_date=-i)
+        )
+    client = GmailClient(service=fake_gmail_service, batch_uri=fake_gmail_server.batch_uri)
+
+    snapshot = InboxSnapshot.fetch(client)
+    list_calls = fake_gmail_server.list_calls
+
+    assert list_calls == 1
+    assert snapshot.task_groups == client.get_emails_grouped_by_subject(subject_prefix="Task:")
+    assert snapshot.task_urgent == client.get_urgent_emails(subject_prefix="Task:")
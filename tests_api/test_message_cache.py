@@ -0,0 +1,117 @@
+"""
+On-disk parsed message cache (MessageCache) and its use by GmailClient.
+"""
+
+from api.gmail_client import LABEL_FIELDS, LIST_FIELDS, GmailClient
+from api.message_cache import MessageCache
+from tests_api.fake_gmail_server import make_message
+
+
+def _email(msg_id: str) -> dict:
+    return {"id": msg_id, "subject": f"Task: {msg_id}", "body": "body", "labels": ["INBOX"]}
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = MessageCache(path)
+    cache.put_many([_email("a"), _email("b")])
+
+    found = cache.get_many(["a", "b", "c"])
+    cache.close()
+
+    assert sorted(found) == ["a", "b"]
+    # Labels change over time, they are not cached
+    assert found["a"] == {"id": "a", "subject": "Task: a", "body": "body"}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Data survives a new process / new object
+    reopened = MessageCache(path)
+    assert len(reopened) == 2
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = MessageCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put_many([_email("a")])
+    cache.put_many([_email("b")])
+    cache.get_many(["a"])  # 'a' is now newer than 'b'
+
+    cache.put_many([_email("c")])
+
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_bodies_are_kept_per_body_cap(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    MessageCache(path, body_limit=4).put_many([{**_email("a"), "body": "trun"}])
+
+    larger_cap = MessageCache(path, body_limit=1024)
+    assert larger_cap.get_many(["a"]) == {}
+
+    larger_cap.put_many([{**_email("a"), "body": "truncated earlier"}])
+    assert larger_cap.get_many(["a"])["a"]["body"] == "truncated earlier"
+    assert MessageCache(path, body_limit=4).get_many(["a"])["a"]["body"] == "trun"
+    assert len(larger_cap) == 2
+
+
+def test_size_is_tracked_without_counting_the_table(tmp_path):
+    cache = MessageCache(str(tmp_path / "cache.sqlite3"), max_entries=3)
+    cache.put_many([_email("a"), _email("b")])
+    cache.put_many([_email("b"), _email("c")])  # 'b' is replaced, not added
+    assert len(cache) == 3
+    assert cache.evictions == 0
+
+    cache.put_many([_email("d")])
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert len(MessageCache(cache.path)) == 3
+
+
+def test_invalidate(tmp_path):
+    cache = MessageCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many([_email("a"), _email("b"), _email("c")])
+
+    cache.invalidate(["a"])
+    assert len(cache) == 2
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_client_only_downloads_unseen_messages(fake_gmail_server, fake_gmail_service, tmp_path):
+    for i in range(4):
+        fake_gmail_server.add_message(make_message(f"m{i}", f"Task: {i}", f"body {i}", internal_date=i))
+    client = GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        cache_file=str(tmp_path / "cache.sqlite3"),
+    )
+
+    first = client.get_inbox_emails()
+    fake_gmail_server.add_message(make_message("m4", "Task: 4", "body 4", internal_date=4))
+    second = client.get_inbox_emails()
+
+    assert [email["id"] for email in second] == ["m4"] + [email["id"] for email in first]
+    # 4 full gets, then 4 label-only gets for the cached ones and 1 full get
+    assert fake_gmail_server.batch_sizes == [4, 4, 1]
+    assert client.cache.stats()["hits"] == 4
+
+
+def test_cached_messages_get_their_current_labels(fake_gmail_server, fake_gmail_service, tmp_path):
+    for i in range(3):
+        fake_gmail_server.add_message(make_message(f"m{i}", f"Task: {i}", f"body {i}", internal_date=i))
+    client = GmailClient(
+        service=fake_gmail_service,
+        batch_uri=fake_gmail_server.batch_uri,
+        cache_file=str(tmp_path / "cache.sqlite3"),
+    )
+    client.get_inbox_emails()
+
+    fake_gmail_server.add_label("m1", "STARRED")
+    fake_gmail_server.fields_seen.clear()
+    emails = {email["id"]: email for email in client.get_inbox_emails()}
+
+    assert emails["m1"]["labels"] == ["INBOX", "STARRED"]
+    assert emails["m0"]["subject"] == "Task: 0"
+    # No full message was downloaded again
+    assert set(fake_gmail_server.fields_seen) == {LIST_FIELDS, LABEL_FIELDS}
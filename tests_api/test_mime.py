@@ -0,0 +1,94 @@
+"""
+MIME tree walking and capped body decoding (api/mime.py).
+"""
+
+import base64
+
+from api.mime import decode_body_data, extract_body_text, html_to_text
+
+
+def _data(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("UTF-8")).decode("ascii")
+
+
+def _leaf(mime_type: str, text: str, **extra) -> dict:
+    return {"mimeType": mime_type, "body": {"data": _data(text)}, **extra}
+
+
+def test_plain_text_nested_under_alternative():
+    payload = {
+        "mimeType": "multipart/mixed",
+        "parts": [
+            {
+                "mimeType": "multipart/alternative",
+                "parts": [
+                    _leaf("text/html", "<p>html version</p>"),
+                    _leaf("text/plain", "plain version"),
+                ],
+            },
+            _leaf("application/pdf", "%PDF", filename="report.pdf"),
+        ],
+    }
+
+    assert extract_body_text(payload) == "plain version"
+
+
+def test_html_fallback_is_converted_to_text():
+    payload = {
+        "mimeType": "multipart/mixed",
+        "parts": [
+            {"mimeType": "multipart/related", "parts": [
+                _leaf("text/html", "<html><head><style>p {}</style></head>"
+                                   "<body><p>Urgent:&nbsp;call</p><div>back</div></body></html>"),
+            ]},
+        ],
+    }
+
+    assert extract_body_text(payload) == "Urgent: call\nback"
+
+
+def test_attachments_and_missing_text():
+    payload = {
+        "mimeType": "multipart/mixed",
+        "parts": [
+            _leaf("text/plain", "notes", filename="notes.txt"),
+            {"mimeType": "image/png", "body": {"attachmentId": "abc", "size": 1000}},
+        ],
+    }
+
+    assert extract_body_text(payload) == ""
+
+
+def test_single_part_message():
+    assert extract_body_text(_leaf("text/plain", "hello\nworld")) == "hello\nworld"
+
+
+def test_decoding_is_capped():
+    data = _data("x" * 10_000)
+
+    assert decode_body_data(data, max_bytes=100) == b"x" * 100
+    assert decode_body_data(data, max_bytes=None) == b"x" * 10_000
+    # without padding, like Gmail sometimes sends it
+    assert decode_body_data(_data("ab").rstrip("="), max_bytes=None) == b"ab"
+
+
+def test_capped_multibyte_text_is_still_valid():
+    payload = _leaf("text/plain", "שלום" * 100)
+
+    text = extract_body_text(payload, max_bytes=7)
+
+    assert text == "שלו"
+
+
+def test_charset_from_headers():
+    payload = {
+        "mimeType": "text/plain",
+        "headers": [{"name": "Content-Type", "value": 'text/plain; charset="iso-8859-1"'}],
+        "body": {"data": base64.urlsafe_b64encode("café".encode("iso-8859-1")).decode()},
+    }
+
+    assert extract_body_text(payload) == "café"
+
+
+def test_html_to_text_skips_scripts():
+    assert html_to_text("<script>var a;</script>Hi <b>there</b><br>bye") == "Hi there\nbye"
@@ -0,0 +1,136 @@
+"""
+Inbox vs board reconciliation, on hand-made snapshots.
+"""
+
+import time
+
+from api.board_snapshot import BoardSnapshot
+from api.inbox_snapshot import InboxSnapshot
+from api.reconcile import (
+    DUPLICATE_CARD,
+    MISSING_BODY,
+    MISSING_CARD,
+    MISSING_LABEL,
+    UNEXPECTED_CARD,
+    Reconciler,
+)
+from tests_api.fake_trello_server import make_card, make_list
+
+LISTS = [make_list("l1", "To Do")]
+
+
+def _email(msg_id: str, subject: str, body: str) -> dict:
+    return {"id": msg_id, "subject": subject, "body": body}
+
+
+def _reconcile(emails, cards, **options):
+    inbox = InboxSnapshot.from_emails(emails)
+    board = BoardSnapshot.from_cards(cards, LISTS)
+    return Reconciler(**options).reconcile(inbox, board)
+
+
+def test_in_sync_board_has_no_discrepancies():
+    emails = [
+        _email("m1", "Task: report", "this is urgent"),
+        _email("m2", "Task: notes", "first"),
+        _email("m3", "Task: notes", "second\n> quoted reply"),
+        _email("m4", "Lunch?", "not a task"),
+    ]
+    cards = [
+        make_card("c1", "report", "l1", "this is urgent", ["Urgent"]),
+        make_card("c2", "notes", "l1", "first\n\nsecond\n> quoted reply"),
+    ]
+
+    report = _reconcile(emails, cards)
+
+    assert report.ok, report.messages()
+    assert list(report.expected) == ["report", "notes"]
+    assert report.expected["notes"].merged and report.expected["report"].urgent
+
+
+def test_every_kind_is_reported_in_one_pass():
+    emails = [
+        _email("m1", "Task: report", "this is urgent"),
+        _email("m2", "Task: notes", "first"),
+        _email("m3", "Task: notes", "second"),
+        _email("m4", "Task: missing", "nowhere"),
+        _email("m5", "Task: twice", "once"),
+    ]
+    cards = [
+        make_card("c1", "report", "l1", "this is urgent"),
+        make_card("c2", "notes", "l1", "first only"),
+        make_card("c3", "twice", "l1", "once"),
+        make_card("c4", "twice", "l1", "once"),
+        make_card("c5", "stray", "l1"),
+    ]
+
+    report = _reconcile(emails, cards)
+
+    assert report.counts() == {
+        MISSING_CARD: 1, DUPLICATE_CARD: 1, MISSING_LABEL: 1, MISSING_BODY: 1, UNEXPECTED_CARD: 1,
+    }
+    [missing_body] = report.of_kind(MISSING_BODY)
+    assert (missing_body.title, missing_body.body, missing_body.card_ids) == ("notes", "second", ["c2"])
+    assert report.of_kind(DUPLICATE_CARD)[0].card_ids == ["c3", "c4"]
+    assert report.of_kind(MISSING_CARD)[0].email_ids == ["m4"]
+    assert report.of_kind(UNEXPECTED_CARD)[0].title == "stray"
+    assert report.messages(MISSING_LABEL) == [
+        "Trello card for urgent email 'report' (subject 'Task: report') does not have 'Urgent' label."
+    ]
+
+
+def test_bodies_are_found_inside_description_text():
+    emails = [
+        _email("m1", "Task: notes", "first   body"),
+        _email("m2", "Task: notes", "second body"),
+    ]
+    cards = [make_card("c1", "notes", "l1", "Merged: first body, then second\nbody.")]
+
+    assert _reconcile(emails, cards, normalize_bodies=True).ok
+    # the default compares the exact text
+    assert not _reconcile(emails, cards).ok
+
+
+def test_quoted_reply_text_is_checked():
+    emails = [
+        _email("m1", "Task: notes", "new text\n> what was said before"),
+        _email("m2", "Task: notes", "> only a quote"),
+    ]
+    cards = [make_card("c1", "notes", "l1", "new text\nsomething else")]
+
+    report = _reconcile(emails, cards, check_unexpected=False)
+    assert [item.body for item in report.of_kind(MISSING_BODY)] == [
+        "new text\n> what was said before", "> only a quote",
+    ]
+    # normalized, the quote-only body is still compared instead of matching anything
+    loose = _reconcile(emails, cards, normalize_bodies=True, check_unexpected=False)
+    assert [item.body for item in loose.of_kind(MISSING_BODY)] == ["> only a quote"]
+
+
+def test_options():
+    emails = [_email("m1", "Task: single", "the body")]
+    cards = [make_card("c1", "single", "l1", "something else"), make_card("c2", "old", "l1")]
+
+    assert _reconcile(emails, cards, check_unexpected=False).ok
+    report = _reconcile(emails, cards, check_all_bodies=True, check_unexpected=False)
+    assert [item.kind for item in report.discrepancies] == [MISSING_BODY]
+
+
+def test_reconcile_is_linear():
+    count = 100_000
+    emails = []
+    cards = []
+    for i in range(count):
+        emails.append(_email(f"m{i}", f"Task: subject {i // 2}", f"body {i}"))
+        if i % 2 == 0:
+            cards.append(make_card(f"c{i}", f"subject {i // 2}", "l1", f"body {i}\n\nbody {i + 1}"))
+    inbox = InboxSnapshot.from_emails(emails)
+    board = BoardSnapshot.from_cards(cards, LISTS)
+
+    start = time.monotonic()
+    report = Reconciler().reconcile(inbox, board)
+    elapsed = time.monotonic() - start
+
+    assert report.ok
+    assert len(report.expected) == count // 2
+    assert elapsed < 10
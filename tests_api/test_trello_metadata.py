@@ -0,0 +1,111 @@
+"""
+Board metadata cache: list / label / member lookups without refetching.
+"""
+
+import threading
+import time
+
+from api.trello_client import TrelloClient
+from tests_api.fake_trello_server import make_label, make_list, make_member
+
+
+def _seed(server) -> None:
+    server.lists["l1"] = make_list("l1", "To Do")
+    server.lists["l2"] = make_list("l2", "In Progress")
+    server.labels["u"] = make_label("u", "Urgent")
+    server.members["m"] = make_member("m", "Dana Lee")
+
+
+def test_repeated_lookups_are_dictionary_hits(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+
+    for _ in range(50):
+        assert client.get_list_name_by_id("l1") == "To Do"
+        assert client.get_list_name_by_id("l2") == "In Progress"
+    assert client.build_lists_map() == {"l1": "To Do", "l2": "In Progress"}
+
+    assert fake_trello_server.calls_by_resource == {"lists": 1}
+
+
+def test_labels_and_members_are_cached_too(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+
+    assert client.metadata.label_name("u") == "Urgent"
+    assert client.metadata.member_name("m") == "Dana Lee"
+    assert client.metadata.label_name("u") == "Urgent"
+
+    assert fake_trello_server.calls_by_resource == {"labels": 1, "members": 1}
+
+
+def test_expired_entries_revalidate_with_etag(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url, metadata_ttl=0.05)
+
+    client.get_list_name_by_id("l1")
+    time.sleep(0.1)
+    assert client.get_list_name_by_id("l1") == "To Do"
+
+    assert fake_trello_server.not_modified == 1
+    assert client.metadata.fetches == 1
+    assert client.metadata.revalidations == 1
+
+
+def test_renamed_column_is_seen_after_invalidation(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+    client.get_list_name_by_id("l1")
+
+    fake_trello_server.lists["l1"] = make_list("l1", "Backlog")
+    assert client.get_list_name_by_id("l1") == "To Do"  # still cached
+
+    client.invalidate_metadata("lists")
+    assert client.get_list_name_by_id("l1") == "Backlog"
+    assert client.metadata.fetches == 2
+
+
+def test_unknown_list_id_revalidates_once(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+    client.get_list_name_by_id("l1")
+
+    fake_trello_server.lists["l3"] = make_list("l3", "Completed")
+    assert client.get_list_name_by_id("l3") == "Completed"
+
+    assert client.get_list_name_by_id("missing") is None
+    # first fetch, the refresh for l3, a 304 for 'missing'
+    assert fake_trello_server.calls_by_resource == {"lists": 3}
+    assert fake_trello_server.not_modified == 1
+
+
+def test_unknown_ids_are_remembered_until_the_ttl(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url, metadata_ttl=0.2)
+
+    for _ in range(20):
+        assert client.get_list_name_by_id("archived") is None
+    # first fetch + one revalidation, the other lookups are cached misses
+    assert fake_trello_server.calls_by_resource == {"lists": 2}
+
+    time.sleep(0.25)
+    fake_trello_server.lists["archived"] = make_list("archived", "Old")
+    assert client.get_list_name_by_id("archived") == "Old"
+
+
+def test_readers_do_not_wait_for_a_revalidation(fake_trello_server):
+    _seed(fake_trello_server)
+    client = TrelloClient(base_url=fake_trello_server.url)
+    client.get_list_name_by_id("l1")
+
+    fake_trello_server.response_delay = 0.5
+    slow = threading.Thread(target=client.metadata.label_name, args=("u",))
+    slow.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert client.get_list_name_by_id("l2") == "In Progress"
+    elapsed = time.monotonic() - start
+    slow.join()
+
+    assert elapsed < 0.25
@@ -0,0 +1,126 @@
+"""
+TrelloClient's pooled session: keep-alive, retries and rate limit handling.
+"""
+
+import time
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.rate_limit import RetryPolicy
+from api.trello_client import TrelloClient
+from tests_api.fake_trello_server import make_card, make_list
+
+
+def _client(server, **kwargs) -> TrelloClient:
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=3, base_delay=0.01))
+    return TrelloClient(base_url=server.url, **kwargs)
+
+
+def test_requests_reuse_one_connection(fake_trello_server):
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    fake_trello_server.cards["c1"] = make_card("c1", "Task: one", "l1")
+    client = _client(fake_trello_server)
+
+    for _ in range(5):
+        assert [card["id"] for card in client.get_board_cards()] == ["c1"]
+        assert client.get_board_lists() == [make_list("l1", "To Do")]
+
+    assert fake_trello_server.calls == 10
+    assert len(fake_trello_server.connections) == 1
+
+
+def test_card_fields_are_selected(fake_trello_server):
+    fake_trello_server.cards["c1"] = make_card("c1", "Task: one", "l1", desc="body")
+    client = _client(fake_trello_server)
+
+    card = client.get_board_cards()[0]
+
+    assert set(card) == {"id", "name", "desc", "idList", "labels"}
+
+
+def test_throttled_and_failed_requests_are_retried(fake_trello_server):
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    fake_trello_server.fail_next = [429, 503, 502]
+    client = _client(fake_trello_server)
+
+    assert client.build_lists_map() == {"l1": "To Do"}
+    assert fake_trello_server.calls == 4
+
+
+def test_gives_up_after_max_retries(fake_trello_server):
+    fake_trello_server.fail_next = [503] * 5
+    client = _client(fake_trello_server, retry_policy=RetryPolicy(max_retries=2, base_delay=0.01))
+
+    with pytest.raises(requests.HTTPError):
+        client.get_board_lists()
+    assert fake_trello_server.calls == 3
+
+
+def test_posts_are_only_retried_when_throttled(fake_trello_server, trello_webhook_receiver):
+    client = _client(fake_trello_server)
+
+    # A 5xx POST may have been applied, sending it again could create a second webhook
+    fake_trello_server.fail_next = [503]
+    with pytest.raises(requests.HTTPError):
+        client.create_webhook(trello_webhook_receiver.callback_url)
+    assert fake_trello_server.post_calls == 1
+    assert fake_trello_server.webhooks == {}
+
+    fake_trello_server.fail_next = [429]
+    client.create_webhook(trello_webhook_receiver.callback_url)
+    assert fake_trello_server.post_calls == 3
+    assert len(fake_trello_server.webhooks) == 1
+
+
+def test_callers_session_keeps_its_adapters(fake_trello_server):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=2)
+    session.mount("http://", adapter)
+    client = _client(fake_trello_server, session=session)
+
+    client.get_board_lists()
+
+    assert session.get_adapter(fake_trello_server.url) is adapter
+
+
+def test_malformed_rate_limit_header_is_ignored(fake_trello_server):
+    fake_trello_server.rate_limit_remaining = "lots"
+    client = _client(fake_trello_server)
+
+    assert client.get_board_lists() == []
+
+
+def test_retry_after_is_honoured(fake_trello_server):
+    fake_trello_server.fail_next = [429]
+    fake_trello_server.retry_after = "0.3"
+    client = _client(fake_trello_server)
+
+    start = time.monotonic()
+    client.get_board_lists()
+
+    assert time.monotonic() - start >= 0.3
+
+
+def test_exhausted_rate_limit_window_pauses_the_limiter(fake_trello_server):
+    fake_trello_server.rate_limit_remaining = 0
+    fake_trello_server.rate_limit_interval_ms = 300
+    client = _client(fake_trello_server)
+
+    client.get_board_lists()
+    start = time.monotonic()
+    client.get_board_lists()
+
+    assert time.monotonic() - start >= 0.25
+
+
+def test_client_side_limiter_spaces_out_bursts(fake_trello_server):
+    client = _client(fake_trello_server, requests_per_second=50, burst=5)
+
+    start = time.monotonic()
+    for _ in range(15):
+        client.get_board_lists()
+
+    # 5 from the burst, the other 10 at 50 per second
+    assert time.monotonic() - start >= 0.15
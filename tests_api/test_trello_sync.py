@@ -0,0 +1,155 @@
+"""
+Incremental board sync in TrelloClient (board actions since a cursor).
+"""
+
+from api.trello_client import TrelloClient
+from tests_api.fake_trello_server import make_card, make_label, make_list
+
+
+def _seed(server, count: int = 3) -> None:
+    server.lists["l1"] = make_list("l1", "To Do")
+    server.lists["l2"] = make_list("l2", "Completed")
+    for i in range(count):
+        server.add_card(make_card(f"c{i}", f"Task: {i}", "l1", desc=f"body {i}"))
+
+
+def _client(server, tmp_path) -> TrelloClient:
+    return TrelloClient(base_url=server.url, sync_state_file=str(tmp_path / "board.json"))
+
+
+def _by_id(cards: list) -> dict:
+    return {card["id"]: card for card in cards}
+
+
+def test_first_sync_is_a_full_refresh(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+
+    result = client.sync_board()
+
+    assert result.full_refresh and result.added == 3
+    assert [card["id"] for card in client.board_sync.cards()] == ["c0", "c1", "c2"]
+    assert fake_trello_server.calls_by_resource == {"actions": 1, "cards": 1}
+
+
+def test_later_syncs_only_read_actions(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+    client.sync_board()
+
+    urgent = make_label("u", "Urgent")
+    fake_trello_server.add_card(make_card("c9", "Task: new", "l1", desc="fresh"))
+    fake_trello_server.update_card("c0", idList="l2")
+    fake_trello_server.update_card("c1", desc="edited")
+    fake_trello_server.add_label_to_card("c1", urgent)
+    fake_trello_server.archive_card("c2")
+
+    result = client.sync_board()
+    cards = _by_id(client.get_board_cards())
+
+    assert not result.full_refresh
+    assert (result.added, result.removed) == (1, 1)
+    assert set(cards) == {"c0", "c1", "c9"}
+    assert cards["c0"]["idList"] == "l2"
+    assert cards["c1"]["desc"] == "edited"
+    assert [label["name"] for label in cards["c1"]["labels"]] == ["Urgent"]
+    assert cards["c9"]["desc"] == "fresh"
+    # the board cards were only downloaded once, by the first sync
+    assert fake_trello_server.calls_by_resource["cards"] == 1
+
+    fake_trello_server.remove_label_from_card("c1", "u")
+    fake_trello_server.delete_card("c9")
+    client.sync_board()
+    cards = _by_id(client.board_sync.cards())
+    assert cards["c1"]["labels"] == [] and "c9" not in cards
+
+
+def test_local_store_matches_the_board(fake_trello_server, tmp_path):
+    _seed(fake_trello_server, count=5)
+    client = _client(fake_trello_server, tmp_path)
+    client.sync_board()
+
+    fake_trello_server.update_card("c3", name="Task: renamed")
+    fake_trello_server.add_card(make_card("c7", "Task: 7", "l2"))
+    fake_trello_server.add_label_to_card("c7", make_label("u", "Urgent"))
+    fake_trello_server.delete_card("c0")
+    client.sync_board()
+
+    fresh = _by_id(TrelloClient(base_url=fake_trello_server.url).get_board_cards())
+    assert _by_id(client.board_sync.cards()) == fresh
+
+
+def test_actions_are_paged(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+    client.board_sync.page_size = 2
+    client.sync_board()
+
+    for i in range(5):
+        fake_trello_server.update_card("c0", desc=f"v{i}")
+
+    result = client.sync_board()
+
+    assert result.actions == 5
+    assert _by_id(client.board_sync.cards())["c0"]["desc"] == "v4"
+
+
+def test_archived_list_triggers_a_full_refresh(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+    client.sync_board()
+
+    fake_trello_server.close_list("l1")
+    result = client.sync_board()
+
+    assert result.full_refresh
+    assert client.board_sync.cards() == []
+
+
+def test_too_many_actions_trigger_a_full_refresh(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+    client.board_sync.max_actions = 3
+    client.sync_board()
+
+    for i in range(5):
+        fake_trello_server.update_card("c1", desc=f"v{i}")
+
+    assert client.sync_board().full_refresh
+    assert _by_id(client.board_sync.cards())["c1"]["desc"] == "v4"
+
+
+def test_checkpoint_survives_a_new_client(fake_trello_server, tmp_path):
+    _seed(fake_trello_server)
+    _client(fake_trello_server, tmp_path).sync_board()
+
+    fake_trello_server.update_card("c2", desc="later")
+    client = _client(fake_trello_server, tmp_path)
+    result = client.sync_board()
+
+    assert not result.full_refresh
+    assert _by_id(client.board_sync.cards())["c2"]["desc"] == "later"
+
+
+def test_empty_board_uses_a_date_cursor(fake_trello_server, tmp_path):
+    client = _client(fake_trello_server, tmp_path)
+    client.sync_board()
+
+    fake_trello_server.lists["l1"] = make_list("l1", "To Do")
+    fake_trello_server.add_card(make_card("c1", "Task: first", "l1"))
+
+    assert not client.sync_board().full_refresh
+    assert [card["id"] for card in client.board_sync.cards()] == ["c1"]
+
+
+def test_sync_without_changes_does_not_rewrite_checkpoint(fake_trello_server, tmp_path, monkeypatch):
+    _seed(fake_trello_server)
+    client = _client(fake_trello_server, tmp_path)
+    client.sync_board()
+    saves = []
+    monkeypatch.setattr(client.board_sync.checkpoint, "save", saves.append)
+
+    result = client.sync_board()
+
+    assert not result.changed
+    assert saves == []
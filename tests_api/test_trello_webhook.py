@@ -0,0 +1,140 @@
+"""
+Webhook receiver: registration, signed callbacks and waiting for card events.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+import requests
+
+from api.trello_client import TrelloClient
+from api.trello_webhook import TrelloWebhookReceiver, card_created, card_moved_to, label_added, sign_payload
+from tests_api.fake_trello_server import make_card, make_label, make_list
+
+
+def _seed(server) -> None:
+    server.lists["l1"] = make_list("l1", "To Do")
+    server.lists["l2"] = make_list("l2", "Completed")
+
+
+def test_register_and_unregister(fake_trello_server, trello_webhook_receiver):
+    webhook_id = trello_webhook_receiver.register()
+
+    assert fake_trello_server.webhooks[webhook_id]["callbackURL"] == trello_webhook_receiver.callback_url
+
+    trello_webhook_receiver.unregister()
+    assert fake_trello_server.webhooks == {}
+
+
+def test_unreachable_callback_is_refused(fake_trello_server):
+    client = TrelloClient(base_url=fake_trello_server.url)
+    # nothing listens on the discard port
+    receiver = TrelloWebhookReceiver(client, callback_url="http://127.0.0.1:9/hook")
+
+    with pytest.raises(requests.HTTPError):
+        receiver.register()
+    assert fake_trello_server.webhooks == {}
+    receiver.stop()
+
+
+def test_wait_for_card_events(fake_trello_server, trello_webhook_receiver):
+    _seed(fake_trello_server)
+    trello_webhook_receiver.register()
+
+    fake_trello_server.add_card(make_card("c1", "Task: one", "l1"))
+    fake_trello_server.update_card("c1", idList="l2")
+    fake_trello_server.add_label_to_card("c1", make_label("u", "Urgent"))
+
+    # waited for in a different order than they happened
+    labelled = trello_webhook_receiver.wait_for(label_added("Urgent", "Task: one"), timeout=5)
+    created = trello_webhook_receiver.wait_for(card_created("Task: one"), timeout=5)
+    moved = trello_webhook_receiver.wait_for(card_moved_to("Completed"), timeout=5)
+
+    assert (created.card_id, created.list_name) == ("c1", "To Do")
+    assert moved.type == "updateCard" and moved.card_name == "Task: one"
+    assert labelled.label_name == "Urgent"
+
+
+def test_wait_times_out(trello_webhook_receiver):
+    trello_webhook_receiver.register()
+
+    with pytest.raises(TimeoutError):
+        trello_webhook_receiver.wait_for(card_created(), timeout=0.2)
+
+
+def test_forged_callbacks_are_rejected(fake_trello_server, trello_webhook_receiver):
+    body = json.dumps({"action": {"type": "createCard", "data": {"card": {"id": "x"}}}}).encode()
+    url = trello_webhook_receiver.callback_url
+
+    forged = fake_trello_server.send_raw_callback(url, body, sign_payload(body, url, "wrong-secret"))
+    genuine = fake_trello_server.send_raw_callback(url, body, sign_payload(body, url, "fake-secret"))
+
+    assert (forged, genuine) == (401, 200)
+    assert trello_webhook_receiver.rejected == 1
+    assert trello_webhook_receiver.wait_for(timeout=1).card_id == "x"
+
+
+@pytest.mark.parametrize("body", [b"not json", b"[1, 2]", b'"text"', b"null"])
+def test_callbacks_that_are_not_json_objects_are_rejected(fake_trello_server, trello_webhook_receiver, body):
+    url = trello_webhook_receiver.callback_url
+
+    status = fake_trello_server.send_raw_callback(url, body, sign_payload(body, url, "fake-secret"))
+
+    assert status == 401
+    assert trello_webhook_receiver.rejected == 1
+
+
+def test_wait_for_async(fake_trello_server, trello_webhook_receiver):
+    _seed(fake_trello_server)
+    trello_webhook_receiver.register()
+
+    async def _wait():
+        waiter = asyncio.create_task(
+            trello_webhook_receiver.wait_for_async(card_created("Task: async"), timeout=5)
+        )
+        await asyncio.sleep(0.05)
+        fake_trello_server.add_card(make_card("c2", "Task: async", "l1"))
+        return await waiter
+
+    assert asyncio.run(_wait()).card_id == "c2"
+
+
+def test_concurrent_waiters_each_get_their_event(fake_trello_server, trello_webhook_receiver):
+    _seed(fake_trello_server)
+    trello_webhook_receiver.register()
+    results = {}
+
+    def _wait(title: str) -> None:
+        results[title] = trello_webhook_receiver.wait_for(card_created(title), timeout=5).card_id
+
+    waiters = [threading.Thread(target=_wait, args=(title,)) for title in ("Task: a", "Task: b")]
+    for waiter in waiters:
+        waiter.start()
+    # Both are blocked now, the events arrive in the "wrong" order for them
+    fake_trello_server.add_card(make_card("cb", "Task: b", "l1"))
+    fake_trello_server.add_card(make_card("ca", "Task: a", "l1"))
+    for waiter in waiters:
+        waiter.join()
+
+    assert results == {"Task: a": "ca", "Task: b": "cb"}
+
+
+def test_cancelled_async_wait_leaves_the_event(fake_trello_server, trello_webhook_receiver):
+    _seed(fake_trello_server)
+    trello_webhook_receiver.register()
+
+    async def _cancel_wait():
+        waiter = asyncio.create_task(
+            trello_webhook_receiver.wait_for_async(card_created("Task: late"), timeout=5)
+        )
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(_cancel_wait())
+    fake_trello_server.add_card(make_card("c3", "Task: late", "l1"))
+
+    assert trello_webhook_receiver.wait_for(card_created("Task: late"), timeout=5).card_id == "c3"
@@ -0,0 +1,89 @@
+"""
+Urgency classifier: word boundaries, negations, multi-rule matching.
+"""
+
+import pytest
+from api.urgency import EXTENDED_RULES, UrgencyClassifier, UrgencyRule
+
+
+@pytest.mark.parametrize("body, expected", [
+    ("Urgent: call the bank", True),
+    ("this is URGENT", True),
+    ("uRgEnT!", True),
+    ("please reply urgently", False),
+    ("the insurgent group", False),
+    ("a non-urgent reminder", False),
+    ("this is not urgent", False),
+    ("no longer urgent, thanks", False),
+    ("No problem. Urgent: the server is down", True),
+    ("Please reply without delay, urgent", True),
+    ("reply without delay urgent", True),
+    ("no time, urgent: server down", True),
+    ("nothing new - urgent fix needed", True),
+    ("", False),
+])
+def test_spec_classifier(body, expected):
+    assert UrgencyClassifier().is_urgent(body) is expected
+
+
+def test_extended_rules_report_the_matching_rule():
+    classifier = UrgencyClassifier(EXTENDED_RULES)
+
+    results = classifier.classify_batch([
+        "Please answer ASAP",
+        "Reply as soon as\npossible",
+        "critical: prod is down, urgent",
+        "nothing important",
+    ])
+
+    assert [result.rule for result in results] == ["asap", "asap", "critical", None]
+    assert [result.is_urgent for result in results] == [True, True, True, False]
+    assert results[2].score == 2
+    assert [match.phrase for match in results[2].matches] == ["critical", "urgent"]
+
+
+def test_threshold_and_weights():
+    classifier = UrgencyClassifier(
+        [UrgencyRule("soft", ("soon",), weight=0.5), UrgencyRule("hard", ("urgent",))],
+        threshold=1.0,
+    )
+
+    assert not classifier.is_urgent("reply soon")
+    assert classifier.is_urgent("urgent, reply soon")
+
+
+def test_search_query_for_pushdown():
+    assert UrgencyClassifier().search_query() == "urgent"
+    query = UrgencyClassifier(EXTENDED_RULES).search_query()
+    assert query.startswith("{urgent asap") and '"as soon as possible"' in query
+
+
+class _CountingStates(dict):
+    """
+    An automaton state that counts its transition lookups.
+    """
+    lookups = 0
+
+    def __contains__(self, char):
+        _CountingStates.lookups += 1
+        return super().__contains__(char)
+
+    def get(self, char, default=None):
+        _CountingStates.lookups += 1
+        return super().get(char, default)
+
+
+def test_many_keywords_stay_linear():
+    rules = [UrgencyRule(f"rule{i}", (f"keyword{i}",)) for i in range(500)]
+    classifier = UrgencyClassifier(rules + [UrgencyRule("urgent", ("urgent",))])
+    automaton = classifier._automaton
+    automaton._goto = [_CountingStates(state) for state in automaton._goto]
+    # Partial keyword matches make the scan follow fail links
+    body = "keyw keywords lorem ipsum " * 4000 + "urgent"
+    _CountingStates.lookups = 0
+
+    result = classifier.classify(body)
+
+    assert result.rule == "urgent"
+    # Aho-Corasick: at most ~3 lookups per character, whatever the number of keywords
+    assert _CountingStates.lookups <= 3 * len(body)
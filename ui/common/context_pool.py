@@ -0,0 +1,265 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from playwright.sync_api import Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
+
+from ui.common.logger import get_logger
+from ui.common.routing import DEFAULT_ROUTING_POLICY, ResourceRouter, RoutingPolicy
+
+# Where the Trello web app sends a browser whose session is gone
+LOGIN_URL_FRAGMENTS = ("/login", "id.atlassian.com")
+
+# The cookies that actually keep the browser logged in (Trello's own session,
+# and the Atlassian account session it is created from), and their domains
+AUTH_COOKIE_NAMES = frozenset({"token", "cloud.session.token"})
+AUTH_COOKIE_DOMAINS = ("trello.com", "atlassian.com")
+
+# A storage state that expires sooner than this is treated as expired
+EXPIRY_MARGIN_SECONDS = 10 * 60
+
+# One manual login round-trip (auth_setup.LOGIN_TIMEOUT_MS is 3 minutes) plus starting
+# the browser. Other workers wait that long for the lock, and a lock file older than
+# that was left behind by a crashed run.
+AUTH_LOCK_TIMEOUT_SECONDS = 3 * 60 + 30
+
+
+class StorageStateExpired(Exception):
+    """
+    Raised when a saved storage state no longer logs the browser in.
+    """
+
+
+def storage_state_looks_valid(path: str, now: float | None = None) -> bool:
+    """
+    Offline check of a saved storage state: the file exists and still has a
+    Trello / Atlassian login cookie that doesn't expire in the next few minutes.
+    Other cookies of those domains (locale, analytics) don't prove a login, and
+    neither does a session cookie (no expiry, it only lived as long as that browser).
+    (A server-side logout can only be noticed by loading the board.)
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="UTF-8") as f:
+            cookies = json.load(f).get("cookies", [])
+    except (OSError, ValueError):
+        return False
+
+    deadline = (now if now is not None else time.time()) + EXPIRY_MARGIN_SECONDS
+    return any(
+        cookie.get("name") in AUTH_COOKIE_NAMES
+        and cookie.get("domain", "").lstrip(".").endswith(AUTH_COOKIE_DOMAINS)
+        and cookie.get("expires", -1) > deadline
+        for cookie in cookies
+    )
+
+
+def save_storage_state(context: BrowserContext, path: str) -> None:
+    """
+    Save a context's storage state atomically (temp file + rename), so other
+    workers reading the file never see it half written.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="UTF-8") as f:
+        json.dump(context.storage_state(), f)
+    os.replace(tmp_path, path)
+
+
+def _remove_if_stale(lock_path: str, stale_after: float) -> bool:
+    """
+    Remove a lock file older than 'stale_after' seconds, True if it was removed.
+    """
+    try:
+        if time.time() - os.path.getmtime(lock_path) <= stale_after:
+            return False
+        os.remove(lock_path)
+        return True
+    except OSError:
+        return False  # released (or taken over) in the meantime
+
+
+@contextmanager
+def file_lock(
+    path: str,
+    timeout: float = AUTH_LOCK_TIMEOUT_SECONDS,
+    poll_interval: float = 0.2,
+    stale_after: float = AUTH_LOCK_TIMEOUT_SECONDS,
+) -> Iterator[None]:
+    """
+    Cross-process lock around 'path' (a '<path>.lock' file created exclusively,
+    works on every OS without an extra package). Raises TimeoutError if another
+    process holds it longer than 'timeout' seconds.
+    A lock file older than 'stale_after' seconds is taken over (a crashed run left it).
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if _remove_if_stale(lock_path, stale_after):
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{lock_path} is still locked after {timeout} seconds") from None
+            time.sleep(poll_interval)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+@dataclass
+class PooledPage:
+    """
+    A logged-in context with one page parked on the board.
+    uses: how many tests this page served
+    """
+    context: BrowserContext
+    page: Page
+    router: ResourceRouter
+    uses: int = 0
+
+
+class ContextPool:
+    """
+    Pre-authenticated browser contexts whose page is already on the board.
+    A test acquires one, and releases it afterwards: the page is reset
+    (extra pages closed, modal closed, back on the board) instead of a new
+    context being created and loading the board from cold.
+
+    size: how many idle contexts are kept (more are created on demand)
+    ready_selector: visible once the board is usable
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        url: str,
+        ready_selector: str,
+        storage_state: str,
+        context_args: dict | None = None,
+        routing: RoutingPolicy = DEFAULT_ROUTING_POLICY,
+        size: int = 1,
+        ready_timeout: float = 15_000,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.browser = browser
+        self.url = url
+        self.ready_selector = ready_selector
+        self.storage_state = storage_state
+        self.context_args = {**(context_args or {}), "storage_state": storage_state}
+        self.routing = routing
+        self.size = size
+        self.ready_timeout = ready_timeout
+        self.log = get_logger(self.__class__.__name__)
+
+        self._idle: list[PooledPage] = []
+        self._all: list[PooledPage] = []
+
+        # How often a test got a parked page vs a new one
+        self.reused = 0
+        self.created = 0
+
+    # ==================================================
+    # Creating and parking pages
+    # ==================================================
+
+    def _wait_for_board(self, page: Page) -> None:
+        """
+        Waits for the board, raises StorageStateExpired if Trello shows the login page instead.
+        """
+        try:
+            page.locator(self.ready_selector).wait_for(state="visible", timeout=self.ready_timeout)
+        except PlaywrightTimeoutError:
+            if any(fragment in page.url for fragment in LOGIN_URL_FRAGMENTS):
+                raise StorageStateExpired(f"{self.storage_state} no longer logs in to Trello") from None
+            raise
+
+    def _new(self) -> PooledPage:
+        start = time.monotonic()
+        context = self.browser.new_context(**self.context_args)
+        router = ResourceRouter(self.routing).attach(context)
+        page = context.new_page()
+        slot = PooledPage(context=context, page=page, router=router)
+        self._all.append(slot)
+
+        page.goto(self.url)
+        self._wait_for_board(page)
+        self.created += 1
+        self.log.info(f"New board page ready in {time.monotonic() - start:.2f}s.")
+        return slot
+
+    def warm_up(self) -> None:
+        """
+        Create the idle pages up front (this also checks the storage state).
+        """
+        while len(self._idle) < self.size:
+            self._idle.append(self._new())
+
+    def _reset(self, slot: PooledPage) -> None:
+        """
+        Bring a used page back to the plain board.
+        """
+        for page in slot.context.pages:
+            if page is not slot.page:
+                page.close()
+        slot.page.keyboard.press("Escape")  # closes an open card modal
+        if slot.page.url.rstrip("/") != self.url.rstrip("/"):
+            slot.page.goto(self.url)
+        self._wait_for_board(slot.page)
+
+    def _discard(self, slot: PooledPage) -> None:
+        if slot in self._all:
+            self._all.remove(slot)
+        try:
+            slot.context.close()
+        except Exception:
+            pass  # the browser may already be gone
+
+    # ==================================================
+    # Using the pool
+    # ==================================================
+
+    def acquire(self) -> PooledPage:
+        if self._idle:
+            slot = self._idle.pop()
+            self.reused += 1
+        else:
+            slot = self._new()
+        slot.uses += 1
+        slot.router.reset()
+        return slot
+
+    def release(self, slot: PooledPage, healthy: bool = True) -> None:
+        """
+        Park the page again. Pages of failed tests are replaced, their state is unknown.
+        """
+        if healthy and len(self._idle) < self.size:
+            try:
+                self._reset(slot)
+                self._idle.append(slot)
+                return
+            except Exception as error:
+                self.log.warning(f"Could not reset pooled page, replacing it: {error}")
+        self._discard(slot)
+
+    def save_storage_state(self, path: str | None = None) -> None:
+        """
+        Save the (refreshed) cookies of a logged-in context, so the next run starts from them.
+        """
+        if self._all:
+            save_storage_state(self._all[0].context, path or self.storage_state)
+
+    def close(self) -> None:
+        for slot in list(self._all):
+            self._discard(slot)
+        self._idle.clear()
+        self.log.info(f"Context pool closed: {self.created} pages created, {self.reused} reused.")
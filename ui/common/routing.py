@@ -0,0 +1,96 @@
+import re
+from dataclasses import dataclass, field
+
+from playwright.sync_api import BrowserContext, Page, Route
+
+from ui.common.logger import get_logger
+
+# Third-party analytics / monitoring the board doesn't need to render
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"segment\.(io|com)",
+    r"sentry\.io",
+    r"nr-data\.net",
+    r"newrelic\.com",
+    r"optimizely\.com",
+    r"hotjar\.com",
+    r"as\.atlassian\.com",
+    r"atlassian\.com/gasv3",
+)
+
+# Background images, avatars, videos and web fonts
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """
+    Which requests a page may send.
+
+    blocked_resource_types: Playwright resource types to abort ("image", "font", "script", ...)
+    blocked_url_patterns: regexes, matching URLs are aborted
+    allowed_url_patterns: regexes that are always let through (wins over both deny lists)
+    """
+    blocked_resource_types: frozenset[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    blocked_url_patterns: tuple[str, ...] = DEFAULT_BLOCKED_URL_PATTERNS
+    allowed_url_patterns: tuple[str, ...] = ()
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if any(re.search(pattern, url) for pattern in self.allowed_url_patterns):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return any(re.search(pattern, url) for pattern in self.blocked_url_patterns)
+
+
+DEFAULT_ROUTING_POLICY = RoutingPolicy()
+
+# Lets everything through, but still counts the requests
+ALLOW_ALL_POLICY = RoutingPolicy(blocked_resource_types=frozenset(), blocked_url_patterns=())
+
+
+@dataclass
+class ResourceRouter:
+    """
+    Aborts the requests a RoutingPolicy blocks and counts what was blocked / allowed.
+    Attach it to a Page, or to a BrowserContext to cover every page opened in it.
+    """
+    policy: RoutingPolicy = DEFAULT_ROUTING_POLICY
+    blocked: int = 0
+    allowed: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.log = get_logger(self.__class__.__name__)
+
+    def attach(self, target: Page | BrowserContext) -> "ResourceRouter":
+        target.route("**/*", self._handle)
+        return self
+
+    def detach(self, target: Page | BrowserContext) -> None:
+        target.unroute("**/*", self._handle)
+
+    def _handle(self, route: Route) -> None:
+        request = route.request
+        if self.policy.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            route.abort("blockedbyclient")
+            return
+        self.allowed += 1
+        # fallback() instead of continue_() so other route handlers still get a say
+        route.fallback()
+
+    def reset(self) -> None:
+        """
+        Start counting from zero (a pooled context serves many tests).
+        """
+        self.blocked = 0
+        self.allowed = 0
+        self.blocked_by_type.clear()
+
+    def summary(self) -> str:
+        by_type = ", ".join(f"{kind}={count}" for kind, count in sorted(self.blocked_by_type.items()))
+        return f"Requests: {self.allowed} allowed, {self.blocked} blocked ({by_type or 'none'})"
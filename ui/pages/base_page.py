@@ -1,11 +1,33 @@
 from playwright.sync_api import Page, Locator
 from ui.common.logger import get_logger
+from ui.common.routing import DEFAULT_ROUTING_POLICY, ResourceRouter, RoutingPolicy
 
 class BasePage:
-    def __init__(self, page: Page, base_url: str | None = None) -> None:
+    def __init__(self, page: Page, base_url: str | None = None, routing: RoutingPolicy | None = None) -> None:
+        """
+        routing: block requests on this page according to the policy (None = no blocking here,
+                 the UI suites already block on the whole browser context)
+        """
         self.page = page
         self.base_url = (base_url or "").rstrip("/") if base_url else ""
         self.log = get_logger(self.__class__.__name__)
+        self.router: ResourceRouter | None = None
+        if routing is not None:
+            self.enable_routing(routing)
+
+    def enable_routing(self, policy: RoutingPolicy = DEFAULT_ROUTING_POLICY) -> ResourceRouter:
+        """
+        Aborts the requests the policy blocks (images, fonts, analytics... by default).
+        The returned router counts blocked / allowed requests.
+        """
+        if self.router is None:
+            self.router = ResourceRouter(policy).attach(self.page)
+            self.log.info("Resource blocking enabled on this page.")
+        return self.router
+
+    @property
+    def routing_policy(self) -> RoutingPolicy | None:
+        return self.router.policy if self.router is not None else None
 
     def open(self, path: str = "") -> None:
         """
@@ -0,0 +1,145 @@
+import re
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Error, Page, Response
+
+from api.board_snapshot import BoardSnapshot
+from ui.common.logger import get_logger
+
+# REST calls the Trello web app makes while a board loads (it uses /1/Boards/... with a capital B)
+BOARD_RESPONSE_PATH = re.compile(r"^/1/boards/[^/]+(?:/(?P<resource>cards|lists|labels))?$", re.IGNORECASE)
+CARD_RESPONSE_PATH = re.compile(r"^/1/cards/[^/]+$", re.IGNORECASE)
+
+
+def _by_pos(items: dict[str, dict]) -> list[dict]:
+    """
+    Open items in Trello order (by 'pos' when the payload has it, otherwise as received).
+    """
+    open_items = [item for item in items.values() if not item.get("closed")]
+    return sorted(open_items, key=lambda item: item.get("pos", 0))
+
+
+class BoardNetworkCapture:
+    """
+    Collects the board JSON the Trello web app downloads by itself
+    (board, its lists / cards / labels, and single card reloads).
+
+    Responses are only remembered in the event handler and parsed later,
+    when snapshot() is called from the test's own flow.
+    Listens to one page at a time, reset() forgets an earlier load.
+    """
+
+    def __init__(self) -> None:
+        self.log = get_logger(self.__class__.__name__)
+        self._page: Page | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget everything captured so far (e.g. before the board is loaded again,
+        so a card deleted in between doesn't stay in the snapshot).
+        """
+        self.board: dict = {}
+        self.cards: dict[str, dict] = {}
+        self.lists: dict[str, dict] = {}
+        self.labels: dict[str, dict] = {}
+        self.responses = 0
+        self._pending: list[Response] = []
+
+    @staticmethod
+    def is_board_response(response: Response) -> bool:
+        """
+        True for the main board payload (the one that has the cards).
+        """
+        match = BOARD_RESPONSE_PATH.match(urlsplit(response.url).path)
+        return match is not None and match["resource"] is None and response.ok
+
+    @staticmethod
+    def _is_wanted(response: Response) -> bool:
+        if not response.ok or response.request.method != "GET":
+            return False
+        path = urlsplit(response.url).path
+        return BOARD_RESPONSE_PATH.match(path) is not None or CARD_RESPONSE_PATH.match(path) is not None
+
+    def attach(self, page: Page) -> None:
+        if self._page is not None:
+            self.detach()
+        page.on("response", self._on_response)
+        self._page = page
+
+    def detach(self) -> None:
+        if self._page is not None:
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+
+    def _on_response(self, response: Response) -> None:
+        if self._is_wanted(response):
+            self._pending.append(response)
+
+    # ==================================================
+    # Merging payloads
+    # ==================================================
+
+    def _merge(self, items: dict[str, dict], payload: list) -> None:
+        for item in payload:
+            if isinstance(item, dict) and item.get("id"):
+                items[item["id"]] = {**items.get(item["id"], {}), **item}
+
+    def _merge_response(self, path: str, data) -> None:
+        if CARD_RESPONSE_PATH.match(path):
+            self._merge(self.cards, [data])
+            return
+
+        resource = BOARD_RESPONSE_PATH.match(path)["resource"]
+        if resource is not None:
+            self._merge(getattr(self, resource), data)
+            if resource == "lists":
+                # lists can come with their cards nested (?cards=open)
+                for lst in data:
+                    self._merge(self.cards, lst.get("cards", []))
+            return
+
+        self.board = {key: value for key, value in data.items() if key not in ("cards", "lists", "labels")}
+        self._merge(self.cards, data.get("cards", []))
+        self._merge(self.lists, data.get("lists", []))
+        self._merge(self.labels, data.get("labels", []))
+
+    def _drain(self) -> None:
+        pending, self._pending = self._pending, []
+        for response in pending:
+            try:
+                data = response.json()
+            except (Error, ValueError):
+                # Not JSON, or the body is no longer available
+                continue
+            self.responses += 1
+            self._merge_response(urlsplit(response.url).path, data)
+
+    def _with_labels(self, card: dict) -> dict:
+        """
+        Some payloads only have idLabels on cards, the label objects come from the board.
+        """
+        if "labels" in card or not card.get("idLabels"):
+            return card
+        labels = [self.labels[label_id] for label_id in card["idLabels"] if label_id in self.labels]
+        return {**card, "labels": labels}
+
+    def snapshot(self) -> BoardSnapshot:
+        """
+        Everything captured so far, as an indexed board snapshot (open lists and cards only).
+        """
+        self._drain()
+        lists = _by_pos(self.lists)
+        list_order = {lst["id"]: index for index, lst in enumerate(lists)}
+        # Cards of archived lists are not shown on the board either
+        cards = sorted(
+            (self._with_labels(card) for card in _by_pos(self.cards) if card.get("idList") in list_order),
+            key=lambda card: list_order[card["idList"]],
+        )
+        self.log.info(f"Captured board data from {self.responses} responses: {len(cards)} cards, {len(lists)} lists.")
+        return BoardSnapshot.from_board({
+            **self.board,
+            "cards": cards,
+            "lists": lists,
+            "labels": list(self.labels.values()),
+        })
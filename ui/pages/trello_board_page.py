@@ -1,6 +1,10 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from playwright.sync_api import Page, Locator
+from api.board_snapshot import BoardSnapshot, card_label_names
+from ui.common.routing import RoutingPolicy
 from ui.pages.base_page import BasePage
+from ui.pages.board_capture import BoardNetworkCapture
 
 TRELLO_BOARD_URL = "https://trello.com/b/2GzdgPlw/droxi"
 
@@ -11,6 +15,30 @@ LIST_CARD_SELECTOR = '[data-testid="list-card"]'
 LIST_NAME_SELECTOR = '[data-testid="list-name"]'
 CARD_TITLE_SELECTOR = '[data-testid="card-name"]'
 COMPACT_LABEL_SELECTOR = '[data-testid="compact-card-label"]'
+CARD_LINK_SELECTOR = 'a[href*="/c/"]'
+
+# How many extra pages read card details at the same time in parallel mode
+DEFAULT_DETAIL_PAGES = 4
+
+
+# Reads every column, card title and compact label in one page.evaluate call
+# (instead of several Playwright round-trips per column and per card).
+BOARD_SNAPSHOT_SCRIPT = """
+(selectors) => {
+    const text = (element) => element ? element.innerText.trim() : "";
+    return Array.from(document.querySelectorAll(selectors.list), (column) => ({
+        name: text(column.querySelector(selectors.listName)),
+        cards: Array.from(column.querySelectorAll(selectors.card), (card) => {
+            const link = card.closest(selectors.cardLink) || card.querySelector(selectors.cardLink);
+            return {
+                title: text(card.querySelector(selectors.cardTitle)),
+                labels: Array.from(card.querySelectorAll(selectors.label), text),
+                url: link ? link.href : "",
+            };
+        }),
+    }));
+}
+"""
 
 
 @dataclass
@@ -24,6 +52,55 @@ class CardInfo:
     status: str  # E.g., "To Do", "In Progress", "Done"
 
 
+@dataclass
+class BoardCard:
+    """
+    A card as shown on the board (no description, that needs the modal).
+    column_index / card_index: where the card is, to find it again for clicking
+    url: the card's deep link (opens the board with this card's modal)
+    """
+    title: str
+    labels: list[str]
+    status: str
+    column_index: int
+    card_index: int
+    url: str = ""
+
+
+@dataclass
+class BoardDomSnapshot:
+    """
+    Every column and card of the rendered board, read at one moment.
+    """
+    columns: list[str] = field(default_factory=list)
+    cards: list[BoardCard] = field(default_factory=list)
+
+    @classmethod
+    def from_evaluate(cls, raw_columns: list[dict]) -> "BoardDomSnapshot":
+        snapshot = cls()
+        for column_index, column in enumerate(raw_columns):
+            snapshot.columns.append(column["name"])
+            for card_index, card in enumerate(column["cards"]):
+                snapshot.cards.append(BoardCard(
+                    title=card["title"],
+                    labels=card["labels"],
+                    status=column["name"],
+                    column_index=column_index,
+                    card_index=card_index,
+                    url=card.get("url", ""),
+                ))
+        return snapshot
+
+    def find(self, title: str) -> BoardCard | None:
+        """
+        The first card with this title, in board order.
+        """
+        return next((card for card in self.cards if card.title == title), None)
+
+    def with_label(self, label: str) -> list[BoardCard]:
+        return [card for card in self.cards if label in card.labels]
+
+
 class TrelloBoardPage(BasePage):
     """
     Page Object Model for the Trello Board page.
@@ -42,8 +119,20 @@ class TrelloBoardPage(BasePage):
     card_modal_labels: Locator
     card_modal_close_button: Locator
 
-    def __init__(self, page: Page, base_url: str | None = None) -> None:
-        super().__init__(page, base_url)
+    def __init__(
+        self,
+        page: Page,
+        base_url: str | None = None,
+        capture_network: bool = False,
+        routing: RoutingPolicy | None = None,
+    ) -> None:
+        """
+        capture_network: build card details from the board JSON the Trello web app
+                         downloads in open_board(), instead of opening card modals
+        routing: see BasePage
+        """
+        super().__init__(page, base_url, routing)
+        self.network = BoardNetworkCapture() if capture_network else None
 
         # Initialize locators
         self.board_header = self.page.locator(BOARD_HEADER_SELECTOR)
@@ -64,11 +153,36 @@ class TrelloBoardPage(BasePage):
     def open_board(self) -> None:
         """
         Opens the Trello board page and waits for board header (title) to be visible.
+        A page that is already parked on the board (see ContextPool) is not reloaded,
+        unless network capture needs the board JSON of a fresh load.
         """
+        if self.network is None and self.is_parked_on_board():
+            self.log.info("Board is already open, not reloading it.")
+            return
         self.log.info(f"Opening board using PATH='{self.PATH}'")
-        self.open(self.PATH)
-        self.board_header.wait_for(state="visible", timeout=10_000)
-        self.log.info("Board opened successfully.")
+        start = time.monotonic()
+        if self.network is not None:
+            # Listen before navigating, the board JSON arrives while the page loads.
+            # Only this load counts, and the listener goes away once the board is there.
+            self.network.reset()
+            self.network.attach(self.page)
+        try:
+            if self.network is None:
+                self.open(self.PATH)
+            else:
+                with self.page.expect_response(BoardNetworkCapture.is_board_response, timeout=10_000):
+                    self.open(self.PATH)
+            self.board_header.wait_for(state="visible", timeout=10_000)
+        finally:
+            if self.network is not None:
+                self.network.detach()
+        self.log.info(f"Board opened successfully in {time.monotonic() - start:.2f}s.")
+
+    def is_parked_on_board(self) -> bool:
+        """
+        True if the page shows the plain board (no card modal, no other URL).
+        """
+        return self.page.url.rstrip("/") == self.PATH.rstrip("/") and self.board_header.is_visible()
 
     def get_board_title(self) -> str:
         """
@@ -77,6 +191,37 @@ class TrelloBoardPage(BasePage):
         self.log.info("Getting Board Title.")
         return self.board_header.inner_text().strip()
 
+    def get_board_snapshot(self) -> BoardDomSnapshot:
+        """
+        Reads all columns, card titles, compact labels and statuses in a single page.evaluate call.
+        """
+        raw_columns = self.page.evaluate(BOARD_SNAPSHOT_SCRIPT, {
+            "list": LIST_SELECTOR,
+            "listName": LIST_NAME_SELECTOR,
+            "card": LIST_CARD_SELECTOR,
+            "cardTitle": CARD_TITLE_SELECTOR,
+            "label": COMPACT_LABEL_SELECTOR,
+            "cardLink": CARD_LINK_SELECTOR,
+        })
+        snapshot = BoardDomSnapshot.from_evaluate(raw_columns)
+        self.log.info(f"Board snapshot: {len(snapshot.columns)} columns, {len(snapshot.cards)} cards.")
+        return snapshot
+
+    def get_captured_board(self) -> BoardSnapshot:
+        """
+        The board data captured from network traffic (needs capture_network=True).
+        """
+        if self.network is None:
+            raise RuntimeError("network capture is off, create the page with capture_network=True")
+        return self.network.snapshot()
+
+    def get_cards_info_from_network(self) -> list[CardInfo]:
+        """
+        CardInfo for every open card on the board, in board order, without opening any modal.
+        """
+        board = self.get_captured_board()
+        return [self._card_info_from_json(card, board) for card in board.cards]
+
     # ==================================================
     # Private helper methods (small, reusable pieces)
     # ==================================================
@@ -88,14 +233,6 @@ class TrelloBoardPage(BasePage):
         self.log.info("Getting Column locator by its index.")
         return self.columns.nth(index)
 
-    def _get_column_status(self, column: Locator) -> str:
-        """
-        Returns the status (name) of a given column, e.g. 'To Do'.
-        """
-        self.log.info("Getting Column Status (TO DO, In Progress etc...).")
-        header = column.locator(LIST_NAME_SELECTOR)
-        return header.inner_text().strip()
-
     def _get_cards_in_column(self, column: Locator) -> Locator:
         """
         Returns a Locator for all cards in the given column.
@@ -103,22 +240,25 @@ class TrelloBoardPage(BasePage):
         self.log.info("Get All Cards in A Column.")
         return column.locator(LIST_CARD_SELECTOR)
 
-    def _get_card_title(self, card: Locator) -> str:
+    def _get_card_locator(self, card: BoardCard) -> Locator:
         """
-        Returns the title of a given card on the board.
+        Returns the Locator of a card from the board snapshot (by its position).
         """
-        self.log.info("Getting Card Title.")
-        return card.locator(CARD_TITLE_SELECTOR).inner_text().strip()
+        column = self._get_column_locator_by_index(card.column_index)
+        return self._get_cards_in_column(column).nth(card.card_index)
 
-    def _get_card_labels_on_board(self, card: Locator) -> list[str]:
+    def _card_info_from_json(self, card: dict, board: BoardSnapshot) -> CardInfo:
         """
-        Returns the labels shown on the board (compact labels) for a given card.
+        CardInfo from a captured card payload.
+        The description is whitespace-collapsed like get_opened_card_description() returns it
+        (it is the raw text, markdown is not rendered).
         """
-        self.log.info("Getting Card Label on the Board.")
-        return [
-            t.strip()
-            for t in card.locator(COMPACT_LABEL_SELECTOR).all_inner_texts()
-        ]
+        return CardInfo(
+            title=(card.get("name") or "").strip(),
+            description=" ".join((card.get("desc") or "").split()),
+            labels=card_label_names(card),
+            status=board.list_name(card) or "",
+        )
 
     def _open_card_and_get_details(self, card: Locator) -> tuple[str, str, list[str]]:
         """
@@ -127,6 +267,16 @@ class TrelloBoardPage(BasePage):
         """
         self.log.info("Opening card modal...")
         card.click()
+        details = self._read_opened_card()
+
+        self.close_card_modal()
+        self.log.info("Modal closed.")
+        return details
+
+    def _read_opened_card(self) -> tuple[str, str, list[str]]:
+        """
+        Waits for the card modal and reads (title, description, labels) from it.
+        """
         self.card_modal_title.wait_for(state="visible", timeout=10_000)
 
         modal_title = self.get_opened_card_title()
@@ -135,27 +285,37 @@ class TrelloBoardPage(BasePage):
         self.log.info("Description extracted.")
         modal_labels = self.get_opened_card_labels()
         self.log.info(f"Labels extracted: {modal_labels}")
-
-        self.close_card_modal()
-        self.log.info("Modal closed.")
         return modal_title, modal_description, modal_labels
 
-    def _iter_cards_with_status(self):
+    def _get_cards_details_in_parallel(self, cards: list[BoardCard], max_pages: int) -> list[CardInfo]:
         """
-        Helper that yields (card_locator, status_string) for every card on the board.
+        Reads the modals of 'cards' through their deep links, in up to max_pages extra
+        pages of the same (already logged in) browser context.
+        All pages of a round start loading together, then are read one by one,
+        so the browser loads them in parallel. Results are in the order of 'cards'.
         """
-        self.log.info("Getting status for every card on the board.")
-        column_count = self.columns.count()
-
-        for i in range(column_count):
-            column = self._get_column_locator_by_index(i)
-            status = self._get_column_status(column)
-            cards_in_column = self._get_cards_in_column(column)
-            card_count = cards_in_column.count()
-
-            for j in range(card_count):
-                card = cards_in_column.nth(j)
-                yield card, status
+        pool_size = max(1, min(max_pages, len(cards)))
+        self.log.info(f"Reading {len(cards)} cards in {pool_size} parallel pages...")
+        detail_pages = [
+            TrelloBoardPage(self.page.context.new_page(), routing=self.routing_policy)
+            for _ in range(pool_size)
+        ]
+        results: list[CardInfo] = []
+
+        try:
+            for start in range(0, len(cards), pool_size):
+                batch = list(zip(detail_pages, cards[start:start + pool_size]))
+                for detail, card in batch:
+                    # "commit" returns as soon as navigation starts, the page keeps loading
+                    detail.page.goto(card.url, wait_until="commit")
+                for detail, card in batch:
+                    title, description, labels = detail._read_opened_card()
+                    results.append(CardInfo(title=title, description=description, labels=labels, status=card.status))
+        finally:
+            for detail in detail_pages:
+                detail.page.close()
+
+        return results
 
     # ==================================================
     # Card modal methods
@@ -229,16 +389,17 @@ class TrelloBoardPage(BasePage):
     # Scenario-specific methods
     # ==================================================
 
-    def get_card_status_on_board(self, title: str) -> str:
+    def get_card_status_on_board(self, title: str, snapshot: BoardDomSnapshot | None = None) -> str:
         """
         Finds the status (column name) for the card with the given title.
+        snapshot: an already taken board snapshot, otherwise a new one is taken
         """
         self.log.info(f"Searching for card '{title}' on the board to get its status...")
-        for card, status in self._iter_cards_with_status():
-            if self._get_card_title(card) == title:
-                self.log.info(f"Card '{title}' found in column '{status}'")
-                return status
-        raise ValueError(f"Card with title '{title}' not found on board.")
+        card = (snapshot or self.get_board_snapshot()).find(title)
+        if card is None:
+            raise ValueError(f"Card with title '{title}' not found on board.")
+        self.log.info(f"Card '{title}' found in column '{card.status}'")
+        return card.status
 
     def get_card_info(self, title: str) -> CardInfo:
         """
@@ -248,12 +409,21 @@ class TrelloBoardPage(BasePage):
         - read title, description, labels from modal
         - close modal
         - return CardInfo
+        With network capture, everything comes from the captured board JSON instead.
         """
         self.log.info(f"Gathering full info for card '{title}'...")
-        status = self.get_card_status_on_board(title)
-
-        # find the card on the board and reuse the same open+read helper
-        card = self.cards.filter(has_text=title).first
+        if self.network is not None:
+            board = self.get_captured_board()
+            cards = board.cards_titled(title)
+            if not cards:
+                raise ValueError(f"Card with title '{title}' not found on board.")
+            return self._card_info_from_json(cards[0], board)
+
+        snapshot = self.get_board_snapshot()
+        status = self.get_card_status_on_board(title, snapshot)
+
+        # open exactly that card (by position) and reuse the same open+read helper
+        card = self._get_card_locator(snapshot.find(title))
         modal_title, modal_description, modal_labels = self._open_card_and_get_details(card)
 
         return CardInfo(
@@ -263,31 +433,38 @@ class TrelloBoardPage(BasePage):
             status=status,
         )
 
-    def get_urgent_cards_info(self) -> list[CardInfo]:
+    def get_urgent_cards_info(self, parallel_pages: int = 0) -> list[CardInfo]:
         """
         Scenario 1 helper:
-        - iterate all columns
-        - for each card, check if it has an 'Urgent' label on the board
+        - take one snapshot of all columns and cards
+        - pick the cards that have an 'Urgent' label on the board
         - for each urgent card, open modal, read description + labels, close modal
         - return list of CardInfo for all urgent cards
+        With network capture, no modal is opened (labels come from the card JSON).
+        parallel_pages: > 0 reads the modals in that many extra pages at the same time
+                        (e.g. DEFAULT_DETAIL_PAGES) instead of one by one on this page
         """
         self.log.info("Collecting all 'Urgent' cards...")
-        urgent_cards: list[CardInfo] = []
+        if self.network is not None:
+            return [card for card in self.get_cards_info_from_network() if "Urgent" in card.labels]
 
-        for card, status in self._iter_cards_with_status():
-            labels_on_board = self._get_card_labels_on_board(card)
+        snapshot_cards = self.get_board_snapshot().with_label("Urgent")
+        if parallel_pages > 0 and snapshot_cards and all(card.url for card in snapshot_cards):
+            return self._get_cards_details_in_parallel(snapshot_cards, parallel_pages)
 
-            if "Urgent" not in labels_on_board:
-                continue  # Not an urgent card
+        urgent_cards: list[CardInfo] = []
 
-            modal_title, modal_description, modal_labels = self._open_card_and_get_details(card)
+        for card in snapshot_cards:
+            modal_title, modal_description, modal_labels = self._open_card_and_get_details(
+                self._get_card_locator(card)
+            )
 
             urgent_cards.append(
                 CardInfo(
                     title=modal_title,
                     description=modal_description,
                     labels=modal_labels,
-                    status=status,
+                    status=card.status,
                 )
             )
 
@@ -1,16 +1,67 @@
 """
 Configuring Playwright to reuse the saved Trello login state (trello_auth_state.json).
 That way, tests start already logged in.
+
+The browser is started once per session (per worker with xdist), and tests get
+a page from a pool of logged-in contexts that are already parked on the board.
+With --screenshot / --video / --tracing each test gets a new context from
+pytest-playwright instead, so its own artifact recording keeps working.
 """
+import os
 import sys
 from pathlib import Path
 import pytest
+from playwright.sync_api import Browser, BrowserContext, BrowserType, Page
 
 # Ensure the project root is in sys.path for imports
 ROOT_DIR = Path(__file__).resolve().parents[2]
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
+from auth_setup import TRELLO_AUTH_STATE_FILE, save_trello_auth_state
+from ui.common.context_pool import (
+    ContextPool,
+    PooledPage,
+    StorageStateExpired,
+    file_lock,
+    storage_state_looks_valid,
+)
+from ui.common.logger import get_logger
+from ui.common.routing import ALLOW_ALL_POLICY, DEFAULT_ROUTING_POLICY, ResourceRouter, RoutingPolicy
+from ui.pages.trello_board_page import BOARD_HEADER_SELECTOR, TRELLO_BOARD_URL
+
+log = get_logger("ui.conftest")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-resource-blocking",
+        action="store_true",
+        help="load the full Trello web app (images, fonts, analytics) in UI tests",
+    )
+    parser.addoption(
+        "--trello-reauth",
+        action="store_true",
+        help="open a visible browser to log in again when trello_auth_state.json has expired",
+    )
+    parser.addoption(
+        "--context-pool-size",
+        type=int,
+        default=1,
+        help="how many logged-in board pages are kept warm between UI tests",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Keeps the call report on the test item, so fixtures can tell if the test failed.
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call":
+        item.rep_call = report
+
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
@@ -20,5 +71,163 @@ def browser_context_args(browser_context_args):
     """
     return {
         **browser_context_args,
-        "storage_state": "trello_auth_state.json",
-    }
\ No newline at end of file
+        "storage_state": TRELLO_AUTH_STATE_FILE,
+    }
+
+
+def _routing_policy(config) -> RoutingPolicy:
+    if config.getoption("--no-resource-blocking", default=False):
+        return ALLOW_ALL_POLICY
+    return DEFAULT_ROUTING_POLICY
+
+
+def _records_artifacts(config) -> bool:
+    """
+    True when pytest-playwright should record screenshots, videos or traces.
+    Those are tied to a context that lives for one test, so pooling is off then.
+    """
+    return any(
+        config.getoption(option, default="off") != "off"
+        for option in ("--screenshot", "--video", "--tracing")
+    )
+
+
+def _is_primary_worker() -> bool:
+    """
+    True in a plain pytest run and in the first pytest-xdist worker.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "gw0") == "gw0"
+
+
+def _state_mtime() -> float | None:
+    try:
+        return os.path.getmtime(TRELLO_AUTH_STATE_FILE)
+    except OSError:
+        return None
+
+
+def _recreate_auth_state(request, browser_type: BrowserType) -> None:
+    """
+    Logging in needs a person (Google login + 2FA), so this only happens with --trello-reauth.
+    With several workers, only one of them opens the login window: the others
+    wait for the lock and then use the file it saved.
+    """
+    if not request.config.getoption("--trello-reauth", default=False):
+        pytest.skip(
+            f"{TRELLO_AUTH_STATE_FILE} is missing or expired: "
+            "run 'python auth_setup.py' or pass --trello-reauth"
+        )
+    seen_mtime = _state_mtime()
+    with file_lock(TRELLO_AUTH_STATE_FILE):
+        if _state_mtime() != seen_mtime and storage_state_looks_valid(TRELLO_AUTH_STATE_FILE):
+            log.info(f"{TRELLO_AUTH_STATE_FILE} was re-created by another worker.")
+            return
+        log.info(f"Re-creating {TRELLO_AUTH_STATE_FILE} with a manual login.")
+        browser = browser_type.launch(headless=False)
+        try:
+            save_trello_auth_state(browser, TRELLO_AUTH_STATE_FILE)
+        finally:
+            browser.close()
+
+
+@pytest.fixture(scope="session")
+def trello_auth_state(request, browser_type: BrowserType) -> str:
+    """
+    Health check of the saved login before any context is created from it.
+    """
+    if not storage_state_looks_valid(TRELLO_AUTH_STATE_FILE):
+        _recreate_auth_state(request, browser_type)
+    return TRELLO_AUTH_STATE_FILE
+
+
+@pytest.fixture(scope="session")
+def context_pool(request, browser: Browser, browser_type: BrowserType, browser_context_args, trello_auth_state):
+    """
+    Logged-in contexts parked on the board, shared by all UI tests of the session.
+    Images, fonts, media and third-party analytics are blocked for every page of
+    the pooled contexts. With --no-resource-blocking nothing is blocked, but
+    requests are still counted.
+    """
+    def new_pool() -> ContextPool:
+        return ContextPool(
+            browser,
+            TRELLO_BOARD_URL,
+            BOARD_HEADER_SELECTOR,
+            trello_auth_state,
+            context_args=browser_context_args,
+            routing=_routing_policy(request.config),
+            size=request.config.getoption("--context-pool-size", default=1),
+        )
+
+    pool = new_pool()
+    try:
+        pool.warm_up()
+    except StorageStateExpired as error:
+        # The cookies looked fine, but Trello logged us out on its side
+        log.warning(str(error))
+        pool.close()
+        _recreate_auth_state(request, browser_type)
+        pool = new_pool()
+        pool.warm_up()
+
+    # Trello rolls its session cookies forward, keep the fresh ones for the next run.
+    # One writer is enough (other workers read the same file).
+    if _is_primary_worker():
+        with file_lock(TRELLO_AUTH_STATE_FILE):
+            pool.save_storage_state()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pooled_page(request, context_pool: ContextPool):
+    slot = context_pool.acquire()
+    yield slot
+    # Only a failed test leaves the page in an unknown state (skipped ones are fine)
+    report = getattr(request.node, "rep_call", None)
+    context_pool.release(slot, healthy=report is None or not report.failed)
+
+
+@pytest.fixture
+def board_slot(request, trello_auth_state) -> PooledPage:
+    """
+    The context / page / router of one test: a pooled one, or with artifact
+    recording a new context from pytest-playwright's new_context fixture
+    (closed, and its artifacts kept, by pytest-playwright).
+    """
+    if not _records_artifacts(request.config):
+        return request.getfixturevalue("pooled_page")
+
+    context = request.getfixturevalue("new_context")()
+    router = ResourceRouter(_routing_policy(request.config)).attach(context)
+    return PooledPage(context=context, page=context.new_page(), router=router)
+
+
+@pytest.fixture
+def context(board_slot: PooledPage) -> BrowserContext:
+    """
+    Overrides pytest-playwright's context: logged in, usually from the pool.
+    """
+    return board_slot.context
+
+
+@pytest.fixture
+def page(board_slot: PooledPage) -> Page:
+    """
+    Overrides pytest-playwright's page: a warm page on the board when pooled.
+    """
+    return board_slot.page
+
+
+@pytest.fixture(autouse=True)
+def resource_router(request) -> ResourceRouter | None:
+    """
+    Reports how many requests of the test were blocked / allowed.
+    Tests without a page (offline unit tests) don't start the browser for it.
+    """
+    if "page" not in request.fixturenames and "context" not in request.fixturenames:
+        yield None
+        return
+    slot: PooledPage = request.getfixturevalue("board_slot")
+    yield slot.router
+    log.info(f"{request.node.name}: {slot.router.summary()}")
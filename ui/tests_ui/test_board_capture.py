@@ -0,0 +1,137 @@
+"""
+BoardNetworkCapture, fed with stub responses (no browser needed).
+"""
+
+from types import SimpleNamespace
+
+from ui.pages.board_capture import BoardNetworkCapture
+
+API = "https://trello.com/1"
+
+
+class _Response:
+    def __init__(self, path: str, data, ok: bool = True, method: str = "GET"):
+        self.url = f"{API}{path}?fields=all"
+        self.ok = ok
+        self.request = SimpleNamespace(method=method)
+        self._data = data
+
+    def json(self):
+        if isinstance(self._data, Exception):
+            raise self._data
+        return self._data
+
+
+class _Page:
+    def __init__(self):
+        self.listeners = []
+
+    def on(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove((event, handler))
+
+    def respond(self, response):
+        for _, handler in self.listeners:
+            handler(response)
+
+
+def _card(card_id, name, id_list, pos, **extra):
+    return {"id": card_id, "name": name, "idList": id_list, "pos": pos, "desc": "", **extra}
+
+
+BOARD = {
+    "id": "b1",
+    "name": "droxi",
+    "lists": [
+        {"id": "l2", "name": "Done", "pos": 2},
+        {"id": "l1", "name": "To Do", "pos": 1},
+        {"id": "l3", "name": "Old", "pos": 3, "closed": True},
+    ],
+    "labels": [{"id": "u", "name": "Urgent", "color": "red"}],
+    "cards": [
+        _card("c3", "shipped", "l2", 1),
+        _card("c2", "second", "l1", 2, idLabels=["u"]),
+        _card("c1", "first", "l1", 1),
+        _card("c4", "archived list", "l3", 1),
+        _card("c5", "archived card", "l1", 3, closed=True),
+    ],
+}
+
+
+def _captured(*responses) -> BoardNetworkCapture:
+    page = _Page()
+    capture = BoardNetworkCapture()
+    capture.attach(page)
+    for response in responses:
+        page.respond(response)
+    return capture
+
+
+def test_board_payload_becomes_an_ordered_snapshot():
+    board = _captured(_Response("/boards/b1", BOARD)).snapshot()
+
+    # open lists by pos, cards in list order, then by pos; closed lists / cards left out
+    assert [card["name"] for card in board.cards] == ["first", "second", "shipped"]
+    assert board.list_name(board.cards_titled("shipped")[0]) == "Done"
+    # idLabels are resolved with the board's labels
+    assert [label["name"] for label in board.cards_titled("second")[0]["labels"]] == ["Urgent"]
+
+
+def test_later_payloads_are_merged():
+    capture = _captured(
+        _Response("/Boards/b1", BOARD),
+        # lists with their cards nested, and a single card reload
+        _Response("/boards/b1/lists", [{"id": "l1", "name": "Backlog", "pos": 1, "cards": [
+            _card("c6", "new", "l1", 5),
+        ]}]),
+        _Response("/cards/c1", {"id": "c1", "desc": "loaded later"}),
+    )
+
+    board = capture.snapshot()
+
+    assert [card["name"] for card in board.cards] == ["first", "second", "new", "shipped"]
+    assert board.cards_titled("first")[0]["desc"] == "loaded later"
+    assert board.list_name(board.cards_titled("new")[0]) == "Backlog"
+    assert capture.responses == 3
+
+
+def test_unwanted_responses_are_ignored():
+    capture = _captured(
+        _Response("/boards/b1", {**BOARD, "cards": []}),
+        _Response("/boards/b1/cards", [_card("x", "failed", "l1", 1)], ok=False),
+        _Response("/cards/c9", _card("c9", "posted", "l1", 1), method="POST"),
+        _Response("/members/me", {"id": "me"}),
+        _Response("/boards/b1/cards", ValueError("not JSON")),
+    )
+
+    assert len(capture.snapshot()) == 0
+    assert capture.responses == 1
+
+
+def test_board_response_filter():
+    assert BoardNetworkCapture.is_board_response(_Response("/boards/b1", BOARD))
+    assert not BoardNetworkCapture.is_board_response(_Response("/boards/b1/cards", []))
+    assert not BoardNetworkCapture.is_board_response(_Response("/boards/b1", BOARD, ok=False))
+
+
+def test_reset_and_detach():
+    page = _Page()
+    capture = BoardNetworkCapture()
+    capture.attach(page)
+    capture.attach(page)
+    assert len(page.listeners) == 1
+
+    page.respond(_Response("/boards/b1", BOARD))
+    capture.snapshot()
+    capture.reset()
+    # the card was deleted before the next load
+    without_first = [card for card in BOARD["cards"] if card["id"] != "c1"]
+    page.respond(_Response("/boards/b1", {**BOARD, "cards": without_first}))
+    assert [card["name"] for card in capture.snapshot().cards] == ["second", "shipped"]
+
+    capture.detach()
+    assert page.listeners == []
+    page.respond(_Response("/boards/b1", BOARD))
+    assert len(capture.snapshot()) == 2
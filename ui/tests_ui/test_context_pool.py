@@ -0,0 +1,96 @@
+"""
+Offline helpers of the context pool: storage state health check, atomic save, file lock.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from ui.common.context_pool import file_lock, save_storage_state, storage_state_looks_valid
+
+NOW = 1_800_000_000.0
+DAY = 24 * 60 * 60
+
+
+def _cookie(name: str, domain: str = ".trello.com", expires: float = NOW + 30 * DAY) -> dict:
+    return {"name": name, "value": "x", "domain": domain, "path": "/", "expires": expires}
+
+
+def _state_file(tmp_path, *cookies) -> str:
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"cookies": list(cookies), "origins": []}))
+    return str(path)
+
+
+@pytest.mark.parametrize("cookies, expected", [
+    ([_cookie("token")], True),
+    ([_cookie("cloud.session.token", domain=".atlassian.com")], True),
+    # locale / analytics cookies don't prove a login
+    ([_cookie("lang"), _cookie("ajs_anonymous_id", domain=".atlassian.com")], False),
+    # a session cookie only lived as long as the browser that got it
+    ([_cookie("token", expires=-1)], False),
+    ([_cookie("token", expires=NOW + 60)], False),
+    ([_cookie("token", domain=".example.com")], False),
+    ([_cookie("lang"), _cookie("token", expires=NOW - DAY), _cookie("cloud.session.token", expires=-1)], False),
+    ([], False),
+])
+def test_storage_state_health_check(tmp_path, cookies, expected):
+    path = _state_file(tmp_path, *cookies)
+
+    assert storage_state_looks_valid(path, now=NOW) is expected
+
+
+def test_missing_or_broken_state_file(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"cookies": [')
+
+    assert not storage_state_looks_valid(str(tmp_path / "missing.json"), now=NOW)
+    assert not storage_state_looks_valid(str(broken), now=NOW)
+
+
+class _Context:
+    def __init__(self, state: dict):
+        self.state = state
+
+    def storage_state(self) -> dict:
+        return self.state
+
+
+def test_save_storage_state_replaces_the_file(tmp_path):
+    path = _state_file(tmp_path, _cookie("lang"))
+
+    save_storage_state(_Context({"cookies": [_cookie("token")], "origins": []}), path)
+
+    assert storage_state_looks_valid(path, now=NOW)
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "state.json")
+
+    with file_lock(path):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            with file_lock(path, timeout=0.2, poll_interval=0.05):
+                pass
+        assert time.monotonic() - start >= 0.2
+
+    # released again
+    with file_lock(path, timeout=0.2):
+        pass
+
+
+def test_file_lock_takes_over_a_stale_lock(tmp_path):
+    path = str(tmp_path / "state.json")
+    lock_path = f"{path}.lock"
+    open(lock_path, "w").close()
+    # Left behind by a crashed run an hour ago
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(lock_path, (an_hour_ago, an_hour_ago))
+
+    with file_lock(path, timeout=0.2, stale_after=60):
+        assert os.path.exists(lock_path)
+
+    assert not os.path.exists(lock_path)
@@ -1,6 +1,6 @@
 import pytest
 from playwright.sync_api import Page
-from ui.pages.trello_board_page import TrelloBoardPage, CardInfo
+from ui.pages.trello_board_page import DEFAULT_DETAIL_PAGES, TrelloBoardPage, CardInfo
 
 VALID_STATUSES = ["To Do", "In Progress", "Done"]
 
@@ -25,7 +25,8 @@ def test_urgent_cards_validation(page: Page) -> None:
     board.log.info("=== Scenario 1: Urgent Cards Validation ===")
     board.open_board()
 
-    urgent_cards: list[CardInfo] = board.get_urgent_cards_info()
+    # card modals are read in a few extra pages at the same time
+    urgent_cards: list[CardInfo] = board.get_urgent_cards_info(parallel_pages=DEFAULT_DETAIL_PAGES)
     board.log.info(f"Found {len(urgent_cards)} urgent cards")
 
     assert urgent_cards, "Expected at least one 'Urgent' card on the board."